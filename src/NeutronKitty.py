@@ -1,15 +1,14 @@
 from tkinter import Tk, Text, Button, Menu, END, RAISED
 from tkinter.filedialog import askopenfilename, asksaveasfilename
-from tkinter.messagebox import showerror, showwarning
-from re import compile as regex_compile
+from tkinter.messagebox import showerror
 from typing import Optional
 from simpleGui import SpaceCatSimulator
+from spacecat.highlight import COMMENT, MNEMONIC, TAGS, Highlighter
+from spacecat.incremental import IncrementalAssembler
+from spacecat.lexer import AssemblyError
 
 
 class NeutronKitty:
-    mnemonic_pattern = regex_compile(r"(?i)load|xor|and|move|store|addi|addf|or|ror|jmpeq|jmp|jmple|halt")
-    comment_pattern = regex_compile(";.*")
-
     def __init__(self, master: Tk, string: str = "", file_path: str = "", svm: SpaceCatSimulator = None):
         self.master = master
         self.master.title("NeutronKitty Text Editor")
@@ -19,11 +18,15 @@ class NeutronKitty:
         self.vm: SpaceCatSimulator = svm
 
         self.editor = Text(master=self.master)
+        self.highlighter = Highlighter()
+        self.__highlighting = False  # Whether highlighting is scheduled.
+        self.__set_tags()
+        self.editor.bind("<<Modified>>", self.__on_modified)
         self.editor.insert(END, string)
         self.editor.pack(fill="both", expand=True)
 
         self.file_path: Optional[str] = None
-        self.edited = False
+        self.assembler = IncrementalAssembler(256)
 
         self.menubar = Menu(self.master, relief=RAISED)
         self.file_menu = Menu(self.menubar)
@@ -97,23 +100,55 @@ class NeutronKitty:
 
     def __assemble(self) -> None:
         """
-        Assemble the results in the assembler.
+        Assemble the contents of the editor into the simulator, writing only the bytes that differ from its memory.
         :return:
         """
-        self.__save()
         if self.file_path:
-            self.vm.open_file(self.file_path)
-        else:
-            showwarning("Save the file first", "You must save the file first.")
+            self.__save_file(self.file_path)
+        if not self.vm:
+            return
+        try:
+            self.assembler.update(self.editor.get(1.0, END))
+        except AssemblyError as error:
+            showerror("Assembly Error", str(error))
+            return
+        self.vm.load_image(self.assembler.memory)
 
     def __set_tags(self):
-        self.editor.tag_configure("mnemonic", foreground="green")
-        self.editor.tag_configure("comment", foreground="grey")
+        self.editor.tag_configure(MNEMONIC, foreground="green")
+        self.editor.tag_configure(COMMENT, foreground="grey")
+
+    def __on_modified(self, *args) -> None:
+        """
+        Queue the lines an edit touched for highlighting.
+        :return: None
+        """
+        if not self.editor.edit_modified():
+            return
+        self.highlighter.edit(self.editor.get("1.0", "end-1c"))
+        # Clearing the flag is what makes Tk send <<Modified>> for the next edit.
+        self.editor.edit_modified(False)
+        if not self.__highlighting:
+            self.__highlighting = True
+            self.master.after_idle(self.__highlight)
+
+    def __highlight(self) -> None:
+        """
+        Highlight the queued lines for a frame, retagging each run of lines and each tag with a single call.
+        :return: None
+        """
+        runs, spans = self.highlighter.highlight()
+        for tag in TAGS:
+            for first, last in runs:
+                self.editor.tag_remove(tag, f"{first}.0", f"{last}.end")
+            indices = [index for line, start, end in spans[tag] for index in (f"{line}.{start}", f"{line}.{end}")]
+            if indices:
+                self.editor.tag_add(tag, *indices)
+        if self.highlighter.pending:
+            self.master.after(1, self.__highlight)
+        else:
+            self.__highlighting = False
 
-    def __colour(self) -> None:
-        for line in self.editor.get(1.0, END):
-            mnemonics = self.mnemonic_pattern.findall(line)
-            comments = self.comment_pattern.findall(line)
 
 if __name__ == "__main__":
     root = Tk()
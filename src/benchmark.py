@@ -1,6 +1,6 @@
 from spacecat.common_utils import Cell
 from spacecat.simulator import Simulator
-from time import time
+from time import perf_counter
 
 bench = """
 LOAD R0, 5Ah; Load the end of the capital English ASCII block.
@@ -14,14 +14,19 @@ LOOP:
 """
 
 benchmark = "207E21012220402F5221F206C000"
+ENGINES = {"cell": {}, "integer": {"integer_core": True}, "jit": {"jit": True}}
+RUNS = 1000  # Runs of the benchmark per engine, each one restoring the machine to its loaded state.
+
 if __name__ == "__main__":
-    memory = [Cell(benchmark[i:i+2]) for i in range(0, len(benchmark), 2)]
-    start_time = time()
-    s = Simulator(mem_size=14, register_size=16, stdout_register_indices=[15])
-    s.load_memory(memory)
-    for i in s:
-        print(s.return_stdout(), end='')
-        pass
-    print("\n")
-    end_time= time()
-    print(end_time - start_time)
\ No newline at end of file
+    for name, options in ENGINES.items():
+        memory = [Cell(benchmark[i:i+2]) for i in range(0, len(benchmark), 2)]
+        s = Simulator(mem_size=14, register_size=16, stdout_register_indices=[15], **options)
+        s.load_memory(memory)
+        loaded = s.snapshot()
+        output = s.run().output
+        start_time = perf_counter()
+        for _ in range(RUNS):
+            s.restore(loaded)
+            s.run()
+        end_time = perf_counter()
+        print(f"{name:>8}: {(end_time - start_time) / RUNS * 1e6:8.1f} us per run, {output}")
@@ -1,31 +1,18 @@
 from tkinter import Tk, Label, filedialog, Entry, END, Menu, Event, Button, Frame, RAISED, BOTTOM, TOP, FLAT, Toplevel, \
     StringVar, OptionMenu, W, E, S, N
-from tkinter.messagebox import showwarning
-from typing import List, Dict, TypeVar, Optional, Callable
+from tkinter.messagebox import showerror, showwarning
+from typing import List, Dict, Optional, Callable
 from spacecat.simulator import Simulator
 from spacecat.common_utils import Cell, OctalFloat
-from spacecat.assembler import Assembler
+from spacecat.cache import ProgramCache
+from spacecat.debugger import Debugger
+from spacecat.runner import map_file
 from string import hexdigits
-from copy import deepcopy
 from enum import Enum
 from spacecat.disassembler import disassemble
+from spacecat.worker import SimulationWorker, Snapshot
 from svm_config import Language, Config
 
-T = TypeVar("T")
-
-
-def get_difference(previous_list: List[T], current_list: List[T]) -> Dict[int, T]:
-    """
-    Get the difference between two lists.
-    :param previous_list: First iteration of the list.
-    :param current_list: Second iteration of the list
-    :return: The indices and new values of the changed cells of the list as a dictionary.
-    """
-    diff_dict: Dict[int, T] = {i: new_value for i, new_value in
-                               enumerate(current_list) if new_value != previous_list[i]}
-    return diff_dict
-
-
 class TICK(Enum):
     """
     Tick is the running speed of the machine.
@@ -33,17 +20,27 @@ class TICK(Enum):
     HIGH: int = 500
     MEDIUM: int = 300
     LOW: int = 100
+    TURBO: int = 0  # Runs as fast as possible.
+
+
+TURBO_SLICE = 0.010  # Seconds of execution between checks for commands in turbo mode.
+FRAME_INTERVAL = 1 / 30  # Seconds between refreshes of the view.
+MONITOR_LENGTH = 1000  # Characters kept on the monitor.
+HISTORY_LENGTH = 100_000  # Steps that can be stepped back.
 
 
 class CellEntry(Entry):
-    def __init__(self, index_of: int, register_type: str, list_of: List[Cell], monitor_callback: Callable, *args, **kwargs):
+    def __init__(self, index_of: int, register_type: str, list_of: List[Cell], monitor_callback: Callable, *args,
+                 edit_callback: Optional[Callable[["CellEntry"], None]] = None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.edit_callback = edit_callback  # Writes an edit to the machine, instead of writing to list_of directly.
         self.register_type = register_type
         self.index_of = index_of
         self.__variable = StringVar()
         self.__variable.trace_add("write", self.__validate)
         self.config(textvariable=self.__variable)
         self.list_of = list_of
+        self.__setting = False  # Whether the value is being shown rather than edited.
 
     def __validate(self, *others):
         value: Optional[str] = self.__variable.get()
@@ -58,10 +55,19 @@ class CellEntry(Entry):
         self.__on_edit()
 
     def __on_edit(self):
-        self.list_of[self.index_of].value = self.__variable.get()
+        if self.__setting:
+            return
+        if self.edit_callback is not None:
+            self.edit_callback(self)
+        else:
+            self.list_of[self.index_of].value = self.__variable.get()
 
     def set(self, value):
-        self.__variable.set(value)
+        self.__setting = True
+        try:
+            self.__variable.set(value)
+        finally:
+            self.__setting = False
 
 
 class SpaceCatSimulator:
@@ -72,7 +78,7 @@ class SpaceCatSimulator:
 
         self.master = master
         self.master.resizable(height=False, width=False)
-        self.master.geometry("510x520")
+        self.master.geometry("510x545")
         self.master.iconbitmap("resources/spacecat.ico")
         self.master.title(self.lang.title)
 
@@ -85,10 +91,16 @@ class SpaceCatSimulator:
         self.current_tick: TICK = TICK.LOW
         self.clicked_cells: List[CellEntry] = []
 
+        self.__program_cache = ProgramCache()
         self.__machine: Simulator = Simulator(self.MEMORY_SIZE, self.REGISTER_SIZE, self.STDOUT_REGISTER_INDICES)
-        self.__memory_values: List[Cell] = self.__machine.return_memory()  # Memory from previous turn.
-        self.__register_values: List[Cell] = self.__machine.return_registers()  # Registers from previous turn.
+        # The machine runs on a thread of its own, it is only touched here while the worker is paused.
+        self.__machine.keep_history(HISTORY_LENGTH)
+        self.__debugger = Debugger(self.__machine)
+        self.__worker = SimulationWorker(self.__machine, TURBO_SLICE, FRAME_INTERVAL, self.__debugger)
+        self.__worker.start()
+        self.__running = False
         self.__define_gui()
+        self.master.after(int(FRAME_INTERVAL * 1000), self.__poll)
 
     def __define_gui(self):
         self.memory_canvas = Frame(self.master)
@@ -98,29 +110,42 @@ class SpaceCatSimulator:
         self.prev_run_cell = 0
 
         self.cells = [CellEntry(index_of=i, register_type="M", list_of= self.__machine.return_memory(),
-                                monitor_callback=self.__check_monitor, master=self.memory_canvas, width=3)
+                                monitor_callback=self.__check_monitor, edit_callback=self.__on_edit,
+                                master=self.memory_canvas, width=3)
                       for i in range(self.MEMORY_SIZE)]
         for cell in self.cells:
             cell.bind("<Button-1>", self.on_click)
+            cell.bind("<Button-3>", self.__toggle_breakpoint)
+            cell.bind("<Shift-Button-3>", self.__toggle_watchpoint)
 
         self.registers = [CellEntry(index_of=i, register_type="R", list_of=self.__machine.return_registers(),
-                                    monitor_callback=self.__check_monitor,
+                                    monitor_callback=self.__check_monitor, edit_callback=self.__on_edit,
                                     master=self.register_canvas, width=3) for i in range(self.REGISTER_SIZE)]
         for register in self.registers:
             register.bind("<Button-1>", self.on_click)
+            register.bind("<Shift-Button-3>", self.__toggle_watchpoint)
         self.__populate_canvases()
 
         self.__run = Button(master=self.buttons_frame, text=self.lang.run, relief=FLAT, command=self.__run_machine)
         self.__step_button = Button(master=self.buttons_frame, text=self.lang.step, relief=FLAT, command=self.__step)
+        self.__step_back_button = Button(master=self.buttons_frame, text=self.lang.step_back, relief=FLAT,
+                                         command=self.__worker.step_back)
+        self.__run_back_button = Button(master=self.buttons_frame, text=self.lang.run_back, relief=FLAT,
+                                        command=self.__worker.run_back)
+        self.__pause_button = Button(master=self.buttons_frame, text=self.lang.pause, relief=FLAT,
+                                     command=self.__worker.pause)
         self.__editor = Button(master=self.buttons_frame, text=self.lang.editor, relief=FLAT)
         self.__disassemble = Button(master=self.buttons_frame, text=self.lang.disassemble, relief=FLAT, command=self.__dis)
         self.__edit_button = Button(master=self.buttons_frame, text=self.lang.edit, relief=FLAT, command=self.__edit)
 
         self.__run.grid(row=0, column=0)
         self.__step_button.grid(row=0, column=1)
-        self.__editor.grid(row=0, column=2)
-        self.__disassemble.grid(row=0, column=3)
-        self.__edit_button.grid(row=0, column=4)
+        self.__pause_button.grid(row=0, column=2)
+        self.__editor.grid(row=0, column=3)
+        self.__disassemble.grid(row=0, column=4)
+        self.__edit_button.grid(row=0, column=5)
+        self.__run_back_button.grid(row=1, column=0)
+        self.__step_back_button.grid(row=1, column=1)
 
         self.menubar = Menu(self.master, relief=RAISED)
         self.file_menu = Menu(self.menubar)
@@ -129,6 +154,7 @@ class SpaceCatSimulator:
         self.speed.add_command(label=self.lang.fast, command=lambda : self.__change_tick(TICK.LOW))
         self.speed.add_command(label=self.lang.medium, command=lambda : self.__change_tick(TICK.MEDIUM))
         self.speed.add_command(label=self.lang.slow, command=lambda : self.__change_tick(TICK.HIGH))
+        self.speed.add_command(label=self.lang.turbo, command=lambda : self.__change_tick(TICK.TURBO))
         self.file_menu.add_command(label=self.lang.open, command=self.open_file)
         self.file_menu.add_command(label=self.lang.save_state, command=self.__save)
         self.file_menu.add_command(label=self.lang.language_change, command=self.__language_selection)
@@ -148,12 +174,20 @@ class SpaceCatSimulator:
         self.monitor_canvas.pack(fill="x")
         self.bottom_bar.pack(fill="x", side=BOTTOM)
 
-    def __on_edit(self, entry):
+    def __on_edit(self, entry: CellEntry) -> None:
+        """
+        Write an edited entry field to the machine, pausing the worker first as it owns the machine while running.
+        :param entry: The entry field.
+        :return: None
+        """
+        self.__worker.pause()
         index = entry.index_of
         if entry.register_type == "R":
             self.__machine.return_registers()[index].value = int(entry.get(), base=16)
         elif entry.register_type == "M":
-            self.__machine.return_memory()[index].value = int(entry.get(), base=16)
+            self.__machine.patch_memory({index: int(entry.get(), base=16)})
+        # Steps cannot be undone across an edit.
+        self.__machine.clear_history()
 
     def __change_tick(self, tick_speed: TICK) -> None:
         """
@@ -162,6 +196,8 @@ class SpaceCatSimulator:
         :return: None.
         """
         self.current_tick = tick_speed
+        if self.__running:
+            self.__run_machine()
 
     def __save(self) -> None:
         """
@@ -173,15 +209,16 @@ class SpaceCatSimulator:
                                                                       (self.lang.svm, ".svm")])
         if save_file_name == "":
             return None
+        self.__worker.pause()
         if save_file_name.endswith(".prg"):
             with open(save_file_name, "wb") as file:
-                file.write(self.__machine.dump_program_memory())
+                self.__machine.write_program(file)
         elif save_file_name.endswith(".svm"):
             with open(save_file_name, "wb") as file:
-                file.write(self.__machine.dump_program_svm_state())
+                self.__machine.write_state(file)
         else:
             with open(save_file_name + ".prg", "wb") as file:
-                file.write(self.__machine.dump_program_memory())
+                self.__machine.write_program(file)
             showwarning(self.lang.warn_title, self.lang.warn_message)
 
     def __edit(self) -> None:
@@ -199,17 +236,19 @@ class SpaceCatSimulator:
         :return:
         """
         values = []
-        for i in range(0, len(self.__memory_values), 2):
-            values.append(str(self.__memory_values[i]) + str(self.__memory_values[i + 1]))
+        self.__worker.pause()
+        memory = self.__machine.return_memory()
+        for i in range(0, len(memory), 2):
+            values.append(str(memory[i]) + str(memory[i + 1]))
         dis_ = disassemble(values)
         commands = filter(lambda x: x != "", dis_)
         string = '\n'.join(commands)
         from NeutronKitty import NeutronKitty
         neutron_kitty = NeutronKitty(Tk(), string)
 
-    def __check_monitor(self):
-        new_text = self.monitor["text"] + self.__machine.return_stdout()
-        self.monitor["text"] = new_text.split("\n")[-1]
+    def __check_monitor(self, output: str = ""):
+        new_text = self.monitor["text"] + output
+        self.monitor["text"] = new_text.split("\n")[-1][-MONITOR_LENGTH:]
 
     def __sync_machine(self):
         """
@@ -222,27 +261,33 @@ class SpaceCatSimulator:
 
     def __run_machine(self):
         """
-        Run the machine.
+        Run the machine at the current speed.
         :return:
         """
-        self.__step()
-        try:
-            self.master.after(self.current_tick.value, self.__run_machine)
-        except StopIteration:
-            pass
+        self.__worker.resume(None if self.current_tick is TICK.TURBO else self.current_tick.value / 1000)
 
     def __step(self):
         """
         Take a step in the program.
         :return:
         """
-        try:
-            memory_cells, register_cells = self.__machine.__next__()
-#            self.__sync_machine()
-            self.__update_view(memory_cells, register_cells)
-            self.__check_monitor()
-        except StopIteration:
-            pass
+        self.__worker.step()
+
+    def __poll(self) -> None:
+        """
+        Show what the machine did since the last frame.
+        :return: None
+        """
+        snapshot = self.__worker.poll()
+        if snapshot is not None:
+            self.__running = snapshot.running
+            self.__update_view(snapshot)
+            if snapshot.error:
+                showerror(self.lang.simulator, snapshot.error)
+            elif not snapshot.running and self.__debugger.last_stop is not None:
+                stop = self.__debugger.last_stop
+                self.bottom_bar["text"] = f"{self.lang.stopped}: {stop.kind.value} {stop.location:02X}"
+        self.master.after(int(FRAME_INTERVAL * 1000), self.__poll)
 
     def open_file(self, file_name=None):
         """
@@ -254,18 +299,45 @@ class SpaceCatSimulator:
                                                         filetypes=((self.lang.asm, "*.asm"),
                                                                    (self.lang.prog, "*.prg"),
                                                                    (self.lang.svm, "*.svm")))
+        self.__worker.pause()
         if file_name.endswith(".asm"):
             self.file_path = file_name
-            assembler: Assembler = Assembler.instantiate(open(file_name, "r").read(), 256)
-            self.__machine.load_memory(assembler.memory)
+            with open(file_name, "r") as file:
+                self.__machine.parse_program_memory(self.__program_cache.assemble(file.read(), self.MEMORY_SIZE))
         elif file_name.endswith(".prg"):
-            self.__machine.parse_program_memory(open(file_name, "rb").read())
+            with map_file(file_name) as image:
+                self.__machine.parse_program_memory(image)
             self.__reset_ir_pc()
             self.__machine.reset_special_registers()
         elif file_name.endswith(".svm"):
-            self.__machine.parse_program_state(open(file_name, "rb").read())
+            with map_file(file_name) as state:
+                self.__machine.parse_program_state(state)
             self.__load_special_registers()
-        self.__update_view(self.__machine.return_memory(), self.__machine.return_registers())
+        self.__load_memory_to_view()
+
+    def patch_memory(self, changes: Dict[int, int]) -> None:
+        """
+        Write changed bytes to the memory, updating only their entry fields.
+        :param changes: Addresses and their new values.
+        :return: None
+        """
+        self.__worker.pause()
+        self.__machine.patch_memory(changes)
+        memory = self.__machine.return_memory()
+        for change_index in changes:
+            self.cells[change_index].set(str(memory[change_index]))
+
+    def load_image(self, image: bytes) -> None:
+        """
+        Write an assembled memory image, patching only the bytes that differ from the memory as it is now, so that
+        edits made since the last assembly are overwritten as well.
+        :param image: Bytes of the memory.
+        :return: None
+        """
+        self.__worker.pause()
+        memory = self.__machine.return_memory()
+        self.patch_memory({address: value for address, (cell, value) in enumerate(zip(memory, image))
+                           if cell.value != value})
 
     def on_click(self, event: Event):
         """
@@ -281,6 +353,53 @@ class SpaceCatSimulator:
                                   f"\t{self.lang.float}: {OctalFloat(format(real_val, '02X')).__float__():.3f}" \
                                   f"\t{self.lang.bin}: {real_val:08b}"
 
+    def __toggle_breakpoint(self, event: Event) -> None:
+        """
+        Toggle a breakpoint on the memory cell right clicked.
+        :param event: The click.
+        :return: None
+        """
+        self.__worker.pause()
+        self.__debugger.toggle_breakpoint(event.widget.index_of)
+        self.__colour_points()
+        self.__highlight_pc()
+
+    def __toggle_watchpoint(self, event: Event) -> None:
+        """
+        Toggle a watchpoint on the memory cell or the register shift right clicked.
+        :param event: The click.
+        :return: None
+        """
+        self.__worker.pause()
+        if event.widget.register_type == "M":
+            self.__debugger.toggle_memory_watchpoint(event.widget.index_of)
+        else:
+            self.__debugger.toggle_register_watchpoint(event.widget.index_of)
+        self.__colour_points()
+        self.__highlight_pc()
+
+    def __cell_background(self, index: int) -> str:
+        """
+        Return the background of a memory cell the PC is not on.
+        :param index: Address of the cell.
+        :return: the colour.
+        """
+        if index in self.__debugger.breakpoints:
+            return "Red"
+        if index in self.__debugger.memory_watchpoints:
+            return "Yellow"
+        return "White"
+
+    def __colour_points(self) -> None:
+        """
+        Colour the memory cells and the registers by their breakpoints and watchpoints.
+        :return: None
+        """
+        for i, cell in enumerate(self.cells):
+            cell["background"] = self.__cell_background(i)
+        for i, register in enumerate(self.registers):
+            register["background"] = "Yellow" if i in self.__debugger.register_watchpoints else "White"
+
     def __populate_canvases(self):
         """
         Populate the canvases by drawing entry fields into them.
@@ -312,7 +431,10 @@ class SpaceCatSimulator:
         Reset the instruction register and the pc
         :return:
         """
+        self.__worker.pause()
         self.__machine.reset_special_registers()
+        # Steps cannot be undone across a reset.
+        self.__machine.clear_history()
         self.__load_special_registers()
 
     def __load_memory_to_view(self):
@@ -320,45 +442,52 @@ class SpaceCatSimulator:
         Load the self.memory to view
         :return:
         """
-        for i, memory_value in enumerate(self.__memory_values):
-            entry_field = self.cells[i]
-            entry_field.delete(0, END)
-            entry_field.insert(0, str(memory_value))
-        for j, register_value in enumerate(self.__register_values):
-            register_field = self.registers[j]
-            register_field.delete(0, END)
-            register_field.insert(0, register_value)
+        self.__machine.take_dirty()
+        for i, memory_value in enumerate(self.__machine.return_memory()):
+            self.cells[i].set(str(memory_value))
+        for j, register_value in enumerate(self.__machine.return_registers()):
+            self.registers[j].set(str(register_value))
         self.__load_special_registers()
+        self.__highlight_pc()
 
-    def __update_view(self, new_memory: List[Cell], new_registers: List[Cell]):
+    def __update_view(self, snapshot: Snapshot):
         """
-        Update the view without explicitly reloading the view.
-        :param new_memory: New memory to be loaded.
-        :param new_registers: New registers to be loaded.
+        Update the view without explicitly reloading the view, only the entries the machine wrote to are updated.
+        :param snapshot: Snapshot of the machine published by the worker.
         :return:
         """
-        register_differences = get_difference(self.__register_values, new_registers)
-        memory_differences = get_difference(self.__memory_values, new_memory)
-        self.__memory_values = deepcopy(new_memory)
-        self.__register_values = deepcopy(new_registers)
-        for change_index, new_value in memory_differences.items():
-            self.cells[change_index].set(str(new_value))
-        for change_index, new_value in register_differences.items():
-            self.registers[change_index].set(str(new_value))
-        self.__load_special_registers()
-        self.cells[self.__machine.PC]["background"] = "Green"
-        self.cells[self.prev_run_cell]["background"] = "White"
-        self.prev_run_cell = self.__machine.PC
-
-    def __load_special_registers(self):
+        for change_index in snapshot.dirty_memory:
+            self.cells[change_index].set(f"{snapshot.memory[change_index]:02X}")
+        for change_index in snapshot.dirty_registers:
+            self.registers[change_index].set(f"{snapshot.registers[change_index]:02X}")
+        self.__load_special_registers(snapshot.PC, snapshot.IR)
+        self.__highlight_pc(snapshot.PC)
+        self.__check_monitor(snapshot.output)
+
+    def __highlight_pc(self, pc: Optional[int] = None) -> None:
+        """
+        Move the highlight to the cell under the PC.
+        :param pc: The PC, the machine's if None.
+        :return: None
+        """
+        pc = self.__machine.PC if pc is None else pc
+        if pc >= self.MEMORY_SIZE:
+            return
+        self.cells[self.prev_run_cell]["background"] = self.__cell_background(self.prev_run_cell)
+        self.cells[pc]["background"] = "Green"
+        self.prev_run_cell = pc
+
+    def __load_special_registers(self, pc: Optional[int] = None, ir: Optional[str] = None):
         """
         Load the special registers
+        :param pc: The PC, the machine's if None.
+        :param ir: The IR, the machine's if None.
         :return:
         """
         self.pc.delete(0, END)
-        self.pc.insert(0, f"{self.__machine.PC:02X}")
+        self.pc.insert(0, f"{self.__machine.PC if pc is None else pc:02X}")
         self.ir.delete(0, END)
-        self.ir.insert(0, str(self.__machine.IR))
+        self.ir.insert(0, str(self.__machine.IR if ir is None else ir))
 
     def __language_selection(self) -> None:
         """
@@ -1 +1,2 @@
-__all__ = ["assembler", "common_utils", "simulator", "disassembler"]
\ No newline at end of file
+__all__ = ["assembler", "common_utils", "simulator", "disassembler", "jit", "batch", "runner", "lexer", "parser",
+           "symbols", "incremental", "cache", "highlight", "worker", "debugger", "trace"]
@@ -1,9 +1,41 @@
-from re import sub
-from re import compile as regex_compile
 from typing import Dict, List, Tuple, Union
 from spacecat.common_utils import Cell
-from spacecat.instructions import INSTRUCTIONS, MATCH_TO_CONTESTED_INSTRUCTION
-from spacecat.preprocessor import preprocess
+from spacecat.instructions import INSTRUCTION_FORMS, Instruction
+from spacecat.lexer import AssemblyError
+from spacecat.parser import Data, Label, Operand, Operation, Origin, parse
+from spacecat.symbols import Fixup, SymbolTable
+
+# Version of the encoding, change it whenever the same source could assemble differently so cached images expire.
+ASSEMBLER_VERSION = "3"
+
+
+def fit_value(value: int, operand: Operand, nibbles: int) -> int:
+    """
+    Check a value fits the variable holding its operand.
+    :param value: Value of the operand.
+    :param operand: The operand, for errors.
+    :param nibbles: Number of nibbles of the variable.
+    :return: the value, negative bytes in two's complement.
+    """
+    if nibbles == 2 and -128 <= value < 0:
+        value &= 0xFF
+    if not 0 <= value < 16 ** nibbles:
+        raise AssemblyError(f"{operand.value} does not fit in {nibbles * 4} bits.", operand.line, operand.column)
+    return value
+
+
+def select_instruction(operation: Operation) -> Instruction:
+    """
+    Select the instruction a mnemonic assembles to from the kinds of its operands.
+    :param operation: Operation to assemble.
+    :return: the instruction.
+    """
+    kinds = tuple(operand.kind for operand in operation.operands)
+    instruction = INSTRUCTION_FORMS.get((operation.mnemonic, kinds))
+    if instruction is not None:
+        return instruction
+    shape = ", ".join(kind.value for kind in kinds) or "no operands"
+    raise AssemblyError(f"{operation.mnemonic} does not take {shape}.", operation.line, operation.column)
 
 
 class Assembler:
@@ -14,7 +46,11 @@ class Assembler:
     def __init__(self, string: str, mem_size: int):
         self.memory: List[Cell] = [Cell() for _ in range(mem_size)]
         self.string: str = string
-        self.__cleaned_string: str = ""
+        self.symbols = SymbolTable()
+        self.labels: Dict[str, int] = self.symbols.addresses
+        # Address and encoding of each statement in the order they were read, written to the memory once the fixups
+        # are patched into them, so a statement written over by a later one is never patched over it.
+        self.__encodings: List[Tuple[int, bytearray]] = []
 
     @staticmethod
     def instantiate(*args, **kwargs) -> "Assembler":
@@ -22,109 +58,107 @@ class Assembler:
         assembler_.__parse()
         return assembler_
 
-    def __raise_exception(self, message):
-        pass
+    def __resolve(self, operand: Operand, encoding: bytearray, offset: int, size: int, shift: int,
+                  nibbles: int) -> int:
+        """
+        Resolve the value of an operand, deferring words that cannot be resolved yet.
+        :param operand: Operand to resolve.
+        :param encoding: Encoding of the statement holding the operand.
+        :param offset: Offset of the first byte holding the operand in the encoding.
+        :param size: Number of bytes holding the operand.
+        :param shift: Position of the operand's variable in those bytes.
+        :param nibbles: Number of nibbles of the variable.
+        :return: the value, 0 if it was deferred.
+        """
+        value = operand.value
+        if isinstance(value, str):
+            value = self.symbols.resolve_now(value)
+            if value is None:
+                self.symbols.defer(Fixup(operand, encoding, offset, size, shift, nibbles))
+                return 0
+        return fit_value(value, operand, nibbles)
 
-    def __clean_string(self) -> None:
+    def __place(self, memory_pointer: int, encoding: bytearray, statement: Union[Operation, Data]) -> None:
         """
-        Clean the strings from tabs spaces and standardise it to be parsed.
+        Place the encoding of a statement at its address, to be written to the memory once the program is read.
+        :param memory_pointer: Address of the statement.
+        :param encoding: Bytes of the statement.
+        :param statement: The statement, for errors.
         :return: None.
         """
-        self.__cleaned_string = preprocess(self.string)
+        if encoding and not 0 <= memory_pointer <= len(self.memory) - len(encoding):
+            outside = memory_pointer if not 0 <= memory_pointer < len(self.memory) else len(self.memory)
+            raise AssemblyError(f"Address {outside:02X} is outside the memory.", statement.line, statement.column)
+        self.__encodings.append((memory_pointer, encoding))
 
-    def __generate_contested_instruction(self, mnemonic: str, line: str) -> str:
-        """
-        Generate a contested instruction which may resolve to multiple bytecode formats.
-        :param mnemonic: Mnemonic name
-        :param line: Line to translate
-        :return: the instruction.
+    def __write_operation(self, memory_pointer: int, operation: Operation) -> None:
         """
-        for match_case, matched in MATCH_TO_CONTESTED_INSTRUCTION:
-            if match_case(mnemonic, line):
-                return matched.assemble(line)
-        else:
-            self.__raise_exception(f"{mnemonic} is not a legal mnemonic.")
-
-    def __generate_uncontested_instruction(self, mnemonic, line) -> str:
-        """
-        Generate an uncontested instruction whose mnemonic bind to only one bytecode.
-        :param mnemonic: mnemonic name
-        :param line: line to translate
-        :return: none.
+        Assemble an operation.
+        :param memory_pointer: Address of the instruction.
+        :param operation: Operation to assemble.
+        :return: None.
         """
-        for instruction in INSTRUCTIONS:
-            if instruction.mnemonic_name == mnemonic:
-                return instruction.assemble(line)
-        else:
-            self.__raise_exception(f"{mnemonic} is not a legal mnemonic.")
+        instruction = select_instruction(operation)
+        encoding = bytearray(2)
+        values = [self.__resolve(operand, encoding, 0, 2, 4 * (4 - end), end - start)
+                  for operand, (start, end) in zip(operation.operands, instruction.operand_variables)]
+        encoding[:] = instruction.encode(values).to_bytes(2, "big")
+        self.__place(memory_pointer, encoding, operation)
 
-    def __generate_instruction(self, line) -> str:
-        """
-        Generate an instruction
-        :param line: Line to generate the instruction from.
-        :return: the generated instruction.
-        """
-        mnemonic = line.split(" ")[0]
-        if mnemonic in ["load", "store"]:
-            return self.__generate_contested_instruction(mnemonic, line)
-        else:
-            return self.__generate_uncontested_instruction(mnemonic, line)
+    def __write_data(self, memory_pointer: int, data: Data) -> int:
+        """
+        Assemble the contents of a db directive.
+        :param memory_pointer: Address of the contents.
+        :param data: The directive.
+        :return: the address following the contents.
+        """
+        encoding = bytearray()
+        for item in data.items:
+            if isinstance(item, str):
+                encoding.extend(ord(char) & 0xFF for char in item)
+            else:
+                encoding.append(self.__resolve(item, encoding, len(encoding), 1, 0, 2))
+        self.__place(memory_pointer, encoding, data)
+        return memory_pointer + len(encoding)
 
-    def __insert_instruction_into_memory(self, memory_pointer: int, instruction: str) -> None:
+    def __apply_fixups(self) -> None:
         """
-        Write a given instruction into memory.
-        :param memory_pointer: Memory pointer's current location.
-        :param instruction: Instruction to write to the memory.
+        Patch the references deferred while the program was read into the encodings of their statements.
         :return: None.
         """
-        self.memory[memory_pointer].value, self.memory[memory_pointer + 1].value = int(instruction[0:2], base=16), \
-                                                                                   int(instruction[2:4], base=16)
+        for fixup in self.symbols.fixups():
+            value = fit_value(self.symbols.resolve(fixup.operand), fixup.operand, fixup.nibbles)
+            end = fixup.offset + fixup.size
+            patched = int.from_bytes(fixup.encoding[fixup.offset:end], "big") | value << fixup.shift
+            fixup.encoding[fixup.offset:end] = patched.to_bytes(fixup.size, "big")
 
-    def __db_write_to_memory(self, memory_pointer: int, operands: List[str]) -> int:
+    def __write(self) -> None:
         """
-        Write the contents of the db directive to the memory
-        :param memory_pointer: current memory pointer
-        :param operands: operands to write into memory.
-        :return: new memory pointer.
-        """
-        for operand in operands:
-            for char in operand:
-                self.memory[memory_pointer].value = ord(char)
-                memory_pointer += 1
-        return memory_pointer
-
-    def __consume_directive(self, line: str, memory_pointer: int) -> int:
-        """
-        Consume the directives by modifying necessary parameters.
-        :param line: line with directive
-        :param memory_pointer: current memory pointer
-        :return: the new memory pointer after directive is consumed.
+        Write the encodings of the statements to the memory in the order they were read.
+        :return: None.
         """
-        if line.startswith("org"):
-            org_pointer: str = line.strip("org ")
-            return int(org_pointer, base=16)
-        else:
-            mnemonic, operands = line.split(" ", 1)
-            operands = operands.split(",")
-            memory_pointer = self.__db_write_to_memory(memory_pointer, operands)
-            return memory_pointer
+        for memory_pointer, encoding in self.__encodings:
+            for cell, value in zip(self.memory[memory_pointer:memory_pointer + len(encoding)], encoding):
+                cell.value = value
 
     def __parse(self) -> None:
         """
-        Parse the string.
+        Parse the string, assembling it in a single pass over its statements.
         :return:
         """
-        self.__clean_string()
-        lines = self.__cleaned_string.split("\n")
-        lines = list(filter(lambda line_: line_ != "", lines))
         memory_pointer: int = 0
-        for line in lines:
-            if line.startswith("org") or line.startswith("db"):
-                memory_pointer = self.__consume_directive(line, memory_pointer)
-                continue
-            instruction = self.__generate_instruction(line)
-            self.__insert_instruction_into_memory(memory_pointer, instruction)
-            memory_pointer += 2
+        for statement in parse(self.string).statements:
+            if isinstance(statement, Label):
+                self.symbols.define(statement, memory_pointer)
+            elif isinstance(statement, Origin):
+                memory_pointer = statement.address
+            elif isinstance(statement, Data):
+                memory_pointer = self.__write_data(memory_pointer, statement)
+            else:
+                self.__write_operation(memory_pointer, statement)
+                memory_pointer += 2
+        self.__apply_fixups()
+        self.__write()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,219 @@
+from typing import BinaryIO, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from spacecat.common_utils import Cell, ROTATIONS, float_addition_table
+
+# Rotation of every value by every factor the ROR instruction can rotate by without raising, [rotate_by, value].
+ROTATION_TABLE = np.frombuffer(b"".join(ROTATIONS), dtype=np.uint8).reshape(len(ROTATIONS), 256)
+
+
+class BatchSimulator:
+    """
+    Simulate many machines in lockstep, advancing every running machine by one instruction each step.
+
+    The machines follow the semantics of spacecat.simulator.Simulator, including a taken jump executed right after
+    another taken jump landing two bytes past its target. Instructions Simulator raises on, such as ADDF operands
+    whose exponents are too far apart or a rotation by more than 8, fault the machine executing them instead: it
+    stops and is flagged in faulted, leaving IR pointing at the instruction.
+    """
+    def __init__(self, machine_count: int, mem_size: int = 256, register_size: int = 16,
+                 stdout_register_indices: Sequence[int] = (15,)):
+        """
+        Initialise the machines.
+        :param machine_count: Number of machines to simulate.
+        :param mem_size: Size of the memory of each machine.
+        :param register_size: Size of the registers of each machine.
+        :param stdout_register_indices: Registers mapped to STDOUT.
+        """
+        self.machine_count = machine_count
+        self.mem_size = mem_size
+        self.register_size = register_size
+        self.stdout_register_indices = list(stdout_register_indices)
+        self.memory = np.zeros((machine_count, mem_size), dtype=np.uint8)
+        self.registers = np.zeros((machine_count, register_size), dtype=np.uint8)
+        self.PC = np.zeros(machine_count, dtype=np.int64)
+        self.IR = np.zeros(machine_count, dtype=np.uint16)
+        self.jumped = np.zeros(machine_count, dtype=bool)
+        self.halted = np.zeros(machine_count, dtype=bool)
+        self.faulted = np.zeros(machine_count, dtype=bool)
+        self.__outputs: List[List[str]] = [[] for _ in range(machine_count)]
+
+    @staticmethod
+    def __values(values: Union[bytes, Sequence[int], Sequence[Cell], np.ndarray]) -> np.ndarray:
+        """
+        Convert memory or register contents into an array.
+        :param values: Bytes, integers, Cells, or rows of bytes or an array with a row per machine.
+        :return: the values as an array.
+        """
+        if len(values) and isinstance(values[0], Cell):
+            values = [cell.value for cell in values]
+        elif isinstance(values, (bytes, bytearray)):
+            values = list(values)
+        elif len(values) and isinstance(values[0], (bytes, bytearray)):
+            values = [list(row) for row in values]
+        return np.asarray(values, dtype=np.uint8)
+
+    def load_memory(self, memory: Union[bytes, Sequence[int], Sequence[Cell], np.ndarray],
+                    machines: Optional[Sequence[int]] = None) -> None:
+        """
+        Load the memory of the machines, the rest of the memory is cleared.
+        :param memory: Memory shared by the machines, or an array with a row for each machine.
+        :param machines: Indices of the machines to load, all machines if None.
+        :return: None
+        """
+        values = self.__values(memory)
+        selected = slice(None) if machines is None else np.asarray(machines)
+        self.memory[selected] = 0
+        self.memory[selected, :values.shape[-1]] = values[..., :self.mem_size]
+
+    def load_registers(self, registers: Union[bytes, Sequence[int], Sequence[Cell], np.ndarray],
+                       machines: Optional[Sequence[int]] = None) -> None:
+        """
+        Load the registers of the machines, the rest of the registers are cleared.
+        :param registers: Registers shared by the machines, or an array with a row for each machine.
+        :param machines: Indices of the machines to load, all machines if None.
+        :return: None
+        """
+        values = self.__values(registers)
+        selected = slice(None) if machines is None else np.asarray(machines)
+        self.registers[selected] = 0
+        self.registers[selected, :values.shape[-1]] = values[..., :self.register_size]
+
+    def running(self) -> np.ndarray:
+        """
+        Return which machines can still execute an instruction.
+        :return: a boolean mask of the running machines.
+        """
+        return ~self.halted & ~self.faulted & (self.PC != self.mem_size)
+
+    def step(self) -> int:
+        """
+        Execute one instruction on every running machine.
+        :return: the number of machines that executed an instruction.
+        """
+        machines = np.flatnonzero(self.running())
+        fetchable = self.PC[machines] + 1 < self.mem_size
+        self.faulted[machines[~fetchable]] = True
+        machines = machines[fetchable]
+        pc = self.PC[machines]
+        high = self.memory[machines, pc].astype(np.int64)
+        low = self.memory[machines, pc + 1].astype(np.int64)
+        self.IR[machines] = high << 8 | low
+        op_code, left, middle, right = high >> 4, high & 0xF, low >> 4, low & 0xF
+        registers = self.registers
+
+        floating_point = op_code == 0x6
+        sums, addition_faults = self.__floating_point_addition(
+            registers[machines[floating_point], middle[floating_point]],
+            registers[machines[floating_point], right[floating_point]])
+        faults = np.zeros(machines.size, dtype=bool)
+        faults[floating_point] = addition_faults
+        faults |= np.isin(op_code, (0x1, 0x3)) & (low >= self.mem_size)
+        faults |= np.isin(op_code, (0xD, 0xE)) & (registers[machines, right] >= self.mem_size)
+        faults |= (op_code == 0xA) & (right > 8)
+        self.faulted[machines[faults]] = True
+        executed = ~faults
+        machines, pc, op_code, left, middle, right, low = (values[executed] for values in
+                                                           (machines, pc, op_code, left, middle, right, low))
+
+        def select(*op_codes: int) -> Tuple[np.ndarray, np.ndarray]:
+            mask = np.isin(op_code, op_codes)
+            return mask, machines[mask]
+
+        taken = np.zeros(machines.size, dtype=bool)
+        written = np.full(machines.size, -1, dtype=np.int64)
+        mask, selected = select(0x1)
+        registers[selected, left[mask]] = self.memory[selected, low[mask]]
+        mask, selected = select(0x2)
+        registers[selected, left[mask]] = low[mask]
+        mask, selected = select(0x3)
+        self.memory[selected, low[mask]] = registers[selected, left[mask]]
+        mask, selected = select(0x4)
+        registers[selected, right[mask]] = registers[selected, middle[mask]]
+        written[mask] = right[mask]
+        mask, selected = select(0x5)
+        registers[selected, left[mask]] = (registers[selected, middle[mask]].astype(np.int64) +
+                                           registers[selected, right[mask]]) & 0xFF
+        mask, selected = select(0x6)
+        registers[selected, left[mask]] = sums
+        for op, operator in ((0x7, np.bitwise_or), (0x8, np.bitwise_and), (0x9, np.bitwise_xor)):
+            mask, selected = select(op)
+            registers[selected, left[mask]] = operator(registers[selected, middle[mask]],
+                                                       registers[selected, right[mask]])
+        mask, selected = select(0xA)
+        registers[selected, left[mask]] = ROTATION_TABLE[right[mask], registers[selected, left[mask]]]
+        mask, selected = select(0xB)
+        taken[mask] = registers[selected, left[mask]] == registers[selected, 0]
+        mask, selected = select(0xC)
+        self.halted[selected] = True
+        mask, selected = select(0xD)
+        registers[selected, middle[mask]] = self.memory[selected, registers[selected, right[mask]]]
+        written[mask] = middle[mask]
+        mask, selected = select(0xE)
+        self.memory[selected, registers[selected, right[mask]]] = registers[selected, middle[mask]]
+        mask, selected = select(0xF)
+        taken[mask] = registers[selected, left[mask]] <= registers[selected, 0]
+        mask = np.isin(op_code, (0x1, 0x2, 0x5, 0x6, 0x7, 0x8, 0x9, 0xA))
+        written[mask] = left[mask]
+
+        jumped = self.jumped[machines]
+        self.PC[machines] = np.where(jumped, np.where(taken, low, pc) + 2, np.where(taken, low, pc + 2))
+        self.jumped[machines] = taken & ~jumped
+        for machine in machines[np.isin(written, self.stdout_register_indices)]:
+            self.__outputs[machine].append("".join(chr(registers[machine, index])
+                                                   for index in self.stdout_register_indices))
+        return machines.size
+
+    @staticmethod
+    def __floating_point_addition(operands_one: np.ndarray, operands_two: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Add pairs of registers as OctalFloats.
+        :param operands_one: First operands.
+        :param operands_two: Second operands.
+        :return: the sums of the pairs that could be added and a mask of the pairs that could not.
+        """
+        operands_one, operands_two = operands_one.astype(np.int64), operands_two.astype(np.int64)
+        faults = np.abs((operands_one >> 4 & 0x7) - (operands_two >> 4 & 0x7)) > 4
+        if not operands_one.size:
+            return np.zeros(0, dtype=np.uint8), faults
+        table = np.frombuffer(float_addition_table(), dtype=np.uint8)
+        return table[(operands_one << 8 | operands_two)[~faults]], faults
+
+    def run(self, max_steps: Optional[int] = None) -> int:
+        """
+        Step the machines until none of them are running.
+        :param max_steps: Maximum number of steps to take, unlimited if None.
+        :return: the number of steps taken.
+        """
+        steps = 0
+        while steps != max_steps and self.step():
+            steps += 1
+        return steps
+
+    def output(self, machine: int) -> str:
+        """
+        Return what a machine wrote to STDOUT.
+        :param machine: Index of the machine.
+        :return: the output.
+        """
+        return "".join(self.__outputs[machine])
+
+    def machine_state(self, machine: int) -> Tuple[bytes, bytes, int, str]:
+        """
+        Return the state of a machine, for comparison against a Simulator.
+        :param machine: Index of the machine.
+        :return: the memory, the registers, the PC and the IR of the machine.
+        """
+        return bytes(self.memory[machine]), bytes(self.registers[machine]), int(self.PC[machine]), \
+            format(int(self.IR[machine]), "04X")
+
+    def write_state(self, machine: int, file: BinaryIO) -> int:
+        """
+        Write the state of a machine in the *.svm format to a binary file, streaming its rows of the arrays.
+        :param machine: Index of the machine.
+        :param file: The file, opened for writing.
+        :return: the number of bytes written.
+        """
+        instruction = int(self.IR[machine])
+        # A machine that ran off the end of the memory has its PC past the last address, which a byte cannot hold.
+        return file.write(self.memory[machine]) + file.write(self.registers[machine]) + \
+            file.write(bytes((int(self.PC[machine]) & 0xFF, instruction >> 8, instruction & 0xFF)))
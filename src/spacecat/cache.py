@@ -0,0 +1,171 @@
+from hashlib import sha256
+from os import environ, getpid, makedirs, remove, replace, scandir, stat, utime
+from os.path import expanduser, join
+from time import time_ns
+from typing import List, Optional
+from spacecat.assembler import ASSEMBLER_VERSION, Assembler
+from spacecat.common_utils import Cell
+
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+IMAGE_EXTENSION = ".prg"
+TEMPORARY_EXTENSION = ".tmp"
+STALE_TEMPORARY_AGE = 60 * 60 * 10 ** 9  # Nanoseconds after which a temporary file is taken as left by a crashed writer.
+
+
+def default_cache_directory() -> str:
+    """
+    Return the directory programs are cached in unless told otherwise, $SPACECAT_CACHE or ~/.cache/spacecat.
+    :return: the directory.
+    """
+    return environ.get("SPACECAT_CACHE") or join(expanduser("~"), ".cache", "spacecat")
+
+
+def program_key(source: str, mem_size: int) -> str:
+    """
+    Return the key a program is cached under, which changes with the source, the memory size and the assembler.
+    :param source: Source of the program.
+    :param mem_size: Size of the memory it is assembled for.
+    :return: the key as a hexadecimal digest.
+    """
+    return sha256(f"{ASSEMBLER_VERSION}\0{mem_size}\0{source}".encode()).hexdigest()
+
+
+def program_image(memory: List[Cell]) -> bytes:
+    """
+    Return the memory in the *.prg format, as Simulator.dump_program_memory does.
+    :param memory: The memory.
+    :return: the image.
+    """
+    image = bytearray(len(memory) * 4)
+    image[::4] = bytes(cell.value for cell in memory)
+    return bytes(image)
+
+
+class ProgramCache:
+    """
+    Cache of assembled programs on disk, addressed by the hash of their source so that identical files share an entry.
+    Entries are memory images in the *.prg format, the least recently used ones are evicted once the cache grows
+    over its size. The size is kept as a running total, so that the directory is only scanned when the total goes
+    over it, the total being taken again from the scan as other processes may share the cache.
+    """
+    def __init__(self, directory: Optional[str] = None, max_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialise the cache.
+        :param directory: Directory holding the cache, created if missing, default_cache_directory() if None.
+        :param max_size: Maximum number of bytes the entries may take.
+        """
+        self.directory = directory or default_cache_directory()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.__size: Optional[int] = None  # Running total of the bytes the entries take, unknown until first needed.
+        makedirs(self.directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """
+        Return the path of an entry.
+        :param key: Key of the entry.
+        :return: the path.
+        """
+        return join(self.directory, key + IMAGE_EXTENSION)
+
+    def get(self, source: str, mem_size: int) -> Optional[bytes]:
+        """
+        Return the image of a program if it is cached, marking it as recently used.
+        :param source: Source of the program.
+        :param mem_size: Size of the memory it is assembled for.
+        :return: the image in the *.prg format, None if it is not cached.
+        """
+        path = self.path(program_key(source, mem_size))
+        try:
+            with open(path, "rb") as file:
+                image = file.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            utime(path)
+        except FileNotFoundError:  # Evicted by another process since it was read.
+            pass
+        return image
+
+    def put(self, source: str, mem_size: int, image: bytes) -> None:
+        """
+        Cache the image of a program, evicting the least recently used entries if the cache grows too large.
+        :param source: Source of the program.
+        :param mem_size: Size of the memory it is assembled for.
+        :param image: Image in the *.prg format.
+        :return: None
+        """
+        path = self.path(program_key(source, mem_size))
+        if self.__size is None:
+            self.__size = self.size()
+        try:
+            self.__size -= stat(path).st_size
+        except FileNotFoundError:
+            pass
+        # Written aside and renamed so that processes sharing the cache never read a partial image.
+        temporary_path = f"{path}.{getpid()}{TEMPORARY_EXTENSION}"
+        with open(temporary_path, "wb") as file:
+            file.write(image)
+        replace(temporary_path, path)
+        self.__size += len(image)
+        if self.__size > self.max_size:
+            self.__evict()
+
+    def assemble(self, source: str, mem_size: int = 256) -> bytes:
+        """
+        Return the image of a program, assembling and caching it unless it is cached already.
+        :param source: Source of the program.
+        :param mem_size: Size of the memory to assemble it for.
+        :return: the image in the *.prg format.
+        """
+        image = self.get(source, mem_size)
+        if image is None:
+            image = program_image(Assembler.instantiate(source, mem_size).memory)
+            self.put(source, mem_size, image)
+        return image
+
+    def size(self) -> int:
+        """
+        Return the number of bytes the entries take.
+        :return: the size.
+        """
+        with scandir(self.directory) as entries:
+            return sum(entry.stat().st_size for entry in entries if entry.name.endswith(IMAGE_EXTENSION))
+
+    def __evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache fits its size, along with the temporary files writers
+        that crashed left behind.
+        :return: None
+        """
+        images = []
+        stale = time_ns() - STALE_TEMPORARY_AGE
+        with scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(IMAGE_EXTENSION):
+                    status = entry.stat()
+                    images.append((status.st_mtime_ns, status.st_size, entry.path))
+                elif entry.name.endswith(TEMPORARY_EXTENSION) and entry.stat().st_mtime_ns < stale:
+                    self.__remove(entry.path)
+        total = sum(size for _, size, _ in images)
+        for _, size, path in sorted(images):
+            if total <= self.max_size:
+                break
+            self.__remove(path)
+            total -= size
+        self.__size = total
+
+    @staticmethod
+    def __remove(path: str) -> None:
+        """
+        Remove a file, which another process sharing the cache may have removed already.
+        :param path: Path of the file.
+        :return: None
+        """
+        try:
+            remove(path)
+        except FileNotFoundError:
+            pass
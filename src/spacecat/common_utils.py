@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Union, Callable, Tuple
 from os import system
 
@@ -34,6 +35,39 @@ def right_rotation(x: str, y: int) -> str:
     return new_bit
 
 
+def shift_bits(value: int, shift_by: int, bit_length: int = 8) -> int:
+    """
+    Integer equivalent of right_shift, moving the top shift_by bits of value to the bottom.
+    :param value: Value to shift.
+    :param shift_by: Shifting factor.
+    :param bit_length: Number of bits in the value.
+    :return: Shifted value.
+    :raises IndexError: if shift_by is greater than bit_length, as right_shift does.
+    """
+    if shift_by > bit_length:
+        raise IndexError("Cannot shift by more than the bit length.")
+    return value >> (bit_length - shift_by)
+
+
+def rotate_bits(value: int, rotate_by: int, bit_length: int = 8) -> int:
+    """
+    Integer equivalent of right_rotation.
+    :param value: Value to rotate.
+    :param rotate_by: Rotation factor.
+    :param bit_length: Number of bits in the value.
+    :return: Rotated value.
+    :raises IndexError: if rotate_by is greater than bit_length, as right_rotation does.
+    """
+    if rotate_by > bit_length:
+        raise IndexError("Cannot rotate by more than the bit length.")
+    return (value << rotate_by | value >> (bit_length - rotate_by)) & ((1 << bit_length) - 1)
+
+
+# Rotations of every byte, ROTATIONS[rotate_by][value], indexing past 8 raises IndexError as right_rotation does.
+ROTATIONS: Tuple[bytes, ...] = tuple(bytes(rotate_bits(value, rotate_by) for value in range(256))
+                                     for rotate_by in range(9))
+
+
 def clear_screen():
     system("cls")
 
@@ -101,6 +135,54 @@ class OctalFloat:
         return self.__binary_representation
 
 
+def float_addition(one: int, two: int) -> int:
+    """
+    Add two bytes as OctalFloats in the integer domain, matching int(OctalFloat(one) + OctalFloat(two)) % 256.
+    :param one: First operand.
+    :param two: Second operand.
+    :return: the sum.
+    :raises IndexError: if the exponents of the operands are 5 or more apart, which OctalFloat cannot shift.
+    """
+    exponent_difference = (two >> 4 & 0x7) - (one >> 4 & 0x7)
+    if abs(exponent_difference) > 4:
+        raise IndexError("OctalFloat cannot add floats whose exponents are 5 or more apart.")
+    operated, operand = (one, two) if exponent_difference >= 0 else (two, one)
+    operated_mantissa = (operated & 0xF) >> (4 - abs(exponent_difference))
+    number_whole = abs((-operated_mantissa if operated & 0x80 else operated_mantissa) +
+                       (-(operand & 0xF) if operand & 0x80 else operand & 0xF))
+    new_mantissa = number_whole >> max(number_whole.bit_length() - 4, 0)
+    # OctalFloat parses the bits of the sum as hexadecimal digits, so only the last two bits survive modulo 256.
+    return (new_mantissa >> 1 & 1) << 4 | new_mantissa & 1
+
+
+@lru_cache(maxsize=None)
+def float_addition_table() -> bytes:
+    """
+    Return the OctalFloat sum of every pair of bytes, indexed by one << 8 | two, building it on first use.
+    Pairs that OctalFloat cannot add hold 0.
+    :return: the table.
+    """
+    table = bytearray(0x10000)
+    for one in range(256):
+        for two in range(256):
+            if abs((two >> 4 & 0x7) - (one >> 4 & 0x7)) <= 4:
+                table[one << 8 | two] = float_addition(one, two)
+    return bytes(table)
+
+
+def add_floats(one: int, two: int) -> int:
+    """
+    Add two bytes as OctalFloats through the precomputed table.
+    :param one: First operand.
+    :param two: Second operand.
+    :return: the sum.
+    :raises IndexError: if the exponents of the operands are 5 or more apart, which OctalFloat cannot shift.
+    """
+    if abs((two >> 4 & 0x7) - (one >> 4 & 0x7)) > 4:
+        raise IndexError("OctalFloat cannot add floats whose exponents are 5 or more apart.")
+    return float_addition_table()[one << 8 | two]
+
+
 class Cell:
     """
     A memory cell.
@@ -155,6 +237,65 @@ class Cell:
         else:
             return False
 
+class CellView(Cell):
+    """
+    A memory cell backed by a byte of a shared buffer.
+    """
+    def __init__(self, buffer: bytearray, index: int):
+        """
+        Initialise a view over a byte of a buffer.
+        :param buffer: Buffer holding the value of the cell.
+        :param index: Index of the cell's byte in the buffer.
+        """
+        self.__buffer = buffer
+        self.__index = index
+
+    @property
+    def binary_value(self):
+        """
+        :return: Binary value of the value.
+        """
+        return format(self.__buffer[self.__index], "08b")
+
+    @property
+    def value(self) -> int:
+        """
+        Get the value of the cell
+        :return: Integer value of the cell.
+        """
+        return self.__buffer[self.__index]
+
+    @value.setter
+    def value(self, value: Union[str, int]) -> None:
+        """
+        Set the value of the cell, probably overflown.
+        :param value: New value to set
+        :return: None
+        """
+        if type(value) == str:
+            value = int(value, base=16)
+        self.__buffer[self.__index] = value % 256
+
+    def __repr__(self) -> str:
+        return format(self.__buffer[self.__index], "02X")
+
+    def __deepcopy__(self, memo) -> Cell:
+        """
+        Copy the value of the view, rather than the buffer behind it.
+        :return: A Cell holding the current value.
+        """
+        return Cell(repr(self))
+
+
+def cell_views(buffer: bytearray) -> List[CellView]:
+    """
+    Create Cell compatible views over every byte of a buffer.
+    :param buffer: Buffer to view.
+    :return: A list of views, one for each byte.
+    """
+    return [CellView(buffer, i) for i in range(len(buffer))]
+
+
 def mem_print(mem: List[Cell]):
     for i in range(16, 256, 16):
         for j in range(i - 16, i):
@@ -0,0 +1,187 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, List, Optional, Set, Tuple
+from spacecat.simulator import HaltReason, RunResult, Simulator
+
+Condition = Callable[[Simulator], bool]
+
+
+class StopKind(Enum):
+    BREAKPOINT = "breakpoint"
+    MEMORY = "memory watchpoint"
+    REGISTER = "register watchpoint"
+    CONDITION = "condition"
+
+
+@dataclass(frozen=True)
+class Stop:
+    """
+    Why the debugger stopped the machine. Breakpoints stop before the instruction at their address executes,
+    watchpoints and conditions after the instruction that triggered them.
+    """
+    kind: StopKind
+    location: int  # Address of the breakpoint or the memory cell, index of the register or of the condition.
+    old_value: Optional[int] = None
+    new_value: Optional[int] = None
+
+
+class Debugger:
+    """
+    Breakpoints, watchpoints and conditional breaks around a simulator. Its run has the signature of the simulator's.
+    Without any of them set it runs the simulator as it is, with a single breakpoint it runs it until the PC reaches
+    the breakpoint, which keeps the JIT, and only otherwise it runs an instrumented loop checking after every step.
+    Watchpoints stop when the value they watch changes.
+    """
+    def __init__(self, simulator: Simulator):
+        """
+        Initialise the debugger without anything set.
+        :param simulator: Simulator to debug.
+        """
+        self.simulator = simulator
+        self.breakpoints: Set[int] = set()
+        self.memory_watchpoints: Set[int] = set()
+        self.register_watchpoints: Set[int] = set()
+        self.conditions: List[Condition] = []
+        self.last_stop: Optional[Stop] = None
+
+    @staticmethod
+    def __toggle(points: Set[int], point: int) -> bool:
+        """
+        Toggle a breakpoint or a watchpoint.
+        :param points: Set the point belongs to.
+        :param point: The point.
+        :return: True if the point is now set.
+        """
+        if point in points:
+            points.discard(point)
+            return False
+        points.add(point)
+        return True
+
+    def toggle_breakpoint(self, address: int) -> bool:
+        """
+        Toggle a breakpoint.
+        :param address: Address of the breakpoint.
+        :return: True if the breakpoint is now set.
+        """
+        return self.__toggle(self.breakpoints, address)
+
+    def toggle_memory_watchpoint(self, address: int) -> bool:
+        """
+        Toggle a watchpoint on a memory cell.
+        :param address: Address of the cell.
+        :return: True if the watchpoint is now set.
+        """
+        return self.__toggle(self.memory_watchpoints, address)
+
+    def toggle_register_watchpoint(self, index: int) -> bool:
+        """
+        Toggle a watchpoint on a register.
+        :param index: Index of the register.
+        :return: True if the watchpoint is now set.
+        """
+        return self.__toggle(self.register_watchpoints, index)
+
+    def add_condition(self, condition: Condition) -> None:
+        """
+        Stop once a condition holds after a step.
+        :param condition: Function of the simulator returning True to stop.
+        :return: None
+        """
+        self.conditions.append(condition)
+
+    def active(self) -> bool:
+        """
+        Return if anything is set.
+        :return: True if a breakpoint, a watchpoint or a condition is set.
+        """
+        return bool(self.breakpoints or self.memory_watchpoints or self.register_watchpoints or self.conditions)
+
+    def __watched(self) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """
+        Read the values under the watchpoints.
+        :return: the watched addresses and registers with their values.
+        """
+        memory, registers = self.simulator.return_memory(), self.simulator.return_registers()
+        return ([(address, memory[address].value) for address in sorted(self.memory_watchpoints)],
+                [(index, registers[index].value) for index in sorted(self.register_watchpoints)])
+
+    def __check(self, watched_memory: List[Tuple[int, int]], watched_registers: List[Tuple[int, int]],
+                breakpoints: bool = True) -> Optional[Stop]:
+        """
+        Check the watchpoints, the conditions and the breakpoints after a step.
+        :param watched_memory: Watched addresses and their values before the step.
+        :param watched_registers: Watched registers and their values before the step.
+        :param breakpoints: Whether to check the breakpoints, which a machine that stopped on its own does not reach.
+        :return: why the machine should stop, None if it should not.
+        """
+        simulator = self.simulator
+        memory, registers = simulator.return_memory(), simulator.return_registers()
+        for address, value in watched_memory:
+            if memory[address].value != value:
+                return Stop(StopKind.MEMORY, address, value, memory[address].value)
+        for index, value in watched_registers:
+            if registers[index].value != value:
+                return Stop(StopKind.REGISTER, index, value, registers[index].value)
+        for index, condition in enumerate(self.conditions):
+            if condition(simulator):
+                return Stop(StopKind.CONDITION, index)
+        if breakpoints and simulator.PC in self.breakpoints:
+            return Stop(StopKind.BREAKPOINT, simulator.PC)
+        return None
+
+    def run(self, max_steps: Optional[int] = None, until_pc: Optional[int] = None) -> RunResult:
+        """
+        Run the machine until it stops on its own or the debugger stops it, which last_stop describes.
+        :param max_steps: Maximum number of instructions to execute, unlimited if None.
+        :param until_pc: Stop once the PC reaches this address.
+        :return: the result of the run, BREAK if the debugger stopped it.
+        """
+        self.last_stop = None
+        simulator = self.simulator
+        if not self.active():
+            return simulator.run(max_steps, until_pc)
+        if until_pc is None and len(self.breakpoints) == 1 and \
+                not (self.memory_watchpoints or self.register_watchpoints or self.conditions):
+            breakpoint_ = next(iter(self.breakpoints))
+            result = simulator.run(max_steps, until_pc=breakpoint_)
+            if result.halt_reason == HaltReason.REACHED_PC:
+                self.last_stop = Stop(StopKind.BREAKPOINT, breakpoint_)
+                result.halt_reason = HaltReason.BREAK
+            return result
+        steps = 0
+        output: List[str] = []
+        watched = self.__watched()
+        while steps != max_steps:
+            result = simulator.run(max_steps=1)
+            steps += result.steps
+            output.append(result.output)
+            if result.halt_reason != HaltReason.STEP_LIMIT:
+                # The step the machine stopped on can still have written to a watched value.
+                self.last_stop = self.__check(*watched, breakpoints=False) if result.steps else None
+                halt_reason = result.halt_reason if self.last_stop is None else HaltReason.BREAK
+                return RunResult(steps, halt_reason, "".join(output))
+            if simulator.PC == until_pc:
+                return RunResult(steps, HaltReason.REACHED_PC, "".join(output))
+            self.last_stop = self.__check(*watched)
+            if self.last_stop is not None:
+                return RunResult(steps, HaltReason.BREAK, "".join(output))
+            if self.memory_watchpoints or self.register_watchpoints:
+                watched = self.__watched()
+        return RunResult(steps, HaltReason.STEP_LIMIT, "".join(output))
+
+    def run_back(self, max_steps: Optional[int] = None) -> int:
+        """
+        Step the machine back until its PC reaches a breakpoint or its history runs out, see Simulator.keep_history.
+        :param max_steps: Maximum number of steps to undo, unlimited if None.
+        :return: the number of steps undone.
+        """
+        self.last_stop = None
+        simulator = self.simulator
+        steps = 0
+        while steps != max_steps and simulator.step_back():
+            steps += 1
+            if simulator.PC in self.breakpoints:
+                self.last_stop = Stop(StopKind.BREAKPOINT, simulator.PC)
+                break
+        return steps
@@ -1,13 +1,15 @@
 from typing import List, Tuple, Final
-from spacecat.instructions import Instruction, INSTRUCTIONS
+from spacecat.instructions import Instruction, INSTRUCTIONS_BY_FIRST_BYTE
 
 
 def determine_instruction(instruction: str) -> str:
-    for instruction_ in INSTRUCTIONS:
-        if instruction[0:2] == instruction_.immutable_byte_index or \
-           instruction[0:1] == instruction_.immutable_byte_index:
-            return instruction_.construct(instruction)
-    return ""
+    try:
+        instruction_ = INSTRUCTIONS_BY_FIRST_BYTE[int(instruction[0:2], base=16)]
+    except (ValueError, IndexError):
+        return ""
+    if instruction_ is None:
+        return ""
+    return instruction_.construct(instruction)
 
 
 def disassemble(instructions: List[str]) -> List[str]:
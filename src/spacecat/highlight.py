@@ -0,0 +1,116 @@
+from time import perf_counter
+from typing import Callable, Dict, List, Set, Tuple
+from spacecat.parser import MNEMONICS
+
+MNEMONIC = "mnemonic"
+COMMENT = "comment"
+TAGS = (MNEMONIC, COMMENT)
+FRAME_BUDGET = 0.008  # Seconds of highlighting per frame, half a frame at 60 FPS.
+
+Span = Tuple[int, int, int]  # Line, starting from 1, and the start and end columns of a tagged span.
+
+
+def highlight_line(line: str) -> List[Tuple[str, int, int]]:
+    """
+    Find the mnemonics and the comment of a line in a single scan, words are matched whole so that or is not found in
+    store and nothing in a string is highlighted.
+    :param line: The line.
+    :return: the tag, start and end column of each span.
+    """
+    spans: List[Tuple[str, int, int]] = []
+    word_start = -1
+    quote = ""
+    for column, char in enumerate(line):
+        if quote:
+            if char == quote:
+                quote = ""
+            continue
+        if char.isalnum() or char == "_":
+            if word_start < 0:
+                word_start = column
+            continue
+        if word_start >= 0:
+            if line[word_start:column].lower() in MNEMONICS:
+                spans.append((MNEMONIC, word_start, column))
+            word_start = -1
+        if char in "\"'":
+            quote = char
+        elif char == ";":
+            spans.append((COMMENT, column, len(line)))
+            return spans
+    if word_start >= 0 and line[word_start:].lower() in MNEMONICS:
+        spans.append((MNEMONIC, word_start, len(line)))
+    return spans
+
+
+def changed_lines(previous: List[str], current: List[str]) -> Tuple[int, int, int]:
+    """
+    Find the lines an edit touched by skipping the lines both versions start and end with.
+    :param previous: Lines before the edit.
+    :param current: Lines after the edit.
+    :return: the index of the first touched line, the index following the touched lines in the current version and
+        the number of lines the edit added, negative if it removed lines.
+    """
+    shortest = min(len(previous), len(current))
+    start = 0
+    while start < shortest and previous[start] == current[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and previous[-1 - end] == current[-1 - end]:
+        end += 1
+    return start, len(current) - end, len(current) - len(previous)
+
+
+class Highlighter:
+    """
+    Highlighter remembering the lines of a text, so that after an edit it only tags the lines the edit touched.
+    Lines waiting to be tagged are handed out a frame budget at a time, keeping the editor responsive on long texts.
+    """
+    def __init__(self):
+        """
+        Initialise the highlighter with an empty text.
+        """
+        self.lines: List[str] = []
+        self.pending: Set[int] = set()  # Indices of the lines waiting to be tagged.
+
+    def edit(self, text: str) -> None:
+        """
+        Take the new version of the text, queueing the lines that changed.
+        :param text: The text.
+        :return: None
+        """
+        lines = text.split("\n")
+        start, end, added = changed_lines(self.lines, lines)
+        if added:
+            # Lines queued after the edit moved along with the text.
+            self.pending = {index if index < start else index + added for index in self.pending
+                            if index < start or index >= end - added}
+        self.pending.update(range(start, end))
+        self.lines = lines
+
+    def highlight(self, budget: float = FRAME_BUDGET, clock: Callable[[], float] = perf_counter) -> \
+            Tuple[List[Tuple[int, int]], Dict[str, List[Span]]]:
+        """
+        Tag queued lines until the budget runs out.
+        :param budget: Seconds to spend.
+        :param clock: Clock the budget is measured on, read once before the lines and after each line.
+        :return: the runs of consecutive lines tagged, as the first and the last line starting from 1, their old tags
+            should be removed, and the spans of each tag in them.
+        """
+        deadline = clock() + budget
+        runs: List[Tuple[int, int]] = []
+        spans: Dict[str, List[Span]] = {tag: [] for tag in TAGS}
+        for index in sorted(self.pending):
+            self.pending.discard(index)
+            if index >= len(self.lines):
+                continue
+            line = index + 1
+            if runs and runs[-1][1] == index:
+                runs[-1] = (runs[-1][0], line)
+            else:
+                runs.append((line, line))
+            for tag, start, end in highlight_line(self.lines[index]):
+                spans[tag].append((line, start, end))
+            if clock() >= deadline:
+                break
+        return runs, spans
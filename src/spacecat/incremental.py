@@ -0,0 +1,144 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+from spacecat.assembler import fit_value, select_instruction
+from spacecat.lexer import AssemblyError
+from spacecat.parser import Data, Label, Operand, Operation, Origin, parse
+from spacecat.symbols import SymbolTable
+
+
+@dataclass
+class SourceLine:
+    """
+    A line of source, parsed once for as long as a line with the same text is in the program.
+    Its encoding only depends on the values its words resolve to, so it is kept until one of them changes.
+    """
+    labels: List[Label]
+    statement: Optional[Union[Operation, Origin, Data]]
+    size: int
+    words: Tuple[str, ...]
+    encoded: Optional[bytes] = None
+    resolved: Tuple[Optional[int], ...] = field(default_factory=tuple)
+
+
+def relocate(error: AssemblyError, line: int) -> AssemblyError:
+    """
+    Move an error raised while reading a single line to the line's place in the program.
+    :param error: The error.
+    :param line: Number of the line in the program.
+    :return: the moved error.
+    """
+    return AssemblyError(error.message, line, error.column)
+
+
+class IncrementalAssembler:
+    """
+    Assembler keeping the lines of the program it last assembled, so that assembling an edited version only parses
+    the edited lines and only encodes them and the lines referencing labels that moved.
+    The whole program is laid out again on every update, which is a sum over the sizes of the lines.
+    """
+    def __init__(self, mem_size: int):
+        """
+        Initialise the assembler with an empty program.
+        :param mem_size: Size of the memory.
+        """
+        self.mem_size = mem_size
+        self.memory = bytearray(mem_size)
+        self.labels: Dict[str, int] = {}
+        self.encoded_lines: int = 0  # Lines encoded by the last update.
+        self.__lines: Dict[str, SourceLine] = {}
+
+    @staticmethod
+    def __read(text: str, number: int) -> SourceLine:
+        """
+        Parse a line of source.
+        :param text: The line.
+        :param number: Number of the line, for errors.
+        :return: the parsed line.
+        """
+        try:
+            statements = parse(text).statements
+        except AssemblyError as error:
+            raise relocate(error, number) from None
+        labels = [statement for statement in statements if isinstance(statement, Label)]
+        statement = statements[-1] if statements and not isinstance(statements[-1], Label) else None
+        operands: List[Operand] = []
+        size = 0
+        if isinstance(statement, Operation):
+            operands, size = statement.operands, 2
+        elif isinstance(statement, Data):
+            operands = [item for item in statement.items if isinstance(item, Operand)]
+            size = sum(len(item) if isinstance(item, str) else 1 for item in statement.items)
+        words = tuple(operand.value for operand in operands if isinstance(operand.value, str))
+        return SourceLine(labels, statement, size, words)
+
+    @staticmethod
+    def __value(operand: Operand, symbols: SymbolTable, nibbles: int) -> int:
+        """
+        Resolve an operand once every label of the program is known.
+        :param operand: The operand.
+        :param symbols: Labels of the program.
+        :param nibbles: Number of nibbles of the variable holding the operand.
+        :return: the value.
+        """
+        value = symbols.resolve(operand) if isinstance(operand.value, str) else operand.value
+        return fit_value(value, operand, nibbles)
+
+    def __encode(self, statement: Union[Operation, Data], symbols: SymbolTable) -> bytes:
+        """
+        Encode an operation or the contents of a db directive.
+        :param statement: The statement.
+        :param symbols: Labels of the program.
+        :return: the bytes of the statement.
+        """
+        if isinstance(statement, Data):
+            return bytes(value for item in statement.items for value in
+                         ((ord(char) for char in item) if isinstance(item, str) else
+                          (self.__value(item, symbols, 2),)))
+        instruction = select_instruction(statement)
+        encoded = instruction.encode([self.__value(operand, symbols, end - start) for operand, (start, end) in
+                                      zip(statement.operands, instruction.operand_variables)])
+        return bytes((encoded >> 8, encoded & 0xFF))
+
+    def update(self, string: str) -> Dict[int, int]:
+        """
+        Assemble a new version of the program. The previous version is kept when the new one has errors.
+        :param string: The program.
+        :return: the addresses and the new values of the bytes that changed since the last update.
+        """
+        lines: Dict[str, SourceLine] = {}
+        symbols = SymbolTable()
+        placed: List[Tuple[int, SourceLine, int]] = []
+        memory_pointer = 0
+        for number, text in enumerate(string.split("\n"), start=1):
+            line = lines.get(text) or self.__lines.get(text) or self.__read(text, number)
+            lines[text] = line
+            try:
+                for label in line.labels:
+                    symbols.define(label, memory_pointer)
+            except AssemblyError as error:
+                raise relocate(error, number) from None
+            if isinstance(line.statement, Origin):
+                memory_pointer = line.statement.address
+            elif line.statement is not None:
+                placed.append((number, line, memory_pointer))
+                memory_pointer += line.size
+        memory = bytearray(self.mem_size)
+        encoded_lines = 0
+        for number, line, address in placed:
+            resolved = tuple(symbols.lookup(word) for word in line.words)
+            if line.encoded is None or resolved != line.resolved:
+                try:
+                    line.encoded = self.__encode(line.statement, symbols)
+                except AssemblyError as error:
+                    raise relocate(error, number) from None
+                line.resolved = resolved
+                encoded_lines += 1
+            end = address + len(line.encoded)
+            if address < 0 or end > self.mem_size:
+                outside = address if not 0 <= address < self.mem_size else self.mem_size
+                raise AssemblyError(f"Address {outside:02X} is outside the memory.", number, line.statement.column)
+            memory[address:end] = line.encoded
+        changes = {address: value for address, (previous, value) in enumerate(zip(self.memory, memory))
+                   if previous != value}
+        self.memory, self.labels, self.__lines, self.encoded_lines = memory, symbols.addresses, lines, encoded_lines
+        return changes
@@ -1,8 +1,18 @@
 from dataclasses import dataclass
-from typing import Final, List, Tuple
+from enum import Enum
+from typing import Dict, Final, List, Optional, Sequence, Tuple
 from string import hexdigits
 
 
+class OperandKind(Enum):
+    REGISTER = "register"
+    VALUE = "value"
+    ADDRESS = "[address]"
+    POINTER = "R[register]"
+    EQUALS = "register=R0"
+    LESS_OR_EQUAL = "register<=R0"
+
+
 @dataclass
 class Instruction:
     immutable_byte_index: str
@@ -10,6 +20,7 @@ class Instruction:
     variable_indexes: List[Tuple[int, int]]
     variable_prefixes: List[str]
     variable_suffixes: List[str]
+    operand_kinds: Tuple[OperandKind, ...] = ()
 
     def construct(self, instruction: str) -> str:
         variables = [instruction[i:j] for i, j in self.variable_indexes]
@@ -24,6 +35,25 @@ class Instruction:
         var_start = self.variable_indexes[index][1]
         return var_stop - var_start
 
+    @property
+    def operand_variables(self) -> List[Tuple[int, int]]:
+        """
+        Return the variables of the operands in the order they are written, move writes its registers reversed.
+        :return: the start and end nibble of each variable.
+        """
+        return self.variable_indexes[::-1] if self.mnemonic_name == "move" else self.variable_indexes
+
+    def encode(self, values: Sequence[int]) -> int:
+        """
+        Encode the instruction from the values of its operands in the order they are written.
+        :param values: Values of the operands, each fitting the nibbles of its variable.
+        :return: the instruction.
+        """
+        instruction = int(self.immutable_byte_index, base=16) << 4 * (4 - len(self.immutable_byte_index))
+        for (start, end), value in zip(self.operand_variables, values):
+            instruction |= value << 4 * (4 - end)
+        return instruction
+
     def assemble(self, line: str) -> str:
         mnemonic, *variable_bloc = line.split(" ", 1)
         if mnemonic == "halt":
@@ -37,23 +67,33 @@ class Instruction:
         return ''.join(filter(lambda char: char in hexdigits, ins))
 
 
-THREE_REGISTER_ARITHMATIC = [[(1, 2), (2, 3), (3, 4)], ["R", "R", "R"], ["", "", ""]]
-INSTRUCTIONS: Final[List['Instruction']] = [Instruction("1", "load", [(1, 2), (2, 4)], ["R", "["], ["", "h]"]),
-                                            Instruction("2", "load", [(1, 2), (2, 4)], ["R", ""], ["", "h"]),
-                                            Instruction("3", "store", [(1, 2), (2, 4)], ["R", "["], ["", "h]"]),
-                                            Instruction("40", "move", [(2, 3), (3, 4)], ["R", "R"], ["", ""]),
+REGISTER, VALUE, ADDRESS, POINTER = OperandKind.REGISTER, OperandKind.VALUE, OperandKind.ADDRESS, OperandKind.POINTER
+THREE_REGISTER_ARITHMATIC = [[(1, 2), (2, 3), (3, 4)], ["R", "R", "R"], ["", "", ""], (REGISTER, REGISTER, REGISTER)]
+INSTRUCTIONS: Final[List['Instruction']] = [Instruction("1", "load", [(1, 2), (2, 4)], ["R", "["], ["", "h]"],
+                                                        (REGISTER, ADDRESS)),
+                                            Instruction("2", "load", [(1, 2), (2, 4)], ["R", ""], ["", "h"],
+                                                        (REGISTER, VALUE)),
+                                            Instruction("3", "store", [(1, 2), (2, 4)], ["R", "["], ["", "h]"],
+                                                        (REGISTER, ADDRESS)),
+                                            Instruction("40", "move", [(2, 3), (3, 4)], ["R", "R"], ["", ""],
+                                                        (REGISTER, REGISTER)),
                                             Instruction("5", "addi", *THREE_REGISTER_ARITHMATIC),
                                             Instruction("6", "addf", *THREE_REGISTER_ARITHMATIC),
                                             Instruction("7", "or", *THREE_REGISTER_ARITHMATIC),
                                             Instruction("8", "and", *THREE_REGISTER_ARITHMATIC),
                                             Instruction("9", "xor", *THREE_REGISTER_ARITHMATIC),
-                                            Instruction("A", "ror", [(1, 2), (3, 4)], ["R", ""], ["", ""]),
-                                            Instruction("B0", "jmp", [(2, 4)], [""], ["h"]),
-                                            Instruction("B", "jmpeq", [(1, 2), (2, 4)], ["R", ""], ["=R0", "h"]),
-                                            Instruction("C0", "halt", [], [], []),
-                                            Instruction("D0", "load", [(2, 3), (3, 4)], ["R", "R["], ["", "]"]),
-                                            Instruction("E0", "store", [(2, 3), (3, 4)], ["R", "R["], ["", "]"]),
-                                            Instruction("F", "jmple", [(1, 2), (2, 4)], ["R", ""], ["<=R0", "h"])]
+                                            Instruction("A", "ror", [(1, 2), (3, 4)], ["R", ""], ["", ""],
+                                                        (REGISTER, VALUE)),
+                                            Instruction("B0", "jmp", [(2, 4)], [""], ["h"], (VALUE,)),
+                                            Instruction("B", "jmpeq", [(1, 2), (2, 4)], ["R", ""], ["=R0", "h"],
+                                                        (OperandKind.EQUALS, VALUE)),
+                                            Instruction("C0", "halt", [], [], [], ()),
+                                            Instruction("D0", "load", [(2, 3), (3, 4)], ["R", "R["], ["", "]"],
+                                                        (REGISTER, POINTER)),
+                                            Instruction("E0", "store", [(2, 3), (3, 4)], ["R", "R["], ["", "]"],
+                                                        (REGISTER, POINTER)),
+                                            Instruction("F", "jmple", [(1, 2), (2, 4)], ["R", ""], ["<=R0", "h"],
+                                                        (OperandKind.LESS_OR_EQUAL, VALUE))]
 
 
 MATCH_TO_CONTESTED_INSTRUCTION = [
@@ -62,4 +102,25 @@ MATCH_TO_CONTESTED_INSTRUCTION = [
     (lambda mnemonic, line: mnemonic == "store" and "[" in line and "r[" not in line, INSTRUCTIONS[2]),
     (lambda mnemonic, line: mnemonic == "store" and "r[" in line, INSTRUCTIONS[14]),
     (lambda mnemonic, line: mnemonic == "load" and "r[" in line, INSTRUCTIONS[13])
-]
\ No newline at end of file
+]
+
+# Instructions by their mnemonic and the kinds of their operands, the form they are written in.
+INSTRUCTION_FORMS: Final[Dict[Tuple[str, Tuple[OperandKind, ...]], Instruction]] = {
+    (instruction.mnemonic_name, instruction.operand_kinds): instruction for instruction in INSTRUCTIONS}
+
+
+def __first_byte_instruction(first_byte: str) -> Optional[Instruction]:
+    """
+    Return the first instruction whose immutable part prefixes a first byte.
+    :param first_byte: First byte of an instruction, as two hexadecimal digits.
+    :return: the instruction, None if no instruction starts with the byte.
+    """
+    for instruction in INSTRUCTIONS:
+        if first_byte == instruction.immutable_byte_index or first_byte[0] == instruction.immutable_byte_index:
+            return instruction
+    return None
+
+
+# Instructions by the first byte of their encoding, for disassembly.
+INSTRUCTIONS_BY_FIRST_BYTE: Final[Tuple[Optional[Instruction], ...]] = tuple(
+    __first_byte_instruction(format(first_byte, "02X")) for first_byte in range(256))
@@ -0,0 +1,204 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from spacecat.common_utils import float_addition_table
+
+BlockFunction = Callable[[bytearray, bytearray, Callable[[int], None], int], Tuple[int, bool, bool, int]]
+
+
+class Bailout(Exception):
+    """
+    Raised by a compiled block to hand an instruction it cannot execute back to the simulator.
+    """
+    def __init__(self, pc: int, jumped: bool):
+        """
+        Initialise the bailout.
+        :param pc: Address of the instruction.
+        :param jumped: Whether the instruction was reached by a taken jump.
+        """
+        super().__init__(pc, jumped)
+        self.pc = pc
+        self.jumped = jumped
+
+
+class Block:
+    """
+    A basic block of straight-line instructions compiled into a Python function.
+    """
+    def __init__(self, start: int, code: bytes, function: Optional[BlockFunction], length: int,
+                 last_instruction: int):
+        """
+        Initialise a compiled block.
+        :param start: Address of the first instruction.
+        :param code: Memory the block was compiled from.
+        :param function: Compiled function taking the registers, the memory, the STDOUT callback and the maximum
+            number of times to run the block, returning the next PC, whether it jumped, whether it halted and the
+            number of times the block ran. None if nothing at start can be compiled.
+        :param length: Number of instructions in the block.
+        :param last_instruction: Last instruction of the block, which is left in IR.
+        """
+        self.start = start
+        self.end = start + len(code)
+        self.code = code
+        self.function = function
+        self.length = length
+        self.last_instruction = last_instruction
+        self.starts_with_jump = length == 1 and last_instruction >> 12 in (0xB, 0xF)
+
+    def passes(self, address: int) -> bool:
+        """
+        Return if the PC points to address in the middle of the block.
+        :param address: Address to check.
+        :return: True if the block steps over the address without stopping.
+        """
+        return self.start < address < self.end
+
+
+class BlockCompiler:
+    """
+    Translate basic blocks of a compact simulator's memory into Python functions.
+
+    A block ends at a jump, a halt or a store, so a store that modifies the program takes effect before the next
+    instruction is fetched. Blocks are cached with the memory they were compiled from and recompiled when a store,
+    or any other write, changes it. A block that jumps back to its own start loops inside its function, as it
+    cannot contain a store its code cannot change while it loops. An ADDF whose operands OctalFloat cannot add raises
+    Bailout, leaving the simulator to execute it and raise.
+    """
+    __MAX_BLOCK_LENGTH = 64
+    __TERMINATORS = (0x3, 0xB, 0xC, 0xE, 0xF)
+
+    def __init__(self, mem_size: int, stdout_register_indices: List[int]):
+        """
+        Initialise the compiler.
+        :param mem_size: Size of the memory.
+        :param stdout_register_indices: Registers mapped to STDOUT, writing to them calls the STDOUT callback.
+        """
+        self.mem_size = mem_size
+        self.stdout_register_indices = stdout_register_indices
+        self.__blocks: Dict[int, Block] = {}
+
+    def lookup(self, memory: bytearray, pc: int) -> Block:
+        """
+        Return the block starting at the pc, compiling it unless the cached one is still valid.
+        :param memory: Memory of the simulator.
+        :param pc: Address of the block.
+        :return: the block.
+        """
+        block = self.__blocks.get(pc)
+        if block is None or memory[pc:block.end] != block.code:
+            block = self.compile(memory, pc)
+            self.__blocks[pc] = block
+        return block
+
+    def __can_compile(self, instruction: int) -> bool:
+        """
+        Return if an instruction can be compiled, instructions that may raise are left to the simulator.
+        :param instruction: The instruction.
+        :return: True if it can be compiled.
+        """
+        op_code = instruction >> 12
+        if op_code in (0x1, 0x3):
+            return instruction & 0xFF < self.mem_size
+        elif op_code in (0xD, 0xE):
+            return self.mem_size == 256
+        elif op_code == 0xA:
+            return instruction & 0xF <= 8
+        return True
+
+    def __translate(self, instruction: int, start: Optional[int], end: int) -> List[str]:
+        """
+        Translate an instruction to Python statements.
+        :param instruction: Instruction to translate.
+        :param start: Address of the block, jumping to it continues the loop of the block. None if it may not loop,
+            which is only the case for the first instruction of the block.
+        :param end: Address of the next instruction.
+        :return: the statements.
+        """
+        op_code = instruction >> 12
+        left, middle, right, low = instruction >> 8 & 0xF, instruction >> 4 & 0xF, instruction & 0xF, \
+            instruction & 0xFF
+        written: Optional[int] = left
+        if op_code == 0x1:
+            statements = [f"r[{left}] = m[{low}]"]
+        elif op_code == 0x2:
+            statements = [f"r[{left}] = {low}"]
+        elif op_code == 0x3:
+            statements, written = [f"m[{low}] = r[{left}]", f"return {end}, False, False, iteration"], None
+        elif op_code == 0x4:
+            statements, written = [f"r[{right}] = r[{middle}]"], right
+        elif op_code == 0x5:
+            statements = [f"r[{left}] = (r[{middle}] + r[{right}]) & 255"]
+        elif op_code == 0x6:
+            # The first instruction of a looping block is reached by the jump closing the previous iteration.
+            jumped = "iteration > 1" if start is None else "False"
+            statements = [f"if abs((r[{middle}] >> 4 & 7) - (r[{right}] >> 4 & 7)) > 4: "
+                          f"raise Bailout({end - 2}, {jumped})",
+                          f"r[{left}] = additions[r[{middle}] << 8 | r[{right}]]"]
+        elif op_code in (0x7, 0x8, 0x9):
+            operator = {0x7: "|", 0x8: "&", 0x9: "^"}[op_code]
+            statements = [f"r[{left}] = r[{middle}] {operator} r[{right}]"]
+        elif op_code == 0xA:
+            statements = [f"r[{left}] = (r[{left}] << {right} | r[{left}] >> {8 - right}) & 255"]
+        elif op_code == 0xB:
+            statements, written = [f"if r[{left}] == r[0]:", self.__jump(low, start),
+                                   f"return {end}, False, False, iteration"], None
+        elif op_code == 0xC:
+            statements, written = [f"return {end}, False, True, iteration"], None
+        elif op_code == 0xD:
+            statements, written = [f"r[{middle}] = m[r[{right}]]"], middle
+        elif op_code == 0xE:
+            statements, written = [f"m[r[{right}]] = r[{middle}]", f"return {end}, False, False, iteration"], None
+        elif op_code == 0xF:
+            statements, written = [f"if r[{left}] <= r[0]:", self.__jump(low, start),
+                                   f"return {end}, False, False, iteration"], None
+        else:
+            statements, written = [], None
+        if written in self.stdout_register_indices:
+            statements.append(f"awaken({written})")
+        return statements
+
+    @staticmethod
+    def __jump(jump_to: int, start: Optional[int]) -> str:
+        """
+        Translate a taken jump.
+        :param jump_to: Address jumped to.
+        :param start: Address of the block, None if it may not loop.
+        :return: the statement.
+        """
+        if jump_to == start:
+            return "    continue"
+        return f"    return {jump_to}, True, False, iteration"
+
+    def compile(self, memory: bytearray, pc: int) -> Block:
+        """
+        Compile the basic block starting at the pc.
+        :param memory: Memory of the simulator.
+        :param pc: Address of the first instruction.
+        :return: the compiled block, whose function is None if the first instruction cannot be compiled.
+        """
+        body: List[str] = []
+        address = pc
+        instruction = 0
+        length = 0
+        while length < self.__MAX_BLOCK_LENGTH and address + 1 < self.mem_size:
+            next_instruction = memory[address] << 8 | memory[address + 1]
+            if not self.__can_compile(next_instruction):
+                break
+            instruction = next_instruction
+            address += 2
+            length += 1
+            # A jump opening a block must not loop, as a jump entered by jumping lands past its target.
+            body.extend(self.__translate(instruction, pc if length > 1 else None, address))
+            if instruction >> 12 in self.__TERMINATORS:
+                break
+        if length == 0:
+            return Block(pc, bytes(memory[pc:pc + 2]), None, 0, 0)
+        if instruction >> 12 not in self.__TERMINATORS:
+            body.append(f"return {address}, False, False, iteration")
+        source = "def block(r, m, awaken, iterations):\n" \
+                 "    for iteration in range(1, iterations + 1):\n" + \
+                 "".join(f"        {statement}\n" for statement in body) + \
+                 f"    return {pc}, True, False, iterations\n"
+        namespace = {"Bailout": Bailout}
+        if "additions" in source:
+            namespace["additions"] = float_addition_table()
+        exec(source, namespace)
+        return Block(pc, bytes(memory[pc:address]), namespace["block"], length, instruction)
@@ -0,0 +1,91 @@
+from enum import Enum
+from re import DOTALL, VERBOSE
+from re import compile as regex_compile
+from typing import List, NamedTuple
+
+
+class AssemblyError(ValueError):
+    """
+    An error in an assembly program, pointing at where it was found.
+    """
+    def __init__(self, message: str, line: int, column: int):
+        """
+        Initialise the error.
+        :param message: What is wrong.
+        :param line: Line of the error, starting from 1.
+        :param column: Column of the error, starting from 1.
+        """
+        super().__init__(f"{line}:{column}: {message}")
+        self.message = message
+        self.line = line
+        self.column = column
+
+
+class TokenType(Enum):
+    WORD = "word"
+    STRING = "string"
+    COMMA = ","
+    COLON = ":"
+    EQUALS = "="
+    LESS_OR_EQUAL = "<="
+    OPEN_BRACKET = "["
+    CLOSE_BRACKET = "]"
+    NEWLINE = "newline"
+
+
+class Token(NamedTuple):
+    type: TokenType
+    text: str
+    line: int
+    column: int
+
+
+__TOKEN_PATTERN = regex_compile(r"""
+    [ \t\r]*(?:
+        (?P<comment>;[^\n]*)
+        |(?P<newline>\n)
+        |(?P<string>"[^"\n]*"|'[^'\n]*')
+        |(?P<word>-?[\w$]+)
+        |(?P<punctuation><=|[,:=\[\]])
+        |(?P<end>$)
+        |(?P<mismatch>.)
+    )
+""", flags=DOTALL | VERBOSE)
+__PUNCTUATION = {token_type.value: token_type for token_type in TokenType}
+
+
+def tokenize(string: str) -> List[Token]:
+    """
+    Split an assembly program into tokens in a single pass, dropping spaces and comments.
+    Words are lowercased as the language is case insensitive, strings keep their case.
+    :param string: Program to tokenize.
+    :return: the tokens, every line ends with a NEWLINE token.
+    """
+    tokens: List[Token] = []
+    append = tokens.append
+    word, newline = TokenType.WORD, TokenType.NEWLINE
+    line = 1
+    line_start = 0
+    for match in __TOKEN_PATTERN.finditer(string):
+        kind = match.lastgroup
+        if kind == "word":
+            append(Token(word, match.group(kind).lower(), line, match.start(kind) - line_start + 1))
+        elif kind == "punctuation":
+            text = match.group(kind)
+            append(Token(__PUNCTUATION[text], text, line, match.start(kind) - line_start + 1))
+        elif kind == "newline":
+            append(Token(newline, "\n", line, match.start(kind) - line_start + 1))
+            line += 1
+            line_start = match.end()
+        elif kind == "string":
+            append(Token(TokenType.STRING, match.group(kind)[1:-1], line, match.start(kind) - line_start + 1))
+        elif kind == "end":
+            break
+        elif kind == "mismatch":
+            text, column = match.group(kind), match.start(kind) - line_start + 1
+            if text in "\"'":
+                raise AssemblyError("Unterminated string.", line, column)
+            raise AssemblyError(f"Unexpected character {text!r}.", line, column)
+    if not tokens or tokens[-1].type != newline:
+        append(Token(newline, "", line, len(string) - line_start + 1))
+    return tokens
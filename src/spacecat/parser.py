@@ -0,0 +1,253 @@
+from dataclasses import dataclass, field
+from re import compile as regex_compile
+from typing import List, Optional, Union
+from spacecat.instructions import INSTRUCTIONS, OperandKind
+from spacecat.lexer import AssemblyError, Token, TokenType, tokenize
+
+register_pattern = regex_compile(r"r[0-9a-f]")
+MNEMONICS = frozenset(instruction.mnemonic_name for instruction in INSTRUCTIONS)
+
+
+def parse_numeral(string: str) -> Optional[int]:
+    """
+    Parse a numeral of the assembly language.
+    Decimal numerals are written as -D, Dd or D, binary numerals as Db and hexadecimal numerals as 0xD, Dh or $D.
+    Like the legacy preprocessor, digits that are not decimal without a suffix are read as hexadecimal.
+    :param string: Lowercase numeral.
+    :return: the value of the numeral, None if the string is not a numeral.
+    """
+    try:
+        if string.startswith("0x"):
+            return int(string[2:], base=16)
+        elif string.startswith("$"):
+            return int(string[1:], base=16)
+        elif string.endswith("h"):
+            return int(string[:-1], base=16)
+        elif string.endswith("b") and string[:-1] and set(string[:-1]) <= {"0", "1"}:
+            return int(string[:-1], base=2)
+        elif string.endswith("d") and string[:-1].lstrip("-").isdigit():
+            return int(string[:-1], base=10)
+        elif string.lstrip("-").isdigit():
+            return int(string, base=10)
+        return int(string, base=16)
+    except ValueError:
+        return None
+
+
+@dataclass
+class Operand:
+    """
+    An operand of an operation. Registers and pointers hold the index of the register, values and addresses hold the
+    word they were written as, which is resolved to a label or a numeral by the assembler.
+    """
+    kind: OperandKind
+    value: Union[int, str]
+    line: int
+    column: int
+
+
+@dataclass
+class Label:
+    name: str
+    line: int
+    column: int
+
+
+@dataclass
+class Operation:
+    mnemonic: str
+    operands: List[Operand]
+    line: int
+    column: int
+
+
+@dataclass
+class Origin:
+    address: int
+    line: int
+    column: int
+
+
+@dataclass
+class Data:
+    """
+    A db directive, its items are strings whose characters are written one by one or words naming a byte.
+    """
+    items: List[Union[str, Operand]]
+    line: int
+    column: int
+
+
+Statement = Union[Label, Operation, Origin, Data]
+
+
+@dataclass
+class Program:
+    statements: List[Statement] = field(default_factory=list)
+
+
+class Parser:
+    """
+    Parser turning the tokens of a program into its statements a line at a time.
+    """
+    def __init__(self, tokens: List[Token]):
+        """
+        Initialise the parser.
+        :param tokens: Tokens of the program, ending with a NEWLINE.
+        """
+        self.__tokens = tokens
+
+    @staticmethod
+    def __error(message: str, token: Token) -> AssemblyError:
+        return AssemblyError(message, token.line, token.column)
+
+    def __register(self, token: Token) -> int:
+        """
+        Read the index of a register from a word.
+        :param token: Word naming the register.
+        :return: the index.
+        """
+        if token.type != TokenType.WORD or not register_pattern.fullmatch(token.text):
+            raise self.__error(f"Expected a register, found {token.text!r}.", token)
+        return int(token.text[1], base=16)
+
+    def __operand(self, tokens: List[Token], after: Token) -> Operand:
+        """
+        Parse an operand.
+        :param tokens: Tokens of the operand.
+        :param after: Token preceding the operand, for errors.
+        :return: the operand.
+        """
+        if not tokens:
+            raise self.__error("Expected an operand.", after)
+        first = tokens[0]
+        types = tuple(token.type for token in tokens)
+        if types == (TokenType.WORD,):
+            if register_pattern.fullmatch(first.text):
+                return Operand(OperandKind.REGISTER, int(first.text[1], base=16), first.line, first.column)
+            return Operand(OperandKind.VALUE, first.text, first.line, first.column)
+        if types == (TokenType.OPEN_BRACKET, TokenType.WORD, TokenType.CLOSE_BRACKET):
+            if register_pattern.fullmatch(tokens[1].text):
+                return Operand(OperandKind.POINTER, int(tokens[1].text[1], base=16), first.line, first.column)
+            return Operand(OperandKind.ADDRESS, tokens[1].text, first.line, first.column)
+        if types == (TokenType.WORD, TokenType.OPEN_BRACKET, TokenType.WORD, TokenType.CLOSE_BRACKET) and \
+                first.text == "r":
+            inner = tokens[2]
+            if len(inner.text) == 1 and register_pattern.fullmatch("r" + inner.text):
+                return Operand(OperandKind.POINTER, int(inner.text, base=16), first.line, first.column)
+            return Operand(OperandKind.POINTER, self.__register(inner), first.line, first.column)
+        if len(types) == 3 and types[1] in (TokenType.EQUALS, TokenType.LESS_OR_EQUAL):
+            if self.__register(tokens[2]) != 0:
+                raise self.__error("Registers can only be compared to R0.", tokens[2])
+            kind = OperandKind.EQUALS if types[1] == TokenType.EQUALS else OperandKind.LESS_OR_EQUAL
+            return Operand(kind, self.__register(first), first.line, first.column)
+        raise self.__error(f"Malformed operand {' '.join(token.text for token in tokens)!r}.", first)
+
+    def __operands(self, tokens: List[Token], mnemonic: Token) -> List[Operand]:
+        """
+        Parse comma separated operands.
+        :param tokens: Tokens following the mnemonic.
+        :param mnemonic: The mnemonic, for errors.
+        :return: the operands.
+        """
+        operands: List[Operand] = []
+        if not tokens:
+            return operands
+        start, after = 0, mnemonic
+        for index, token in enumerate(tokens):
+            if token.type == TokenType.COMMA:
+                operands.append(self.__operand(tokens[start:index], after))
+                start, after = index + 1, token
+        operands.append(self.__operand(tokens[start:], after))
+        return operands
+
+    def __data(self, tokens: List[Token], directive: Token) -> Data:
+        """
+        Parse the items of a db directive.
+        :param tokens: Tokens following the directive.
+        :param directive: The db token.
+        :return: the directive.
+        """
+        items: List[Union[str, Operand]] = []
+        for index, token in enumerate(tokens):
+            if index % 2:
+                if token.type != TokenType.COMMA:
+                    raise self.__error(f"Expected a comma, found {token.text!r}.", token)
+            elif token.type == TokenType.STRING:
+                items.append(token.text)
+            elif token.type == TokenType.WORD:
+                items.append(Operand(OperandKind.VALUE, token.text, token.line, token.column))
+            else:
+                raise self.__error(f"Expected a string or a value, found {token.text!r}.", token)
+        if not tokens or tokens[-1].type == TokenType.COMMA:
+            raise self.__error("Expected a string or a value.", tokens[-1] if tokens else directive)
+        return Data(items, directive.line, directive.column)
+
+    def __origin(self, tokens: List[Token], directive: Token) -> Origin:
+        """
+        Parse an org directive.
+        :param tokens: Tokens following the directive.
+        :param directive: The org token.
+        :return: the directive.
+        """
+        address = parse_numeral(tokens[0].text) if len(tokens) == 1 else None
+        if address is None:
+            raise self.__error("Expected an address.", tokens[0] if tokens else directive)
+        return Origin(address, directive.line, directive.column)
+
+    def __line(self, tokens: List[Token], statements: List[Statement]) -> None:
+        """
+        Parse the labels and the statement of a line.
+        :param tokens: Tokens of the line, without the NEWLINE.
+        :param statements: Statements to append to.
+        :return: None
+        """
+        start = 0
+        for index, token in enumerate(tokens):
+            if token.type == TokenType.COLON:
+                words = tokens[start:index]
+                if not words or any(word.type != TokenType.WORD for word in words):
+                    break
+                # Label names may span several words, as they could with the legacy preprocessor.
+                statements.append(Label(" ".join(word.text for word in words), words[0].line, words[0].column))
+                start = index + 1
+            elif token.type != TokenType.WORD:
+                break
+        if start == len(tokens):
+            return
+        mnemonic = tokens[start]
+        rest = tokens[start + 1:]
+        if mnemonic.type != TokenType.WORD:
+            raise self.__error(f"Expected a mnemonic or a directive, found {mnemonic.text!r}.", mnemonic)
+        if mnemonic.text == "org":
+            statements.append(self.__origin(rest, mnemonic))
+        elif mnemonic.text == "db":
+            statements.append(self.__data(rest, mnemonic))
+        elif mnemonic.text in MNEMONICS:
+            statements.append(Operation(mnemonic.text, self.__operands(rest, mnemonic), mnemonic.line,
+                                        mnemonic.column))
+        else:
+            raise self.__error(f"Unknown mnemonic {mnemonic.text!r}.", mnemonic)
+
+    def parse(self) -> Program:
+        """
+        Parse the program.
+        :return: the program.
+        """
+        program = Program()
+        start = 0
+        for index, token in enumerate(self.__tokens):
+            if token.type == TokenType.NEWLINE:
+                if index > start:
+                    self.__line(self.__tokens[start:index], program.statements)
+                start = index + 1
+        return program
+
+
+def parse(string: str) -> Program:
+    """
+    Tokenize and parse an assembly program.
+    :param string: The program.
+    :return: the program's syntax tree.
+    """
+    return Parser(tokenize(string)).parse()
@@ -5,6 +5,7 @@ from re import compile as regex_compile
 comment_pattern = regex_compile(r";.*")
 org_pattern = regex_compile(r"(?<=org )\w+")
 string_pattern = regex_compile(r"\"\w+\"|'\w+'")
+word_pattern = regex_compile(r"[\w$]+")
 three_register_operations = ["addi", "addf", "or", "xor", "and"]
 three_register_op_codes = {"addi": "5", "addf": "6", "or": "7", "and": "8", "xor": "9"}
 
@@ -183,16 +184,14 @@ def __decide_locations(lines: List[str]) -> Tuple[List[str], Dict[str, int]]:
 
 def __attempt_replace(line_args: str, labels_locs: Dict[str, int]) -> str:
     """
-    Atttempt to replace a label with its memory address.
+    Atttempt to replace the labels of a line with their memory addresses.
+    Only whole words are replaced, so a label is never substituted inside a longer one.
     :param line_args: Part of the line including the arguments.
     :param labels_locs: Labels and their memory addresses.
-    :return: Line with the label replaced to its memory address.
+    :return: Line with the labels replaced to their memory addresses.
     """
-    for label in labels_locs:
-        if label in line_args:
-            line_args = line_args.replace(label, f"{labels_locs[label]:02X}h")
-            return line_args
-    return line_args
+    return word_pattern.sub(lambda match: f"{labels_locs[match.group()]:02X}h" if match.group() in labels_locs
+                            else match.group(), line_args)
 
 
 def __replace_labels(lines_no_label_defs: List[str], label_locations: Dict[str, int]) -> List[str]:
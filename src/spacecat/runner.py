@@ -0,0 +1,228 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from glob import glob
+from json import dumps
+from mmap import ACCESS_READ, mmap
+from os import fstat, listdir, makedirs
+from os.path import abspath, basename, commonpath, dirname, isdir, join, relpath
+from time import monotonic
+from typing import Callable, Iterator, List, Optional, Sequence, Union
+from spacecat.assembler import Assembler
+from spacecat.cache import ProgramCache, default_cache_directory
+from spacecat.debugger import Debugger
+from spacecat.simulator import Buffer, HaltReason, RunResult, Simulator
+
+PROGRAM_EXTENSIONS = (".asm", ".prg", ".svm")
+TIMEOUT = "timeout"
+TRACE_EXTENSION = ".trace"
+ERROR = "error"
+
+
+@dataclass
+class ProgramResult:
+    """
+    Outcome of running a program headlessly.
+    """
+    path: str
+    steps: int
+    halt_reason: str
+    output: str
+    error: Optional[str] = None
+
+    def to_json(self) -> str:
+        """
+        Serialise the result as a single line of JSON.
+        :return: the JSON line.
+        """
+        return dumps(asdict(self))
+
+
+def find_programs(paths: Sequence[str]) -> List[str]:
+    """
+    Expand directories and glob patterns into the programs they contain.
+    :param paths: Directories, files or glob patterns.
+    :return: the paths of the *.asm, *.prg and *.svm files found, in the order given.
+    """
+    programs: List[str] = []
+    for path in paths:
+        if isdir(path):
+            candidates = [join(path, file_name) for file_name in sorted(listdir(path))]
+        else:
+            candidates = sorted(glob(path))
+        programs.extend(candidate for candidate in candidates
+                        if candidate.endswith(PROGRAM_EXTENSIONS) and not isdir(candidate))
+    return programs
+
+
+def trace_names(paths: Sequence[str]) -> List[str]:
+    """
+    Name the traces of programs by their paths relative to the directory they share, so that programs with the same
+    file name in different directories do not overwrite each other's traces.
+    :param paths: Paths of the programs.
+    :return: the relative paths of their traces, in the order of the paths.
+    """
+    if not paths:
+        return []
+    root = commonpath([dirname(abspath(path)) for path in paths])
+    return [relpath(abspath(path), root) + TRACE_EXTENSION for path in paths]
+
+
+@contextmanager
+def map_file(path: str) -> Iterator[Buffer]:
+    """
+    Map a file to memory read only, so that the simulator loads it straight from the page cache.
+    :param path: Path of the file.
+    :return: the mapped file, which must not be used once the context exits.
+    """
+    with open(path, "rb") as file:
+        if fstat(file.fileno()).st_size == 0:  # Empty files cannot be mapped.
+            yield b""
+            return
+        with mmap(file.fileno(), 0, access=ACCESS_READ) as mapped:
+            yield mapped
+
+
+def load_program(simulator: Simulator, path: str, cache: Optional[ProgramCache] = None) -> None:
+    """
+    Load a program to the simulator the way the GUI opens it.
+    :param simulator: Simulator to load the program to.
+    :param path: Path of a *.asm, *.prg or *.svm file.
+    :param cache: Cache of assembled programs, *.asm files are assembled every time if None.
+    :return: None
+    """
+    if path.endswith(".asm"):
+        with open(path, "r") as file:
+            source = file.read()
+        if cache is None:
+            simulator.load_memory(Assembler.instantiate(source, simulator.mem_size).memory)
+        else:
+            simulator.parse_program_memory(cache.assemble(source, simulator.mem_size))
+    elif path.endswith(".prg"):
+        with map_file(path) as image:
+            simulator.parse_program_memory(image)
+        simulator.reset_special_registers()
+    elif path.endswith(".svm"):
+        with map_file(path) as state:
+            simulator.parse_program_state(state)
+    else:
+        raise ValueError(f"Unknown program type: {path}")
+
+
+def run_slice(simulator: Union[Simulator, Debugger], seconds: float, slice_steps: int = 1_000,
+              clock: Callable[[], float] = monotonic) -> RunResult:
+    """
+    Run the machine for a slice of time, so that it can share a thread with an event loop.
+    :param simulator: Simulator to run, or a debugger to run it through.
+    :param seconds: Length of the slice, the clock is checked every slice_steps instructions.
+    :param slice_steps: Number of instructions executed between checks of the clock.
+    :param clock: Clock the slice is measured on.
+    :return: the number of steps executed, why the machine stopped and what it wrote to STDOUT, STEP_LIMIT if it
+        stopped because the slice ran out.
+    """
+    deadline = clock() + seconds
+    steps = 0
+    output: List[str] = []
+    while True:
+        result = simulator.run(max_steps=slice_steps)
+        steps += result.steps
+        output.append(result.output)
+        if result.halt_reason != HaltReason.STEP_LIMIT or clock() >= deadline:
+            return RunResult(steps, result.halt_reason, "".join(output))
+
+
+def run_program(path: str, max_steps: Optional[int] = None, timeout: Optional[float] = None,
+                slice_steps: int = 10_000, cache_directory: Optional[str] = None,
+                trace_directory: Optional[str] = None, trace_name: Optional[str] = None) -> ProgramResult:
+    """
+    Run a program to completion, or until it runs out of steps or time.
+    :param path: Path of the program.
+    :param max_steps: Maximum number of instructions to execute, unlimited if None.
+    :param timeout: Maximum number of seconds to run for, unlimited if None.
+    :param slice_steps: Number of instructions executed between checks of the timeout.
+    :param cache_directory: Directory of the cache of assembled programs, not cached if None.
+    :param trace_directory: Directory to record a trace of the run to, not traced if None.
+    :param trace_name: Path of the trace relative to trace_directory, the program's file name with .trace added if
+        None.
+    :return: the result of the run, errors are reported in it rather than raised.
+    """
+    deadline = None if timeout is None else monotonic() + timeout
+    steps = 0
+    output: List[str] = []
+    trace = None
+    try:
+        simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15], jit=True)
+        load_program(simulator, path, None if cache_directory is None else ProgramCache(cache_directory))
+        if trace_directory is not None:
+            trace_path = join(trace_directory, basename(path) + TRACE_EXTENSION if trace_name is None else trace_name)
+            makedirs(dirname(trace_path) or ".", exist_ok=True)
+            trace = open(trace_path, "wb")
+            simulator.start_trace(trace)
+        while True:
+            budget = slice_steps if max_steps is None else min(slice_steps, max_steps - steps)
+            result = simulator.run(max_steps=budget)
+            steps += result.steps
+            output.append(result.output)
+            if result.halt_reason != HaltReason.STEP_LIMIT or steps == max_steps:
+                halt_reason = result.halt_reason.value
+                break
+            if deadline is not None and monotonic() >= deadline:
+                halt_reason = TIMEOUT
+                break
+    except Exception as error:
+        return ProgramResult(path, steps, ERROR, "".join(output), f"{type(error).__name__}: {error}")
+    finally:
+        if trace is not None:
+            simulator.stop_trace()
+            trace.close()
+    return ProgramResult(path, steps, halt_reason, "".join(output))
+
+
+def run_programs(paths: Sequence[str], max_steps: Optional[int] = None, timeout: Optional[float] = None,
+                 workers: Optional[int] = None, cache_directory: Optional[str] = None,
+                 trace_directory: Optional[str] = None) -> Iterator[ProgramResult]:
+    """
+    Run programs in parallel over a pool of processes.
+    :param paths: Paths of the programs.
+    :param max_steps: Maximum number of instructions to execute per program, unlimited if None.
+    :param timeout: Maximum number of seconds to run each program for, unlimited if None.
+    :param workers: Number of processes, the number of processors if None.
+    :param cache_directory: Directory of the cache of assembled programs, not cached if None.
+    :param trace_directory: Directory to record traces of the runs to, laid out as the programs are relative to the
+        directory they share, see trace_names, not traced if None.
+    :return: the results, in the order of the paths.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(run_program, paths, [max_steps] * len(paths), [timeout] * len(paths),
+                                [10_000] * len(paths), [cache_directory] * len(paths),
+                                [trace_directory] * len(paths), trace_names(paths))
+
+
+def main(arguments: Optional[Sequence[str]] = None) -> None:
+    """
+    Run the programs given on the command line, printing a JSON line per program.
+    :param arguments: Command line arguments, sys.argv if None.
+    :return: None
+    """
+    parser = ArgumentParser(description="Run SpaceCat programs headlessly in parallel.")
+    parser.add_argument("paths", nargs="+", help="*.asm, *.prg or *.svm files, directories or glob patterns.")
+    parser.add_argument("--max-steps", type=int, default=1_000_000,
+                        help="Maximum number of instructions to execute per program.")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Maximum number of seconds per program.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes to run programs on.")
+    parser.add_argument("--cache", nargs="?", const=default_cache_directory(), default=None, metavar="DIRECTORY",
+                        help="Cache assembled *.asm files, in $SPACECAT_CACHE or ~/.cache/spacecat unless given.")
+    parser.add_argument("--trace", default=None, metavar="DIRECTORY",
+                        help="Record a trace of each run to DIRECTORY, as the program's path relative to the "
+                             "directory the programs share with .trace added.")
+    options = parser.parse_args(arguments)
+    if options.trace is not None:
+        makedirs(options.trace, exist_ok=True)
+    for result in run_programs(find_programs(options.paths), options.max_steps, options.timeout, options.workers,
+                               options.cache, options.trace):
+        print(result.to_json(), flush=True)
+
+
+if __name__ == "__main__":
+    main()
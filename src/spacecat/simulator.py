@@ -1,198 +1,696 @@
-from typing import List, Dict, Callable
-from spacecat.common_utils import Cell, right_rotation, OctalFloat
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from mmap import mmap
+from sys import maxsize
+from typing import List, Dict, Callable, Tuple, Union, Optional, TextIO, Mapping, Set, BinaryIO, Deque
+from spacecat.common_utils import Cell, CellView, cell_views, add_floats, ROTATIONS
+from spacecat.jit import Bailout, BlockCompiler
+from spacecat.trace import DEFAULT_KEYFRAME_INTERVAL, MEMORY_WRITE, NO_WRITE, REGISTER_WRITE, TraceRecorder
+
+Buffer = Union[bytes, bytearray, memoryview, mmap]
+DEFAULT_HISTORY_LENGTH = 10_000  # Steps kept for step_back.
+SNAPSHOT_TRAILER_SIZE = 2  # Bytes a snapshot takes past the *.svm state.
+
+
+class HaltReason(Enum):
+    """
+    Reason a run of the simulator stopped.
+    """
+    HALTED = "halted"
+    END_OF_MEMORY = "end of memory"
+    STEP_LIMIT = "step limit"
+    REACHED_PC = "reached pc"
+    BREAK = "break"  # Stopped by a breakpoint, a watchpoint or a condition of a debugger.
+
+
+@dataclass
+class RunResult:
+    """
+    Outcome of running the simulator to completion.
+    """
+    steps: int
+    halt_reason: HaltReason
+    output: str
+
 
 class Simulator:
     """
     Simulator for the simulator.
     """
-    def __init__(self, mem_size: int, register_size: int, stdout_register_indices: List[int]):
+    __REGISTER_ADDRESS_OP_CODES = (0x1, 0x2, 0x3, 0xB, 0xF)
+    __REGISTER_REGISTER_OP_CODES = (0x4, 0xD, 0xE)
+    __THREE_REGISTER_OP_CODES = (0x5, 0x6, 0x7, 0x8, 0x9)
+    __REGISTER_WRITING_OP_CODES = frozenset((0x1, 0x2, 0x5, 0x6, 0x7, 0x8, 0x9, 0xA))
+
+    def __init__(self, mem_size: int, register_size: int, stdout_register_indices: List[int],
+                 integer_core: bool = False, compact: bool = False, jit: bool = False):
         """
         Initialise the simulator
         :param mem_size: Size of the memory
         :param register_size: Size of the registers
+        :param integer_core: Execute through the integer core, which dispatches on the IR as a 16-bit integer
+            instead of through the decode cache. The integer core works on byte buffers, so it implies compact.
+        :param compact: Hold the memory and the registers in byte buffers rather than in Cells, Cell compatible views
+            are only created when asked for. Compact machines always execute through the integer core.
+        :param jit: Compile basic blocks into Python functions when running the machine with run, implies compact.
         """
-        self.__memory = [Cell() for _ in range(mem_size)]
+        self.__options = {"integer_core": integer_core, "compact": compact, "jit": jit}
+        compact = compact or integer_core or jit
         self.mem_size = mem_size
         self.register_size = register_size
-        self.__registers = [Cell() for _ in range(register_size)]
-        self.IR: str = "0000"  # Current instruction under execution.
+        self.__compact = compact
+        if compact:
+            self.__memory = bytearray(mem_size)
+            self.__registers = bytearray(register_size)
+        else:
+            self.__memory = [Cell() for _ in range(mem_size)]
+            self.__registers = [Cell() for _ in range(register_size)]
+        self.__memory_views: Optional[List[CellView]] = None
+        self.__register_views: Optional[List[CellView]] = None
+        self.__instruction: int = 0  # Current instruction under execution, exposed as IR.
         self.PC: int = 0  # Next value index.
         self.__can_continue: bool = True
         self.stdout_register_indices = stdout_register_indices
-        self.__op_code_method: Dict[str, Callable] = {
-            "1": lambda: self.__direct_load(),
-            "2": lambda: self.__immediate_load(),
-            "3": lambda: self.__direct_store(),
-            "4": lambda: self.__move(),
-            "5": lambda: self.__integer_addition(),
-            "6": lambda: self.__floating_point_addition(),
-            "7": lambda: self.__bitwise_or(),
-            "8": lambda: self.__bitwise_and(),
-            "9": lambda: self.__bitwise_exclusive_or(),
-            "A": lambda: self.__rotate_right(),
-            "B": lambda: self.__jump_when_equal(),
-            "C": lambda: self.__halt(),
-            "D": lambda: self.__indirect_load(),
-            "E": lambda: self.__indirect_store(),
-            "F": lambda: self.__jump_when_less_or_equal(),
-            "0": lambda: self.__invalid
+        self.__output_sink: Optional[Callable[[str], None]] = None
+        self.__block_compiler: Optional[BlockCompiler] = \
+            BlockCompiler(mem_size, stdout_register_indices) if jit else None
+        self.__op_code_method: Dict[int, Callable] = {
+            0x1: self.__direct_load,
+            0x2: self.__immediate_load,
+            0x3: self.__direct_store,
+            0x4: self.__move,
+            0x5: self.__integer_addition,
+            0x6: self.__floating_point_addition,
+            0x7: self.__bitwise_or,
+            0x8: self.__bitwise_and,
+            0x9: self.__bitwise_exclusive_or,
+            0xA: self.__rotate_right,
+            0xB: self.__jump_when_equal,
+            0xC: self.__halt,
+            0xD: self.__indirect_load,
+            0xE: self.__indirect_store,
+            0xF: self.__jump_when_less_or_equal,
+            0x0: self.__invalid
         }
-        self.check_reference_register = lambda: self.__registers[0].value
+        # Decoded instructions keyed by their address, each entry holds the two opcode bytes it was decoded from.
+        self.__decode_cache: Dict[int, Tuple[int, int, int, Callable, Tuple[int, ...]]] = {}
+        self.check_reference_register = lambda: self.return_registers()[0].value
         self.__jmp = False
         self.rf_sleeping = True
+        if compact:
+            self.__step: Callable[[], None] = self.__integer_step
+        else:
+            self.__step = self.__cached_step
+        self.__untracked_step = self.__step
+        # Memory addresses and registers written since the last take_dirty, None unless writes are tracked.
+        self.__dirty_memory: Optional[Set[int]] = None
+        self.__dirty_registers: Optional[Set[int]] = None
+        self.__trace: Optional[TraceRecorder] = None
+        # Undo records of the latest steps, None unless the history is kept.
+        self.__history: Optional[Deque[Tuple[int, int, bool, bool, bool, int, int, int]]] = None
+
+    @property
+    def IR(self) -> str:
+        """
+        Instruction register as a hexadecimal string.
+        :return: the instruction under execution.
+        """
+        return format(self.__instruction, "04X")
 
-    def __awaken_rf_if(self, register_index: str):
+    @IR.setter
+    def IR(self, value: Union[str, int]) -> None:
         """
-        Set RF to STDOUT
+        Set the instruction register.
+        :param value: New instruction as a hexadecimal string or an integer.
         :return: None
         """
-        if register_index == "F" or register_index == "f" or register_index == 15:
-            self.rf_sleeping = False
-    def __immediate_load(self):
-        register_index = self.IR[1]
+        if type(value) == str:
+            value = int(value, base=16)
+        self.__instruction = value % 0x10000
+
+    def __awaken_rf_if(self, register_index: int):
+        """
+        Set RF to STDOUT, called after a register is written to.
+        :param register_index: Index of the register that was written to.
+        :return: None
+        """
+        if register_index in self.stdout_register_indices:
+            if self.__output_sink is None:
+                self.rf_sleeping = False
+            else:
+                self.__output_sink(self.__read_stdout())
+
+    def __immediate_load(self, register_index: int, value: int):
+        self.__registers[register_index].value = value
         self.__awaken_rf_if(register_index)
-        value = self.IR[2:]
-        self.__registers[int(register_index, base=16)].value = value
 
-    def __direct_load(self):
-        register_index = self.IR[1]
-        memory_index = self.IR[2:]
+    def __direct_load(self, register_index: int, memory_index: int):
+        self.__registers[register_index].value = self.__memory[memory_index].value
         self.__awaken_rf_if(register_index)
-        self.__registers[int(register_index, base=16)].value = self.__memory[int(memory_index, base=16)].value
 
-    def __indirect_load(self):
-        register_index = self.IR[2]
-        memory_index_register_index = self.IR[3]
+    def __indirect_load(self, register_index: int, memory_index_register_index: int):
+        memory_index = self.__registers[memory_index_register_index].value
+        self.__registers[register_index].value = self.__memory[memory_index].value
         self.__awaken_rf_if(register_index)
-        memory_index = self.__registers[int(memory_index_register_index, base=16)].value
-        self.__registers[int(register_index, base=16)].value = self.__memory[memory_index].value
-
-    def __direct_store(self):
-        register_index = self.IR[1]
-        memory_index = self.IR[2:]
-        self.__memory[int(memory_index, base=16)].value = self.__registers[int(register_index, base=16)]
-
-    def __indirect_store(self):
-        register_index = self.IR[2]
-        memory_index_register_index = self.IR[3]
-        memory_index = self.__registers[int(memory_index_register_index, base=16)].value
-        self.__memory[memory_index].value = self.__registers[int(register_index, base=16)]
-
-    def __move(self):
-        register_sender_index: int = int(self.IR[2], base=16)
-        register_receiver_index: int = int(self.IR[3], base=16)
-        self.__awaken_rf_if(register_receiver_index)
-        self.__registers[register_receiver_index].value = self.__registers[register_sender_index].value
 
-    def __integer_addition(self):
-        register_receiver_index: int = int(self.IR[1], base=16)
-        register_operand_one: int = int(self.IR[2], base=16)
-        register_operand_two: int = int(self.IR[3], base=16)
+    def __direct_store(self, register_index: int, memory_index: int):
+        self.__memory[memory_index].value = self.__registers[register_index].value
+        self.__invalidate_decoded(memory_index)
+
+    def __indirect_store(self, register_index: int, memory_index_register_index: int):
+        memory_index = self.__registers[memory_index_register_index].value
+        self.__memory[memory_index].value = self.__registers[register_index].value
+        self.__invalidate_decoded(memory_index)
+
+    def __move(self, register_sender_index: int, register_receiver_index: int):
+        self.__registers[register_receiver_index].value = self.__registers[register_sender_index].value
         self.__awaken_rf_if(register_receiver_index)
+
+    def __integer_addition(self, register_receiver_index: int, register_operand_one: int, register_operand_two: int):
         self.__registers[register_receiver_index].value = self.__registers[register_operand_one].value + \
                                                           self.__registers[register_operand_two].value
+        self.__awaken_rf_if(register_receiver_index)
 
     def __invalid(self):
         pass
 
-    def __floating_point_addition(self):
-        register_receiver_index: int = int(self.IR[1], base=16)
-        register_operand_one: int = int(self.IR[2], base=16)
-        register_operand_two: int = int(self.IR[3], base=16)
+    def __floating_point_addition(self, register_receiver_index: int, register_operand_one: int,
+                                  register_operand_two: int):
+        self.__registers[register_receiver_index].value = add_floats(self.__registers[register_operand_one].value,
+                                                                     self.__registers[register_operand_two].value)
         self.__awaken_rf_if(register_receiver_index)
-        num_one = OctalFloat(str(self.__registers[register_operand_one]))
-        num_two = OctalFloat(str(self.__registers[register_operand_two]))
-        result = num_one + num_two
-        self.__registers[register_receiver_index].value = int(result)
 
-    def __bitwise_or(self):
-        register_receiver_index: int = int(self.IR[1], base=16)
-        self.__awaken_rf_if(register_receiver_index)
-        register_operand_one: int = int(self.IR[2], base=16)
-        register_operand_two: int = int(self.IR[3], base=16)
+    def __bitwise_or(self, register_receiver_index: int, register_operand_one: int, register_operand_two: int):
         self.__registers[register_receiver_index].value = self.__registers[register_operand_one].value | \
                                                           self.__registers[register_operand_two].value
-
-    def __bitwise_and(self):
-        register_receiver_index: int = int(self.IR[1], base=16)
         self.__awaken_rf_if(register_receiver_index)
-        register_operand_one: int = int(self.IR[2], base=16)
-        register_operand_two: int = int(self.IR[3], base=16)
+
+    def __bitwise_and(self, register_receiver_index: int, register_operand_one: int, register_operand_two: int):
         self.__registers[register_receiver_index].value = self.__registers[register_operand_one].value & \
                                                           self.__registers[register_operand_two].value
-
-    def __bitwise_exclusive_or(self):
-        register_receiver_index: int = int(self.IR[1], base=16)
         self.__awaken_rf_if(register_receiver_index)
-        register_operand_one: int = int(self.IR[2], base=16)
-        register_operand_two: int = int(self.IR[3], base=16)
+
+    def __bitwise_exclusive_or(self, register_receiver_index: int, register_operand_one: int,
+                               register_operand_two: int):
         self.__registers[register_receiver_index].value = self.__registers[register_operand_one].value ^ \
                                                           self.__registers[register_operand_two].value
+        self.__awaken_rf_if(register_receiver_index)
 
-    def __rotate_right(self):
-        register_to_rotate_index: int = int(self.IR[1], base=16)
+    def __rotate_right(self, register_to_rotate_index: int, rotate_by: int):
+        register = self.__registers[register_to_rotate_index]
+        register.value = ROTATIONS[rotate_by][register.value]
         self.__awaken_rf_if(register_to_rotate_index)
-        rotate_by: int = int(self.IR[3], base=16)
-        self.__registers[register_to_rotate_index].value = int(right_rotation(self.__registers[register_to_rotate_index].binary_value, rotate_by), base=2)
 
-    def __jump_when_equal(self):
-        register_to_check_index = int(self.IR[1], base=16)
-        jump_to = int(self.IR[2:], base=16)
+    def __jump_when_equal(self, register_to_check_index: int, jump_to: int):
         if self.__registers[register_to_check_index] == self.__registers[0]:
             self.__jmp = True
             self.PC = jump_to
 
-    def __jump_when_less_or_equal(self):
-        register_to_check_index = int(self.IR[1], base=16)
-        jump_to = int(self.IR[2:], base=16)
+    def __jump_when_less_or_equal(self, register_to_check_index: int, jump_to: int):
         if self.__registers[register_to_check_index] <= self.__registers[0]:
             self.__jmp = True
             self.PC = jump_to
 
-    def __unconditional_jump(self):
-        jump_to = int(self.IR[2:], base=16)
+    def __unconditional_jump(self, jump_to: int):
         self.__jmp = True
         self.PC = jump_to
 
     def __halt(self):
         self.__can_continue = False
 
-    def __execute(self):
-        if self.IR[:2] == "B0":
-            self.__unconditional_jump()
+    def __int_invalid(self, instruction: int):
+        pass
+
+    def __int_direct_load(self, instruction: int):
+        register_index = instruction >> 8 & 0xF
+        self.__registers[register_index] = self.__memory[instruction & 0xFF]
+        self.__awaken_rf_if(register_index)
+
+    def __int_immediate_load(self, instruction: int):
+        register_index = instruction >> 8 & 0xF
+        self.__registers[register_index] = instruction & 0xFF
+        self.__awaken_rf_if(register_index)
+
+    def __int_direct_store(self, instruction: int):
+        self.__memory[instruction & 0xFF] = self.__registers[instruction >> 8 & 0xF]
+
+    def __int_move(self, instruction: int):
+        register_receiver_index = instruction & 0xF
+        self.__registers[register_receiver_index] = self.__registers[instruction >> 4 & 0xF]
+        self.__awaken_rf_if(register_receiver_index)
+
+    def __int_integer_addition(self, instruction: int):
+        register_receiver_index = instruction >> 8 & 0xF
+        self.__registers[register_receiver_index] = (self.__registers[instruction >> 4 & 0xF] +
+                                                     self.__registers[instruction & 0xF]) & 0xFF
+        self.__awaken_rf_if(register_receiver_index)
+
+    def __int_floating_point_addition(self, instruction: int):
+        register_receiver_index = instruction >> 8 & 0xF
+        self.__registers[register_receiver_index] = add_floats(self.__registers[instruction >> 4 & 0xF],
+                                                               self.__registers[instruction & 0xF])
+        self.__awaken_rf_if(register_receiver_index)
+
+    def __int_bitwise_or(self, instruction: int):
+        register_receiver_index = instruction >> 8 & 0xF
+        self.__registers[register_receiver_index] = self.__registers[instruction >> 4 & 0xF] | \
+                                                    self.__registers[instruction & 0xF]
+        self.__awaken_rf_if(register_receiver_index)
+
+    def __int_bitwise_and(self, instruction: int):
+        register_receiver_index = instruction >> 8 & 0xF
+        self.__registers[register_receiver_index] = self.__registers[instruction >> 4 & 0xF] & \
+                                                    self.__registers[instruction & 0xF]
+        self.__awaken_rf_if(register_receiver_index)
+
+    def __int_bitwise_exclusive_or(self, instruction: int):
+        register_receiver_index = instruction >> 8 & 0xF
+        self.__registers[register_receiver_index] = self.__registers[instruction >> 4 & 0xF] ^ \
+                                                    self.__registers[instruction & 0xF]
+        self.__awaken_rf_if(register_receiver_index)
+
+    def __int_rotate_right(self, instruction: int):
+        register_to_rotate_index = instruction >> 8 & 0xF
+        self.__registers[register_to_rotate_index] = \
+            ROTATIONS[instruction & 0xF][self.__registers[register_to_rotate_index]]
+        self.__awaken_rf_if(register_to_rotate_index)
+
+    def __int_halt(self, instruction: int):
+        self.__can_continue = False
+
+    def __int_jump_when_equal(self, instruction: int):
+        if self.__registers[instruction >> 8 & 0xF] == self.__registers[0]:
+            self.__jmp = True
+            self.PC = instruction & 0xFF
+
+    def __int_indirect_load(self, instruction: int):
+        register_index = instruction >> 4 & 0xF
+        self.__registers[register_index] = self.__memory[self.__registers[instruction & 0xF]]
+        self.__awaken_rf_if(register_index)
+
+    def __int_indirect_store(self, instruction: int):
+        self.__memory[self.__registers[instruction & 0xF]] = self.__registers[instruction >> 4 & 0xF]
+
+    def __int_jump_when_less_or_equal(self, instruction: int):
+        if self.__registers[instruction >> 8 & 0xF] <= self.__registers[0]:
+            self.__jmp = True
+            self.PC = instruction & 0xFF
+
+    # Indexed by the opcode, B0 needs no entry of its own since jumping when R0 equals R0 always jumps.
+    __INTEGER_OP_CODE_TABLE: List[Callable[["Simulator", int], None]] = [
+        __int_invalid, __int_direct_load, __int_immediate_load, __int_direct_store,
+        __int_move, __int_integer_addition, __int_floating_point_addition, __int_bitwise_or,
+        __int_bitwise_and, __int_bitwise_exclusive_or, __int_rotate_right,
+        __int_jump_when_equal, __int_halt, __int_indirect_load, __int_indirect_store,
+        __int_jump_when_less_or_equal
+    ]
+
+    def __decode(self, high: int, low: int) -> Tuple[int, int, int, Callable, Tuple[int, ...]]:
+        """
+        Decode an instruction into its handler and its operands.
+        :param high: First byte of the instruction.
+        :param low: Second byte of the instruction.
+        :return: A decode cache entry as the opcode bytes, the instruction, its handler and the operands.
+        """
+        op_code = high >> 4
+        handler = self.__op_code_method[op_code]
+        if high == 0xB0:
+            handler = self.__unconditional_jump
+            operands = (low,)
+        elif op_code in self.__REGISTER_ADDRESS_OP_CODES:
+            operands = (high & 0xF, low)
+        elif op_code in self.__REGISTER_REGISTER_OP_CODES:
+            operands = (low >> 4, low & 0xF)
+        elif op_code in self.__THREE_REGISTER_OP_CODES:
+            operands = (high & 0xF, low >> 4, low & 0xF)
+        elif op_code == 0xA:
+            operands = (high & 0xF, low & 0xF)
         else:
-            self.__op_code_method[self.IR[0]]()
+            operands = ()
+        return high, low, high << 8 | low, handler, operands
 
-    def __next__(self):
-        if not self.__can_continue:
-            raise StopIteration
-        if self.PC == self.mem_size:
-            raise StopIteration
-        self.IR = str(self.__memory[self.PC]) + str(self.__memory[self.PC + 1])
+    def __fetch(self) -> Tuple[int, int, int, Callable, Tuple[int, ...]]:
+        """
+        Fetch the decoded instruction at the PC, decoding it only if it is not cached.
+        :return: the decode cache entry of the instruction.
+        """
+        high = self.__memory[self.PC].value
+        low = self.__memory[self.PC + 1].value
+        decoded = self.__decode_cache.get(self.PC)
+        if decoded is None or decoded[0] != high or decoded[1] != low:
+            decoded = self.__decode(high, low)
+            self.__decode_cache[self.PC] = decoded
+        return decoded
+
+    def __invalidate_decoded(self, memory_index: int) -> None:
+        """
+        Drop the cached decodings of the instructions overlapping a memory address.
+        :param memory_index: Address that was written to.
+        :return: None
+        """
+        self.__decode_cache.pop(memory_index, None)
+        self.__decode_cache.pop(memory_index - 1, None)
+
+    def __cached_step(self) -> None:
+        """
+        Execute the instruction at the PC through the decode cache.
+        :return: None
+        """
+        _, _, self.__instruction, handler, operands = self.__fetch()
+        if not self.__jmp:
+            self.PC += 2
+            handler(*operands)
+        else:
+            handler(*operands)
+            self.PC += 2
+            self.__jmp = False
+
+    def __integer_step(self) -> None:
+        """
+        Execute the instruction at the PC through the integer core.
+        :return: None
+        """
+        instruction = self.__memory[self.PC] << 8 | self.__memory[self.PC + 1]
+        self.__instruction = instruction
         if not self.__jmp:
             self.PC += 2
-            self.__execute()
+            self.__INTEGER_OP_CODE_TABLE[instruction >> 12](self, instruction)
         else:
-            self.__execute()
-            self.PC+=2
+            self.__INTEGER_OP_CODE_TABLE[instruction >> 12](self, instruction)
+            self.PC += 2
             self.__jmp = False
 
-        return self.__memory, self.__registers
+    def __write_target(self) -> Tuple[int, int]:
+        """
+        Decode what the instruction at the PC writes to before it executes, the instruction executed is always the
+        one at the PC and indirect stores do not write their pointer register.
+        :return: the memory address and the index of the register written to, -1 for neither.
+        """
+        memory = self.__memory
+        if self.__compact:
+            instruction = memory[self.PC] << 8 | memory[self.PC + 1]
+        else:
+            instruction = memory[self.PC].value << 8 | memory[self.PC + 1].value
+        op_code = instruction >> 12
+        if op_code in self.__REGISTER_WRITING_OP_CODES:
+            return -1, instruction >> 8 & 0xF
+        if op_code == 0x4:
+            return -1, instruction & 0xF
+        if op_code == 0xD:
+            return -1, instruction >> 4 & 0xF
+        if op_code == 0x3:
+            return instruction & 0xFF, -1
+        if op_code == 0xE:
+            pointer = self.__registers[instruction & 0xF]
+            return pointer if self.__compact else pointer.value, -1
+        return -1, -1
+
+    def __value_at(self, memory_index: int, register_index: int) -> int:
+        """
+        Return the value of a memory address or a register.
+        :param memory_index: The memory address, -1 to read the register.
+        :param register_index: Index of the register.
+        :return: the value.
+        """
+        cell = self.__memory[memory_index] if memory_index >= 0 else self.__registers[register_index]
+        return cell if self.__compact else cell.value
+
+    def __instrumented_step(self) -> None:
+        """
+        Execute the instruction at the PC, recording what it wrote to while writes are tracked, tracing it while
+        a trace is recorded and keeping what it overwrote while the history is kept.
+        :return: None
+        """
+        memory_index, register_index = self.__write_target()
+        if self.__history is not None:
+            old_value = self.__value_at(memory_index, register_index) if memory_index >= 0 or register_index >= 0 \
+                else 0
+            self.__history.append((self.PC, self.__instruction, self.__jmp, self.__can_continue, self.rf_sleeping,
+                                   memory_index, register_index, old_value))
+        self.__untracked_step()
+        if self.__dirty_memory is not None:
+            if memory_index >= 0:
+                self.__dirty_memory.add(memory_index)
+            elif register_index >= 0:
+                self.__dirty_registers.add(register_index)
+        if self.__trace is not None:
+            if memory_index >= 0:
+                self.__trace.record(self.PC, self.__instruction, MEMORY_WRITE, memory_index,
+                                    self.__value_at(memory_index, -1))
+            elif register_index >= 0:
+                self.__trace.record(self.PC, self.__instruction, REGISTER_WRITE, register_index,
+                                    self.__value_at(-1, register_index))
+            else:
+                self.__trace.record(self.PC, self.__instruction, NO_WRITE, 0, 0)
+
+    def __instrument(self) -> None:
+        """
+        Execute steps through the instrumented step only while writes are tracked or a trace is recorded.
+        :return: None
+        """
+        if self.__dirty_memory is None and self.__trace is None and self.__history is None:
+            self.__step = self.__untracked_step
+        else:
+            self.__step = self.__instrumented_step
+
+    def track_writes(self, enabled: bool = True) -> None:
+        """
+        Start or stop recording the memory addresses and the registers the machine writes to, steps are only
+        instrumented while writes are tracked and run executes them one at a time even on the JIT.
+        :param enabled: Whether to track the writes.
+        :return: None
+        """
+        if not enabled:
+            self.__dirty_memory = self.__dirty_registers = None
+        elif self.__dirty_memory is None:
+            self.__dirty_memory, self.__dirty_registers = set(), set()
+        self.__instrument()
+
+    def keep_history(self, steps: int = DEFAULT_HISTORY_LENGTH) -> None:
+        """
+        Start or stop keeping what the latest steps overwrote so that they can be undone by step_back, which costs
+        a record of a few integers per step. Run executes steps one at a time even on the JIT while it is kept.
+        :param steps: Number of steps to keep, the oldest ones are forgotten first, 0 stops keeping the history.
+        :return: None
+        """
+        if steps <= 0:
+            self.__history = None
+        elif self.__history is None or self.__history.maxlen != steps:
+            self.__history = deque(self.__history or (), maxlen=steps)
+        self.__instrument()
+
+    def history_length(self) -> int:
+        """
+        Return the number of steps that can be undone.
+        :return: the number of steps.
+        """
+        return 0 if self.__history is None else len(self.__history)
+
+    def clear_history(self) -> None:
+        """
+        Forget the steps kept so far, as when the memory or the registers are written to from outside a step, which
+        the steps could not be undone across.
+        :return: None
+        """
+        if self.__history is not None:
+            self.__history.clear()
+
+    def step_back(self, steps: Optional[int] = 1) -> int:
+        """
+        Undo the latest steps, restoring what they overwrote along with the special registers. The output they
+        wrote to STDOUT is not taken back and a trace being recorded does not see the undone steps.
+        :param steps: Number of steps to undo, as many as the history holds if None.
+        :return: the number of steps undone.
+        """
+        history = self.__history
+        undone = 0
+        while history and undone != steps:
+            self.PC, self.__instruction, self.__jmp, self.__can_continue, self.rf_sleeping, memory_index, \
+                register_index, value = history.pop()
+            if memory_index >= 0:
+                if self.__compact:
+                    self.__memory[memory_index] = value
+                else:
+                    self.__memory[memory_index].value = value
+                    self.__invalidate_decoded(memory_index)
+                if self.__dirty_memory is not None:
+                    self.__dirty_memory.add(memory_index)
+            elif register_index >= 0:
+                if self.__compact:
+                    self.__registers[register_index] = value
+                else:
+                    self.__registers[register_index].value = value
+                if self.__dirty_registers is not None:
+                    self.__dirty_registers.add(register_index)
+            undone += 1
+        return undone
+
+    def start_trace(self, file: BinaryIO, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL) -> TraceRecorder:
+        """
+        Start recording a trace of the steps the machine executes, which run executes one at a time even on the JIT.
+        :param file: File to record to, opened for binary writing, TraceReader reads it back.
+        :param keyframe_interval: Number of steps between keyframes holding the full state.
+        :return: the recorder.
+        """
+        self.stop_trace()
+        self.__trace = TraceRecorder(file, self, keyframe_interval)
+        self.__instrument()
+        return self.__trace
+
+    def stop_trace(self) -> None:
+        """
+        Stop recording the trace, writing the steps still buffered to its file.
+        :return: None
+        """
+        if self.__trace is not None:
+            self.__trace.flush()
+            self.__trace = None
+            self.__instrument()
+
+    def take_dirty(self) -> Tuple[Set[int], Set[int]]:
+        """
+        Return the memory addresses and the registers the machine wrote to since the last call, and forget them.
+        :return: the addresses and the indices of the registers.
+        """
+        if self.__dirty_memory is None:
+            raise ValueError("Writes are not tracked, call track_writes first.")
+        dirty = self.__dirty_memory, self.__dirty_registers
+        self.__dirty_memory, self.__dirty_registers = set(), set()
+        return dirty
+
+    def __next__(self):
+        if not self.__can_continue:
+            raise StopIteration
+        if self.PC == self.mem_size:
+            raise StopIteration
+        self.__step()
+        return self.return_memory(), self.return_registers()
 
     def __iter__(self):
         return self
 
+    def __run_steps(self, max_steps: Optional[int], until_pc: Optional[int]) -> Tuple[int, bool]:
+        """
+        Run the machine one instruction at a time.
+        :param max_steps: Maximum number of instructions to execute, unlimited if None.
+        :param until_pc: Stop once the PC reaches this address.
+        :return: the number of steps executed and whether the PC reached until_pc.
+        """
+        step = self.__step
+        steps = 0
+        while self.__can_continue and self.PC != self.mem_size and steps != max_steps:
+            step()
+            steps += 1
+            if self.PC == until_pc:
+                return steps, True
+        return steps, False
+
+    def __run_blocks(self, max_steps: Optional[int], until_pc: Optional[int]) -> Tuple[int, bool]:
+        """
+        Run the machine a compiled basic block at a time, stepping through instructions that cannot be compiled
+        or when a block would overrun the step limit or step over until_pc.
+        :param max_steps: Maximum number of instructions to execute, unlimited if None.
+        :param until_pc: Stop once the PC reaches this address.
+        :return: the number of steps executed and whether the PC reached until_pc.
+        """
+        lookup = self.__block_compiler.lookup
+        memory, registers, awaken = self.__memory, self.__registers, self.__awaken_rf_if
+        steps = 0
+        while self.__can_continue and self.PC != self.mem_size and steps != max_steps:
+            block = lookup(memory, self.PC)
+            if block.function is None:
+                iterations = 0
+            elif max_steps is None:
+                iterations = maxsize
+            else:
+                iterations = (max_steps - steps) // block.length
+            if until_pc is not None and (until_pc == block.start or block.passes(until_pc)):
+                iterations = min(iterations, 1 if until_pc == block.start else 0)
+            if iterations == 0 or (self.__jmp and block.starts_with_jump):
+                self.__step()
+                steps += 1
+            else:
+                try:
+                    self.PC, self.__jmp, halted, iterations = block.function(registers, memory, awaken, iterations)
+                except Bailout as bailout:
+                    # Execute the instruction the block bailed out of as the interpreter would, raising its error.
+                    self.PC = bailout.pc
+                    self.__jmp = bailout.jumped or (self.__jmp and bailout.pc == block.start)
+                    self.__step()
+                    raise
+                self.__instruction = block.last_instruction
+                self.__can_continue = not halted
+                steps += block.length * iterations
+            if self.PC == until_pc:
+                return steps, True
+        return steps, False
+
+    def run(self, max_steps: Optional[int] = None, until_pc: Optional[int] = None) -> RunResult:
+        """
+        Run the machine without yielding after every step.
+        :param max_steps: Maximum number of instructions to execute, unlimited if None.
+        :param until_pc: Stop once the PC reaches this address.
+        :return: the number of steps executed, why the machine stopped and what it wrote to STDOUT.
+        """
+        output: List[str] = [self.return_stdout()]
+        sink = self.__output_sink
+        if sink is None:
+            self.__output_sink = output.append
+        else:
+            def __forward(stdout: str) -> None:
+                output.append(stdout)
+                sink(stdout)
+            self.__output_sink = __forward
+        try:
+            if self.__block_compiler is None or self.__step != self.__untracked_step:
+                steps, reached_pc = self.__run_steps(max_steps, until_pc)
+            else:
+                steps, reached_pc = self.__run_blocks(max_steps, until_pc)
+        finally:
+            self.__output_sink = sink
+        if reached_pc:
+            halt_reason = HaltReason.REACHED_PC
+        elif not self.__can_continue:
+            halt_reason = HaltReason.HALTED
+        elif self.PC == self.mem_size:
+            halt_reason = HaltReason.END_OF_MEMORY
+        else:
+            halt_reason = HaltReason.STEP_LIMIT
+        return RunResult(steps, halt_reason, "".join(output))
+
     def load_memory(self, memory: List[Cell]):
         """
         Load the memory from a given list of Cells.
         :param memory: Memory to load.
         :return:
         """
+        self.clear_history()
+        if self.__compact:
+            values = bytes(cell.value for cell in memory[:self.mem_size])
+            self.__memory[:len(values)] = values
+            self.__memory[len(values):] = bytes(self.mem_size - len(values))
+            return
         if len(memory) < self.mem_size:
             padding = self.mem_size - len(memory)
             memory.extend(Cell() for _ in range(padding))
         self.__memory = memory
+        self.__decode_cache.clear()
 
+    def patch_memory(self, changes: Mapping[int, int]) -> None:
+        """
+        Write bytes to the memory, leaving the rest of it as it is.
+        :param changes: Addresses and the bytes to write to them.
+        :return: None
+        """
+        self.clear_history()
+        if self.__compact:
+            for memory_index, value in changes.items():
+                self.__memory[memory_index] = value
+            return
+        for memory_index, value in changes.items():
+            self.__memory[memory_index].value = value
+            self.__invalidate_decoded(memory_index)
 
     def load_registers(self, registers: List[Cell]):
         """
@@ -200,73 +698,237 @@ class Simulator:
         :param registers:
         :return:
         """
+        self.clear_history()
+        if self.__compact:
+            values = bytes(cell.value for cell in registers[:self.register_size])
+            self.__registers[:len(values)] = values
+            self.__registers[len(values):] = bytes(self.register_size - len(values))
+            return
         self.__registers = registers
 
-    def parse_program_memory(self, bytes_list: bytes):
+    def __write_memory(self, values: Buffer) -> None:
         """
-        Parse the memory of a *.prg file.
-        :param bytes_list:
+        Overwrite the memory in place, zeroing the addresses past the values.
+        :param values: Bytes of the memory, those past the memory size are ignored.
+        :return: None
+        """
+        self.clear_history()
+        length = min(len(values), self.mem_size)
+        if self.__compact:
+            self.__memory[:length] = values[:length]
+            self.__memory[length:] = bytes(self.mem_size - length)
+            return
+        for cell, value in zip(self.__memory, bytes(values[:length]).ljust(self.mem_size, b"\0")):
+            cell.value = value
+        self.__decode_cache.clear()
+
+    def __write_registers(self, values: Buffer) -> None:
+        """
+        Overwrite the registers in place, zeroing the registers past the values.
+        :param values: Bytes of the registers, those past the register size are ignored.
+        :return: None
+        """
+        self.clear_history()
+        length = min(len(values), self.register_size)
+        if self.__compact:
+            self.__registers[:length] = values[:length]
+            self.__registers[length:] = bytes(self.register_size - length)
+            return
+        for cell, value in zip(self.__registers, bytes(values[:length]).ljust(self.register_size, b"\0")):
+            cell.value = value
+
+    def parse_program_memory(self, bytes_list: Buffer):
+        """
+        Parse the memory of a *.prg file, taking every fourth byte with a single strided slice.
+        :param bytes_list: Bytes holding the memory in the *.prg format, any buffer such as a memoryview or an mmap.
         :return:
         """
-        actual_bytes = [bytes_list[4*i] for i in range(len(bytes_list)//4)]
-        empty_mem = [Cell() for _ in range(self.mem_size)]
-        for i, byte in enumerate(actual_bytes):
-            empty_mem[i].value = byte
-        self.load_memory(empty_mem)
+        with memoryview(bytes_list) as view:
+            self.__write_memory(view[:self.mem_size * 4:4])
 
-    def parse_program_state(self, bytes_list: bytes):
+    def parse_program_state(self, bytes_list: Buffer):
         """
         Parse the program state of a SVM
-        :param bytes_list: Bytes holding the program state in the file as a *.svm format.
+        :param bytes_list: Bytes holding the program state in the file as a *.svm format, any buffer such as a
+            memoryview or an mmap.
         :return: None.
         """
-        empty_mem = [Cell() for _ in range(self.mem_size)]
-        empty_regs = [Cell() for _ in range(self.register_size)]
-        self.reset_special_registers()
-        self.IR = ""
-        for i, byte in enumerate(bytes_list):
-            if i < self.mem_size:
-                empty_mem[i].value = byte
-            elif i < self.mem_size + self.register_size:
-                empty_regs[i].value = byte
-            elif i < self.mem_size + self.register_size + 1:
-                self.PC = byte
-            else:
-                self.IR += format(byte, "02X")
-        self.load_memory(empty_mem)
-        self.load_registers(empty_regs)
+        registers_start = self.mem_size
+        pc_index = registers_start + self.register_size
+        with memoryview(bytes_list) as view:
+            self.__write_memory(view[:registers_start])
+            self.__write_registers(view[registers_start:pc_index])
+            self.PC = view[pc_index] if len(view) > pc_index else 0
+            self.IR = int.from_bytes(view[pc_index + 1:], "big")
 
     def dump_program_memory(self, array_: List[Cell] = None) -> bytes:
         """
         Dump the program memory as in a *.pkg format.
+        :param array_: Cells to dump instead of the memory, such as the registers.
         :return: the dumped memory as bytes.
         """
         if not array_:
-            array_ = self.__memory
-        byte_ready: List[int] = []
-        for cell in array_:
-            byte_ready.append(cell.value)
-            for i in range(3):
-                byte_ready.append(0)
-        bytes_obj = bytes(byte_ready)
-        return bytes_obj
+            image = bytearray(self.mem_size * 4)
+            self.dump_program_memory_into(image)
+        else:
+            image = bytearray(len(array_) * 4)
+            image[::4] = bytes(cell.value for cell in array_)
+        return bytes(image)
 
     def dump_program_svm_state(self) -> bytes:
         """
         Dump the program state including registers and special registers.
         :return: the dumped program state.
         """
-        byte_array = self.dump_program_memory()  + self.dump_program_memory(self.__registers)
-        byte_obj = bytes(byte_array[i] for i in range(0, len(byte_array), 4))
-        byte_obj += bytes([self.PC])
-        byte_obj += bytes([int(self.IR[:2], base=16), int(self.IR[2:], base=16)])
-        return byte_obj
+        state = bytearray(self.mem_size + self.register_size + 3)
+        self.dump_program_svm_state_into(state)
+        return bytes(state)
+
+    def snapshot(self) -> bytes:
+        """
+        Take an immutable snapshot of the machine, its state in the *.svm format followed by a byte of the jump, halt
+        and RF flags and the high byte of the PC, which the *.svm format leaves out.
+        :return: the snapshot.
+        """
+        state_size = self.mem_size + self.register_size + 3
+        snapshot = bytearray(state_size + SNAPSHOT_TRAILER_SIZE)
+        self.dump_program_svm_state_into(snapshot)
+        snapshot[state_size] = self.__jmp | self.__can_continue << 1 | self.rf_sleeping << 2
+        snapshot[state_size + 1] = self.PC >> 8
+        return bytes(snapshot)
+
+    def restore(self, snapshot: Buffer) -> None:
+        """
+        Restore the machine to a snapshot, overwriting its memory and registers in place. The history of steps to
+        step back through is forgotten, and everything counts as written to while writes are tracked.
+        :param snapshot: Snapshot taken by snapshot, of a machine of the same memory and register sizes.
+        :return: None
+        """
+        state_size = self.mem_size + self.register_size + 3
+        if len(snapshot) != state_size + SNAPSHOT_TRAILER_SIZE:
+            raise ValueError(f"A snapshot of this machine takes {state_size + SNAPSHOT_TRAILER_SIZE} bytes, "
+                             f"not {len(snapshot)}.")
+        self.parse_program_state(memoryview(snapshot)[:state_size])
+        flags = snapshot[state_size]
+        self.PC |= snapshot[state_size + 1] << 8
+        self.__jmp, self.__can_continue, self.rf_sleeping = bool(flags & 1), bool(flags & 2), bool(flags & 4)
+        if self.__dirty_memory is not None:
+            self.__dirty_memory.update(range(self.mem_size))
+            self.__dirty_registers.update(range(self.register_size))
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Buffer, stdout_register_indices: List[int], mem_size: int = 256,
+                      **options: bool) -> "Simulator":
+        """
+        Create a machine from a snapshot.
+        :param snapshot: Snapshot taken by snapshot.
+        :param stdout_register_indices: Registers mapped to STDOUT.
+        :param mem_size: Size of the memory, the size of the registers follows from the size of the snapshot.
+        :param options: integer_core, compact and jit, as for the constructor.
+        :return: the machine.
+        """
+        simulator = cls(mem_size, len(snapshot) - mem_size - 3 - SNAPSHOT_TRAILER_SIZE, stdout_register_indices,
+                        **options)
+        simulator.restore(snapshot)
+        return simulator
+
+    def fork(self) -> "Simulator":
+        """
+        Clone the machine into a detached one executing through the same engine, without its history, trace or
+        output sink. JIT machines share their compiled blocks with their clones, which is safe as blocks are checked
+        against the memory they run on and hold no state of their own.
+        :return: the clone.
+        """
+        clone = self.from_snapshot(self.snapshot(), list(self.stdout_register_indices), self.mem_size, **self.__options)
+        if self.__block_compiler is not None:
+            clone.__block_compiler = self.__block_compiler
+        return clone
+
+    def __memory_bytes(self) -> Buffer:
+        """
+        Return the bytes of the memory, the backing buffer itself for compact machines.
+        :return: the bytes.
+        """
+        if self.__compact:
+            return self.__memory
+        return bytes(cell.value for cell in self.__memory)
+
+    def __register_bytes(self) -> Buffer:
+        """
+        Return the bytes of the registers, the backing buffer itself for compact machines.
+        :return: the bytes.
+        """
+        if self.__compact:
+            return self.__registers
+        return bytes(cell.value for cell in self.__registers)
+
+    def __special_register_bytes(self) -> bytes:
+        """
+        Return the PC and the IR as they are laid out in the *.svm format.
+        :return: the bytes.
+        """
+        # A machine that ran off the end of the memory has its PC past the last address, which a byte cannot hold.
+        return bytes((self.PC & 0xFF, self.__instruction >> 8, self.__instruction & 0xFF))
+
+    def dump_program_memory_into(self, buffer: Buffer, offset: int = 0) -> int:
+        """
+        Write the memory in the *.prg format into a writable buffer with a single strided assignment, the padding
+        bytes are left as they are, so a zeroed buffer ends up holding a *.prg image.
+        :param buffer: Buffer such as a bytearray, a writable memoryview or an mmap, of at least offset + 4 * mem_size
+            bytes.
+        :param offset: Index of the buffer to start writing at.
+        :return: the number of bytes the image takes.
+        """
+        size = self.mem_size * 4
+        with memoryview(buffer) as view:
+            view[offset:offset + size:4] = self.__memory_bytes()
+        return size
+
+    def dump_program_svm_state_into(self, buffer: Buffer, offset: int = 0) -> int:
+        """
+        Write the program state in the *.svm format into a writable buffer.
+        :param buffer: Buffer such as a bytearray, a writable memoryview or an mmap, of at least offset +
+            mem_size + register_size + 3 bytes.
+        :param offset: Index of the buffer to start writing at.
+        :return: the number of bytes the state takes.
+        """
+        registers_start = offset + self.mem_size
+        pc_index = registers_start + self.register_size
+        with memoryview(buffer) as view:
+            view[offset:registers_start] = self.__memory_bytes()
+            view[registers_start:pc_index] = self.__register_bytes()
+            view[pc_index:pc_index + 3] = self.__special_register_bytes()
+        return pc_index + 3 - offset
+
+    def write_program(self, file: BinaryIO) -> int:
+        """
+        Write the memory in the *.prg format to a binary file.
+        :param file: The file, opened for writing.
+        :return: the number of bytes written.
+        """
+        image = bytearray(self.mem_size * 4)
+        self.dump_program_memory_into(image)
+        return file.write(image)
+
+    def write_state(self, file: BinaryIO) -> int:
+        """
+        Write the program state in the *.svm format to a binary file, streaming the memory and the registers of
+        compact machines straight from their buffers.
+        :param file: The file, opened for writing.
+        :return: the number of bytes written.
+        """
+        return file.write(self.__memory_bytes()) + file.write(self.__register_bytes()) + \
+            file.write(self.__special_register_bytes())
 
     def return_memory(self) -> List[Cell]:
         """
         Return memory.
         :return: the memory.
         """
+        if self.__compact:
+            if self.__memory_views is None:
+                self.__memory_views = cell_views(self.__memory)
+            return self.__memory_views
         return self.__memory
 
     def return_registers(self) -> List[Cell]:
@@ -274,6 +936,10 @@ class Simulator:
         Return the registers
         :return: the registers.
         """
+        if self.__compact:
+            if self.__register_views is None:
+                self.__register_views = cell_views(self.__registers)
+            return self.__register_views
         return self.__registers
 
     def reset_special_registers(self) -> None:
@@ -287,12 +953,39 @@ class Simulator:
     def __put_rf_to_sleep(self):
         self.rf_sleeping = True
 
+    def __read_stdout(self) -> str:
+        """
+        Read the characters held in the STDOUT registers.
+        :return: the characters.
+        """
+        if self.__compact:
+            return "".join(chr(self.__registers[index]) for index in self.stdout_register_indices)
+        return "".join(chr(self.__registers[index].value) for index in self.stdout_register_indices)
+
     def return_stdout(self) -> str:
+        """
+        Return the STDOUT if RF was modified since the last call, when an output sink is set, the output is
+        written to the sink instead.
+        :return: the output.
+        """
         if self.rf_sleeping:
             return ""
-        stdout = ""
-        for stdout_register_index in self.stdout_register_indices:
-            register_value = self.__registers[stdout_register_index].value
-            stdout += chr(register_value)
+        stdout = self.__read_stdout()
         self.__put_rf_to_sleep()
-        return stdout
\ No newline at end of file
+        return stdout
+
+    def set_output_sink(self, sink: Union[TextIO, bytearray, Callable[[str], None], None]) -> None:
+        """
+        Write the STDOUT to a sink each time RF is modified instead of waiting for return_stdout to be polled.
+        :param sink: A text stream such as io.StringIO, a bytearray to extend with the bytes written or a callable
+            taking the characters written. None removes the current sink.
+        :return: None
+        """
+        if sink is None:
+            self.__output_sink = None
+        elif isinstance(sink, bytearray):
+            self.__output_sink = lambda stdout: sink.extend(stdout.encode("latin-1"))
+        elif hasattr(sink, "write"):
+            self.__output_sink = sink.write
+        else:
+            self.__output_sink = sink
\ No newline at end of file
@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from spacecat.lexer import AssemblyError
+from spacecat.parser import Label, Operand, parse_numeral
+
+NUMERAL_STARTS = "0123456789-$"  # Characters a word must start with to be read as a numeral before any label.
+
+
+def plain_numeral(word: str) -> Optional[int]:
+    """
+    Return the value of a word that can only be taken as a numeral, one starting with a digit, a sign or $.
+    :param word: The word.
+    :return: the value, None if the word is not such a numeral.
+    """
+    return parse_numeral(word) if word[:1] in NUMERAL_STARTS else None
+
+
+@dataclass
+class Fixup:
+    """
+    A word an assembled statement referenced before it could be resolved, patched into the statement's encoding once
+    the program is read.
+    """
+    operand: Operand
+    encoding: bytearray
+    offset: int
+    size: int
+    shift: int
+    nibbles: int
+
+
+class SymbolTable:
+    """
+    Labels of a program and the references still waiting for them.
+
+    A word starting with a digit, a sign or $ that spells a numeral is that numeral. Any other word is resolved to a
+    label when one with the same name is defined anywhere in the program, otherwise it must be a numeral, so words
+    such as "a" are deferred as fixups when they are referenced before a label by that name is defined, as the label
+    may be defined further down.
+    """
+    def __init__(self):
+        """
+        Initialise an empty symbol table.
+        """
+        self.addresses: Dict[str, int] = {}
+        self.__fixups: List[Fixup] = []
+
+    def define(self, label: Label, address: int) -> None:
+        """
+        Define a label.
+        :param label: The label.
+        :param address: Address the label points to.
+        :return: None
+        """
+        if label.name in self.addresses:
+            raise AssemblyError(f"Label {label.name!r} is defined more than once.", label.line, label.column)
+        self.addresses[label.name] = address
+
+    def lookup(self, name: str) -> Optional[int]:
+        """
+        Return the address of a label defined so far.
+        :param name: Name of the label.
+        :return: the address, None if no label with the name is defined yet.
+        """
+        return self.addresses.get(name)
+
+    def resolve_now(self, word: str) -> Optional[int]:
+        """
+        Resolve a word with the labels defined so far.
+        :param word: The word.
+        :return: the value, None if the word has to wait for the rest of the program.
+        """
+        numeral = plain_numeral(word)
+        return self.addresses.get(word) if numeral is None else numeral
+
+    def defer(self, fixup: Fixup) -> None:
+        """
+        Defer a reference until the program is read.
+        :param fixup: The reference.
+        :return: None
+        """
+        self.__fixups.append(fixup)
+
+    def resolve(self, operand: Operand) -> int:
+        """
+        Resolve a word to the address of a label or to the numeral it spells.
+        :param operand: Operand holding the word.
+        :return: the value.
+        """
+        numeral = plain_numeral(operand.value)
+        if numeral is not None:
+            return numeral
+        address = self.addresses.get(operand.value)
+        if address is not None:
+            return address
+        numeral = parse_numeral(operand.value)
+        if numeral is None:
+            raise AssemblyError(f"Undefined label {operand.value!r}.", operand.line, operand.column)
+        return numeral
+
+    def fixups(self) -> List[Fixup]:
+        """
+        Return the deferred references.
+        :return: the references, in the order they were deferred.
+        """
+        return self.__fixups
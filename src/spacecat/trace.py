@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+from os import SEEK_END
+from struct import Struct
+from typing import TYPE_CHECKING, BinaryIO
+
+if TYPE_CHECKING:
+    from spacecat.simulator import Simulator
+
+TRACE_MAGIC = b"SVMT"
+TRACE_VERSION = 1
+DEFAULT_KEYFRAME_INTERVAL = 4096
+HEADER = Struct("<4sBHBI")  # Magic, version, memory size, register size and keyframe interval.
+KEYFRAME = Struct("<Q")  # Number of steps executed, followed by the state in the *.svm format.
+DELTA = Struct("<HHBHB")  # PC and IR after the step, what the step wrote to, its index and the value written.
+FLUSH_SIZE = 64 * 1024
+
+NO_WRITE = 0
+REGISTER_WRITE = 1
+MEMORY_WRITE = 2
+
+
+@dataclass(frozen=True)
+class TraceStep:
+    """
+    A step of a trace, what the machine looked like once it executed the step.
+    """
+    PC: int
+    IR: int
+    kind: int  # NO_WRITE, REGISTER_WRITE or MEMORY_WRITE.
+    index: int
+    value: int
+
+
+class TraceRecorder:
+    """
+    Records the steps of a simulator as deltas of a few bytes each into a binary file, with a keyframe holding the full
+    state every keyframe_interval steps. A trace is a header, followed by the keyframe of the starting state and blocks
+    of keyframe_interval deltas each followed by the keyframe they lead to, so the position of any step is known
+    without an index. Deltas are buffered and written along with the keyframes.
+    """
+    def __init__(self, file: BinaryIO, simulator: "Simulator", keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        """
+        Initialise the recorder, writing the header and the keyframe of the current state.
+        :param file: File to record to, opened for binary writing.
+        :param simulator: Simulator being recorded, it calls record after each step.
+        :param keyframe_interval: Number of steps between keyframes.
+        """
+        if keyframe_interval <= 0:
+            raise ValueError("The keyframe interval must be positive.")
+        self.file = file
+        self.simulator = simulator
+        self.keyframe_interval = keyframe_interval
+        self.steps = 0
+        self.__buffer = bytearray()
+        file.write(HEADER.pack(TRACE_MAGIC, TRACE_VERSION, simulator.mem_size, simulator.register_size,
+                               keyframe_interval))
+        self.__keyframe()
+
+    def __keyframe(self) -> None:
+        """
+        Write the buffered deltas and a keyframe of the current state.
+        :return: None
+        """
+        self.__buffer += KEYFRAME.pack(self.steps)
+        self.flush()
+        self.simulator.write_state(self.file)
+
+    def record(self, pc: int, instruction: int, kind: int, index: int, value: int) -> None:
+        """
+        Record a step.
+        :param pc: The PC after the step.
+        :param instruction: The instruction executed.
+        :param kind: What the step wrote to, NO_WRITE, REGISTER_WRITE or MEMORY_WRITE.
+        :param index: Index of the register or address of the memory written to, 0 if nothing was written.
+        :param value: Value written, 0 if nothing was written.
+        :return: None
+        """
+        self.__buffer += DELTA.pack(pc, instruction, kind, index, value)
+        self.steps += 1
+        if self.steps % self.keyframe_interval == 0:
+            self.__keyframe()
+        elif len(self.__buffer) >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered deltas to the file.
+        :return: None
+        """
+        self.file.write(self.__buffer)
+        self.__buffer.clear()
+
+
+class TraceReader:
+    """
+    Reads a trace recorded by TraceRecorder, rebuilding the state after any step from the keyframe preceding it.
+    """
+    def __init__(self, file: BinaryIO):
+        """
+        Initialise the reader, reading the header.
+        :param file: File holding the trace, opened for binary reading.
+        """
+        self.file = file
+        file.seek(0)
+        magic, version, self.mem_size, self.register_size, self.keyframe_interval = \
+            HEADER.unpack(file.read(HEADER.size))
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            raise ValueError("Not a trace of a supported version.")
+        self.state_size = self.mem_size + self.register_size + 3
+        self.keyframe_size = KEYFRAME.size + self.state_size
+        self.block_size = self.keyframe_interval * DELTA.size + self.keyframe_size
+        self.__length = file.seek(0, SEEK_END)
+        length = self.__length - HEADER.size - self.keyframe_size
+        if length < 0:
+            raise ValueError("The trace is missing its first keyframe.")
+        blocks, rest = divmod(length, self.block_size)
+        self.steps = blocks * self.keyframe_interval + min(rest // DELTA.size, self.keyframe_interval)
+
+    def __check(self, step: int) -> None:
+        """
+        Check that a step was recorded.
+        :param step: Number of the step.
+        :return: None
+        """
+        if not 0 <= step <= self.steps:
+            raise IndexError(f"Step {step} is outside the trace of {self.steps} steps.")
+
+    def step(self, step: int) -> TraceStep:
+        """
+        Read a step.
+        :param step: Number of the step, starting from 1.
+        :return: the step.
+        """
+        self.__check(step)
+        if step == 0:
+            raise IndexError("Step 0 is the starting state, it has no delta.")
+        block, position = divmod(step - 1, self.keyframe_interval)
+        self.file.seek(HEADER.size + self.keyframe_size + block * self.block_size + position * DELTA.size)
+        return TraceStep(*DELTA.unpack(self.file.read(DELTA.size)))
+
+    def state_at(self, step: int) -> bytes:
+        """
+        Rebuild the state after a step by replaying the deltas following the nearest keyframe.
+        :param step: Number of the step, 0 for the starting state.
+        :return: the state in the *.svm format.
+        """
+        self.__check(step)
+        block, position = divmod(step, self.keyframe_interval)
+        if position == 0 and HEADER.size + block * self.block_size + self.keyframe_size > self.__length:
+            # The keyframe closing the last block was cut short, as when the recording stopped while writing it.
+            block, position = block - 1, self.keyframe_interval
+        offset = HEADER.size + block * self.block_size
+        self.file.seek(offset)
+        keyframe = self.file.read(self.keyframe_size + position * DELTA.size)
+        state = bytearray(keyframe[KEYFRAME.size:self.keyframe_size])
+        pc_index = self.mem_size + self.register_size
+        pc, instruction = None, None
+        for pc, instruction, kind, index, value in DELTA.iter_unpack(memoryview(keyframe)[self.keyframe_size:]):
+            if kind == REGISTER_WRITE:
+                state[self.mem_size + index] = value
+            elif kind == MEMORY_WRITE:
+                state[index] = value
+        if pc is not None:
+            state[pc_index:] = bytes((pc & 0xFF, instruction >> 8, instruction & 0xFF))
+        return bytes(state)
@@ -0,0 +1,235 @@
+from dataclasses import dataclass
+from enum import Enum
+from queue import Empty, Queue
+from threading import Event, Thread
+from time import monotonic
+from typing import FrozenSet, List, Optional, Tuple
+from spacecat.debugger import Debugger
+from spacecat.runner import run_slice
+from spacecat.simulator import HaltReason, Simulator
+
+
+class Command(Enum):
+    RUN = "run"
+    PAUSE = "pause"
+    STEP = "step"
+    STEP_BACK = "step back"
+    RUN_BACK = "run back"
+    STOP = "stop"
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    State of the machine published by the worker, along with what changed since the previous snapshot.
+    """
+    memory: bytes
+    registers: bytes
+    PC: int
+    IR: str
+    output: str
+    dirty_memory: FrozenSet[int]
+    dirty_registers: FrozenSet[int]
+    steps: int  # Negative when the machine stepped back.
+    running: bool
+    error: Optional[str] = None
+
+    def merge(self, later: "Snapshot") -> "Snapshot":
+        """
+        Combine the snapshot with a later one, as if the two were published as one.
+        :param later: The later snapshot.
+        :return: the combined snapshot.
+        """
+        return Snapshot(later.memory, later.registers, later.PC, later.IR, self.output + later.output,
+                        self.dirty_memory | later.dirty_memory, self.dirty_registers | later.dirty_registers,
+                        self.steps + later.steps, later.running, later.error or self.error)
+
+
+class SimulationWorker:
+    """
+    Runs a simulator on a thread of its own. The thread takes commands from a queue and publishes snapshots to another,
+    so the caller never touches the simulator while it runs, it may once pause has returned.
+    """
+    def __init__(self, simulator: Simulator, slice_seconds: float = 0.010, frame_interval: float = 1 / 30,
+                 debugger: Optional[Debugger] = None):
+        """
+        Initialise the worker, the thread starts with start.
+        :param simulator: Simulator to run, its writes are tracked and its output is captured by the worker.
+        :param slice_seconds: Seconds the machine runs between checks of the command queue when unpaced.
+        :param frame_interval: Minimum number of seconds between snapshots of a running machine when unpaced.
+        :param debugger: Debugger of the simulator to run the machine through, the machine stops where it breaks.
+        """
+        self.simulator = simulator
+        self.debugger = debugger
+        self.slice_seconds = slice_seconds
+        self.frame_interval = frame_interval
+        self.commands: "Queue[Tuple[Command, Optional[float], Optional[Event]]]" = Queue()
+        self.snapshots: "Queue[Snapshot]" = Queue()
+        self.__output: List[str] = []
+        self.__next_frame = 0.0
+        self.__thread = Thread(target=self.__loop, name="spacecat-simulation", daemon=True)
+
+    def start(self) -> None:
+        """
+        Start the thread.
+        :return: None
+        """
+        self.simulator.track_writes()
+        self.simulator.set_output_sink(self.__output.append)
+        self.__thread.start()
+
+    def __send(self, command: Command, interval: Optional[float] = None, wait: bool = False) -> None:
+        """
+        Send a command to the thread.
+        :param command: The command.
+        :param interval: Seconds between steps for RUN, None to run as fast as possible.
+        :param wait: Block until the thread has carried the command out.
+        :return: None
+        """
+        done = Event() if wait else None
+        self.commands.put((command, interval, done))
+        if done is not None and self.__thread.is_alive():
+            done.wait()
+
+    def resume(self, interval: Optional[float] = None) -> None:
+        """
+        Run the machine until it stops or is paused.
+        :param interval: Seconds between steps, None to run as fast as possible.
+        :return: None
+        """
+        self.__send(Command.RUN, interval)
+
+    def pause(self) -> None:
+        """
+        Pause the machine, returning once it is paused so that the simulator can be used by the caller.
+        :return: None
+        """
+        self.__send(Command.PAUSE, wait=True)
+
+    def step(self) -> None:
+        """
+        Pause the machine and execute a single instruction.
+        :return: None
+        """
+        self.__send(Command.STEP)
+
+    def step_back(self) -> None:
+        """
+        Pause the machine and undo a single instruction, the simulator must keep its history.
+        :return: None
+        """
+        self.__send(Command.STEP_BACK)
+
+    def run_back(self) -> None:
+        """
+        Pause the machine and undo instructions until it is back at a breakpoint of the debugger, or at the start of
+        its history.
+        :return: None
+        """
+        self.__send(Command.RUN_BACK)
+
+    def stop(self) -> None:
+        """
+        Stop the thread.
+        :return: None
+        """
+        self.__send(Command.STOP)
+        if self.__thread.is_alive():
+            self.__thread.join()
+
+    def poll(self) -> Optional[Snapshot]:
+        """
+        Take the snapshots published since the last poll, combined into one.
+        :return: the snapshot, None if none was published.
+        """
+        snapshot = None
+        while True:
+            try:
+                later = self.snapshots.get_nowait()
+            except Empty:
+                return snapshot
+            snapshot = later if snapshot is None else snapshot.merge(later)
+
+    def __publish(self, steps: int, running: bool, error: Optional[str] = None) -> None:
+        """
+        Publish a snapshot of the machine.
+        :param steps: Number of instructions executed since the last snapshot.
+        :param running: Whether the machine keeps running.
+        :param error: Error the machine stopped with.
+        :return: None
+        """
+        simulator = self.simulator
+        dirty_memory, dirty_registers = simulator.take_dirty()
+        output = "".join(self.__output)
+        self.__output.clear()
+        self.snapshots.put(Snapshot(bytes(cell.value for cell in simulator.return_memory()),
+                                    bytes(cell.value for cell in simulator.return_registers()), simulator.PC,
+                                    simulator.IR, output, frozenset(dirty_memory), frozenset(dirty_registers), steps,
+                                    running, error))
+
+    def __execute(self, steps: int, paced: bool, keep_running: bool) -> Tuple[int, bool]:
+        """
+        Execute a step when paced or a time slice otherwise, publishing a snapshot if a frame is due.
+        :param steps: Number of instructions executed since the last snapshot.
+        :param paced: Execute a single step.
+        :param keep_running: Whether the machine should keep running afterwards, a snapshot is always published if not.
+        :return: the number of instructions executed since the last snapshot and whether the machine keeps running.
+        """
+        machine = self.debugger or self.simulator
+        try:
+            result = machine.run(max_steps=1) if paced else run_slice(machine, self.slice_seconds)
+        except Exception as error:
+            self.__publish(steps, False, f"{type(error).__name__}: {error}")
+            return 0, False
+        steps += result.steps
+        running = keep_running and result.halt_reason == HaltReason.STEP_LIMIT
+        now = monotonic()
+        if not running or paced or now >= self.__next_frame:
+            self.__next_frame = now + self.frame_interval
+            self.__publish(steps, running)
+            steps = 0
+        return steps, running
+
+    def __loop(self) -> None:
+        """
+        Carry out commands and run the machine until told to stop.
+        :return: None
+        """
+        running, interval, steps = False, None, 0
+        while True:
+            try:
+                if not running:
+                    command, argument, done = self.commands.get()
+                elif interval is None:
+                    command, argument, done = self.commands.get_nowait()
+                else:
+                    command, argument, done = self.commands.get(timeout=interval)
+            except Empty:
+                command, argument, done = None, None, None
+            if command is Command.STOP:
+                if done is not None:
+                    done.set()
+                return
+            if command is Command.RUN:
+                running, interval = True, argument
+            elif command is Command.PAUSE and running:
+                running = False
+                self.__publish(steps, False)
+                steps = 0
+            elif command is Command.STEP:
+                running = False
+                steps, _ = self.__execute(steps, True, False)
+            elif command in (Command.STEP_BACK, Command.RUN_BACK):
+                running = False
+                if command is Command.STEP_BACK:
+                    steps -= self.simulator.step_back()
+                elif self.debugger is not None:
+                    steps -= self.debugger.run_back()
+                else:
+                    steps -= self.simulator.step_back(None)
+                self.__publish(steps, False)
+                steps = 0
+            if running:
+                steps, running = self.__execute(steps, interval is not None, True)
+            if done is not None:
+                done.set()
@@ -0,0 +1,77 @@
+from typing import Iterable, Iterator, Tuple
+from spacecat.assembler import Assembler
+from spacecat.simulator import Simulator
+
+# Options of the constructor selecting each engine, tests run over them under a subTest per engine.
+ENGINES = {"cell": {}, "integer core": {"integer_core": True}, "compact": {"compact": True}, "jit": {"jit": True}}
+
+test_code = """load R0, 0Ah
+load R1, 1
+load R2, 00100011b
+load R3, 30h
+loop:
+    addi R4, R4, R1
+    addf R5, R2, R4
+    ror R2, 4
+    or R6, R2, R4
+    and R7, R6, R2
+    xor R8, R7, R5
+    store R8, [F0h]
+    store R4, R[3]
+    load R9, [F0h]
+    load RA, R[3]
+    move RF, RA
+    addi R3, R3, R1
+    jmpLE R4<=R0, loop
+    jmpEQ R4=R0, loop
+    halt"""
+
+self_modifying_code = """load R0, 42h
+loop:
+    load RF, 41h
+    load R1, 42h
+    store R1, [03h]
+    jmpEQ RF=R0, end
+    jmp loop
+end:
+    halt"""
+
+letters_code = """load R0, 5Ah
+load R1, 1
+load R2, 41h
+loop:
+    move RF, R2
+    addi R2, R2, R1
+    jmpLE R2<=R0, loop
+    halt"""
+
+infinite_code = """loop:
+    load R1, 1
+    jmpEQ R0=R0, loop"""
+
+
+def assemble(code: str, length: int) -> str:
+    return "".join(format(cell.value, "02X") for cell in Assembler.instantiate(code, 256).memory[:length])
+
+
+def machine(code: str = "", **options: bool) -> Simulator:
+    """
+    Build a machine of 256 bytes of memory and 16 registers, RF being STDOUT, with a program loaded.
+    :param code: The program.
+    :param options: Options of the constructor.
+    :return: the machine.
+    """
+    simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15], **options)
+    simulator.load_memory(Assembler.instantiate(code, 256).memory)
+    return simulator
+
+
+def machines(code: str = "", engines: Iterable[str] = tuple(ENGINES)) -> Iterator[Tuple[str, Simulator]]:
+    """
+    Build a machine per engine with a program loaded, to be checked under self.subTest(engine=engine).
+    :param code: The program.
+    :param engines: Names of the engines, from ENGINES.
+    :return: the name of each engine and its machine.
+    """
+    for engine in engines:
+        yield engine, machine(code, **ENGINES[engine])
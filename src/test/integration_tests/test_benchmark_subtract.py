@@ -41,5 +41,40 @@ class AlphabetBenchmark(unittest.TestCase):
                 self.fail("Failed to resolve in given CPU Cycles.")
         self.assertEqual('P', output)
 
+    def test_simulator_integer_core(self):
+        a_ = assembler.Assembler.instantiate(test_code, mem_size=128)
+        s_ = simulator.Simulator(mem_size=128, register_size=16, stdout_register_indices=[15], integer_core=True)
+        s_.load_memory(a_.memory)
+        output = ""
+        i = 0
+        for _ in s_:
+            output += s_.return_stdout()
+            i += 1
+            if i == 10_000:
+                self.fail("Failed to resolve in given CPU Cycles.")
+        self.assertEqual('P', output)
+
+    def test_simulator_compact(self):
+        a_ = assembler.Assembler.instantiate(test_code, mem_size=128)
+        s_ = simulator.Simulator(mem_size=128, register_size=16, stdout_register_indices=[15], compact=True)
+        s_.load_memory(a_.memory)
+        output = ""
+        i = 0
+        for _ in s_:
+            output += s_.return_stdout()
+            i += 1
+            if i == 10_000:
+                self.fail("Failed to resolve in given CPU Cycles.")
+        self.assertEqual('P', output)
+
+    def test_simulator_run(self):
+        a_ = assembler.Assembler.instantiate(test_code, mem_size=128)
+        s_ = simulator.Simulator(mem_size=128, register_size=16, stdout_register_indices=[15])
+        s_.load_memory(a_.memory)
+        result = s_.run(max_steps=10_000)
+        if result.halt_reason == simulator.HaltReason.STEP_LIMIT:
+            self.fail("Failed to resolve in given CPU Cycles.")
+        self.assertEqual('P', result.output)
+
 if __name__ == '__main__':
     unittest.main()
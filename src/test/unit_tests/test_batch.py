@@ -0,0 +1,93 @@
+from io import BytesIO
+from random import Random
+from unittest import TestCase, skipIf
+from spacecat.assembler import Assembler
+from spacecat.common_utils import Cell
+from spacecat.simulator import Simulator
+from test.helpers import self_modifying_code, test_code
+try:
+    from spacecat.batch import BatchSimulator
+except ImportError:
+    BatchSimulator = None
+
+fuzz_code = """loop:
+    addf R5, R1, R2
+    ror R1, 1
+    addi R2, R2, R3
+    xor R6, R5, R4
+    and R7, R6, R2
+    or RF, R7, R1
+    load RA, R[R2]
+    store R6, R[R4]
+    jmpLE R2<=R0, loop
+    jmpEQ R1=R0, loop
+    halt"""
+
+
+@skipIf(BatchSimulator is None, "NumPy is not installed.")
+class TestBatchSimulator(TestCase):
+    @staticmethod
+    def simulate(code: str, registers: bytes):
+        s_ = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        s_.load_memory(Assembler.instantiate(code, 256).memory)
+        s_.load_registers([Cell(format(value, "02X")) for value in registers])
+        output = ""
+        faulted = False
+        try:
+            for i, _ in enumerate(s_):
+                output += s_.return_stdout()
+                if i == 500:
+                    break
+        except IndexError:
+            faulted = True
+        state = bytes(cell.value for cell in s_.return_memory()), \
+            bytes(cell.value for cell in s_.return_registers()), s_.PC, s_.IR
+        return state, output, faulted
+
+    def assert_matches(self, code: str, register_states):
+        batch = BatchSimulator(len(register_states))
+        batch.load_memory(Assembler.instantiate(code, 256).memory)
+        batch.load_registers(register_states)
+        for _ in range(501):
+            if not batch.step():
+                break
+        for machine, registers in enumerate(register_states):
+            state, output, faulted = self.simulate(code, registers)
+            self.assertEqual(faulted, batch.faulted[machine])
+            if not faulted:
+                self.assertEqual(state, batch.machine_state(machine))
+            self.assertEqual(output, batch.output(machine))
+
+    def test_matches_simulator(self):
+        for code in (test_code, self_modifying_code):
+            self.assert_matches(code, [bytes(16)])
+
+    def test_fuzzed_registers(self):
+        random = Random(1)
+        self.assert_matches(fuzz_code, [bytes(random.randrange(256) for _ in range(16)) for _ in range(64)])
+
+    def test_write_state(self):
+        batch = BatchSimulator(2)
+        batch.load_memory(Assembler.instantiate(test_code, 256).memory)
+        batch.run(max_steps=9)
+        s_ = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        s_.load_memory(Assembler.instantiate(test_code, 256).memory)
+        s_.run(max_steps=9)
+        file = BytesIO()
+        self.assertEqual(275, batch.write_state(1, file))
+        self.assertEqual(s_.dump_program_svm_state(), file.getvalue())
+
+    def test_write_state_past_the_end(self):
+        memory = bytes(254) + bytes((0x21, 0x05))
+        batch = BatchSimulator(1)
+        batch.load_memory(memory)
+        batch.PC[:] = 0xFE
+        self.assertEqual(1, batch.step())
+        s_ = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        s_.parse_program_state(memory)
+        s_.PC = 0xFE
+        next(s_)
+        self.assertEqual((256, 256), (s_.PC, int(batch.PC[0])))
+        file = BytesIO()
+        self.assertEqual(275, batch.write_state(0, file))
+        self.assertEqual(s_.dump_program_svm_state(), file.getvalue())
@@ -0,0 +1,76 @@
+from os import listdir, utime
+from os.path import join
+from tempfile import TemporaryDirectory
+from time import time_ns
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.cache import STALE_TEMPORARY_AGE, ProgramCache, program_key
+from spacecat.runner import run_program
+from spacecat.simulator import Simulator
+from test.helpers import letters_code, test_code
+
+
+class TestCache(TestCase):
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = ProgramCache(self.directory.name)
+
+    def test_image_matches_simulator(self):
+        simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        simulator.load_memory(Assembler.instantiate(test_code, 256).memory)
+        self.assertEqual(simulator.dump_program_memory(), self.cache.assemble(test_code))
+        self.assertEqual((0, 1), (self.cache.hits, self.cache.misses))
+
+    def test_hits_skip_the_assembler(self):
+        self.cache.put(letters_code, 256, b"cached")
+        self.assertEqual(b"cached", self.cache.assemble(letters_code))
+        self.assertEqual(1, self.cache.hits)
+        self.assertIsNone(self.cache.get(letters_code, 128))
+        self.assertIsNone(self.cache.get(letters_code + "\n", 256))
+
+    def test_eviction(self):
+        cache = ProgramCache(self.directory.name, max_size=3 * 1024)
+        sources = [f"load R1, {index}\nhalt" for index in range(4)]
+        for age, source in enumerate(sources[:3]):
+            cache.assemble(source)
+            utime(cache.path(program_key(source, 256)), ns=(age, age))
+        cache.get(sources[0], 256)
+        cache.assemble(sources[3])
+        self.assertEqual(3 * 1024, cache.size())
+        self.assertEqual([True, False, True, True], [cache.get(source, 256) is not None for source in sources])
+
+    def test_scans_only_when_full(self):
+        cache = ProgramCache(self.directory.name, max_size=2 * 1024)
+        cache.assemble("halt")
+        # Written behind the cache's back, only a scan of the directory sees it.
+        other_path = join(self.directory.name, "other.prg")
+        with open(other_path, "wb") as file:
+            file.write(bytes(1024))
+        utime(other_path, ns=(0, 0))
+        cache.assemble("load R1, 1\nhalt")
+        self.assertEqual(3 * 1024, cache.size())
+        cache.assemble("load R1, 2\nhalt")
+        self.assertEqual(2 * 1024, cache.size())
+        self.assertNotIn("other.prg", listdir(self.directory.name))
+
+    def test_stale_temporary_files(self):
+        cache = ProgramCache(self.directory.name, max_size=1024)
+        for name, age in (("stale.prg.1.tmp", STALE_TEMPORARY_AGE * 2), ("fresh.prg.2.tmp", 0)):
+            with open(join(self.directory.name, name), "wb") as file:
+                file.write(b"partial")
+            mtime = time_ns() - age
+            utime(join(self.directory.name, name), ns=(mtime, mtime))
+        cache.assemble("halt")
+        cache.assemble("load R1, 1\nhalt")
+        self.assertEqual({"fresh.prg.2.tmp", program_key("load R1, 1\nhalt", 256) + ".prg"},
+                         set(listdir(self.directory.name)))
+
+    def test_runner(self):
+        path = f"{self.directory.name}/letters.asm"
+        with open(path, "w") as file:
+            file.write(letters_code)
+        for _ in range(2):
+            result = run_program(path, cache_directory=self.directory.name)
+            self.assertEqual("ABCDEFGHIJKLMNOPQRSTUVWXYZ", result.output)
+        self.assertEqual(1024, self.cache.size())
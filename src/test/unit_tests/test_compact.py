@@ -0,0 +1,34 @@
+from copy import deepcopy
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.common_utils import Cell
+from spacecat.simulator import Simulator
+from test.helpers import test_code
+
+
+class TestCompact(TestCase):
+    def setUp(self) -> None:
+        self.simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15], compact=True)
+        self.simulator.load_memory(Assembler.instantiate(test_code, 256).memory)
+
+    def test_matches_cell_machine(self):
+        reference = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        reference.load_memory(Assembler.instantiate(test_code, 256).memory)
+        for (memory, registers), (reference_memory, reference_registers) in zip(self.simulator, reference):
+            self.assertEqual(reference.IR, self.simulator.IR)
+            self.assertEqual(reference.PC, self.simulator.PC)
+            self.assertEqual(reference_memory, memory)
+            self.assertEqual(reference_registers, registers)
+            self.assertEqual(reference.return_stdout(), self.simulator.return_stdout())
+
+    def test_views_write_through(self):
+        self.simulator.return_registers()[3].value = "A0"
+        self.simulator.return_memory()[255].value = 0x1FF
+        self.assertEqual(0xA0, self.simulator.dump_program_svm_state()[256 + 3])
+        self.assertEqual(0xFF, self.simulator.dump_program_memory()[255 * 4])
+
+    def test_deepcopy_is_detached(self):
+        memory = deepcopy(self.simulator.return_memory())
+        self.simulator.return_memory()[0].value = 0
+        self.assertIsInstance(memory[0], Cell)
+        self.assertEqual(0x20, memory[0].value)
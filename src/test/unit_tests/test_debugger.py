@@ -0,0 +1,94 @@
+from unittest import TestCase
+from spacecat.debugger import Debugger, Stop, StopKind
+from spacecat.simulator import HaltReason
+from spacecat.worker import SimulationWorker
+from test.helpers import letters_code, machine
+
+
+class TestDebugger(TestCase):
+    @staticmethod
+    def debugger(code: str = letters_code, **options) -> Debugger:
+        return Debugger(machine(code, **options))
+
+    def test_inactive(self):
+        debugger = self.debugger()
+        self.assertFalse(debugger.active())
+        result = debugger.run()
+        self.assertEqual((HaltReason.HALTED, "ABCDEFGHIJKLMNOPQRSTUVWXYZ"), (result.halt_reason, result.output))
+        self.assertIsNone(debugger.last_stop)
+
+    def test_single_breakpoint(self):
+        for options in ({}, {"jit": True}):
+            debugger = self.debugger(**options)
+            self.assertTrue(debugger.toggle_breakpoint(0x08))
+            result = debugger.run()
+            self.assertEqual((4, HaltReason.BREAK, "A", 0x08),
+                             (result.steps, result.halt_reason, result.output, debugger.simulator.PC))
+            self.assertEqual(Stop(StopKind.BREAKPOINT, 0x08), debugger.last_stop)
+            result = debugger.run()
+            self.assertEqual((3, HaltReason.BREAK, "B"), (result.steps, result.halt_reason, result.output))
+            self.assertFalse(debugger.toggle_breakpoint(0x08))
+            self.assertEqual("CDEFGHIJKLMNOPQRSTUVWXYZ", debugger.run().output)
+
+    def test_breakpoints(self):
+        debugger = self.debugger()
+        debugger.toggle_breakpoint(0x06)
+        debugger.toggle_breakpoint(0x0A)
+        self.assertEqual([(3, 0x06), (2, 0x0A), (1, 0x06)],
+                         [(debugger.run().steps, debugger.simulator.PC) for _ in range(3)])
+        result = debugger.run(max_steps=1)
+        self.assertEqual((HaltReason.STEP_LIMIT, None), (result.halt_reason, debugger.last_stop))
+
+    def test_watchpoints(self):
+        debugger = self.debugger("load R1, 5\nload R2, 6\nstore R1, [20h]\nstore R2, [20h]\nhalt")
+        debugger.toggle_memory_watchpoint(0x20)
+        self.assertEqual(3, debugger.run().steps)
+        self.assertEqual(Stop(StopKind.MEMORY, 0x20, 0, 5), debugger.last_stop)
+        self.assertEqual(1, debugger.run().steps)
+        self.assertEqual(Stop(StopKind.MEMORY, 0x20, 5, 6), debugger.last_stop)
+        self.assertEqual(HaltReason.HALTED, debugger.run().halt_reason)
+        debugger = self.debugger()
+        debugger.toggle_register_watchpoint(2)
+        self.assertEqual(3, debugger.run().steps)
+        self.assertEqual(Stop(StopKind.REGISTER, 2, 0, 0x41), debugger.last_stop)
+        self.assertEqual(2, debugger.run().steps)
+        self.assertEqual(Stop(StopKind.REGISTER, 2, 0x41, 0x42), debugger.last_stop)
+
+    def test_watchpoint_on_the_last_step(self):
+        for options in ({}, {"compact": True}, {"jit": True}):
+            debugger = self.debugger("load R1, 5\nstore R1, [20h]\nhalt", **options)
+            debugger.toggle_memory_watchpoint(0x20)
+            result = debugger.run()
+            self.assertEqual((2, HaltReason.BREAK), (result.steps, result.halt_reason))
+            self.assertEqual(Stop(StopKind.MEMORY, 0x20, 0, 5), debugger.last_stop)
+            result = debugger.run()
+            self.assertEqual((1, HaltReason.HALTED, None), (result.steps, result.halt_reason, debugger.last_stop))
+            # The store is the last instruction of the memory, so the machine stops on its own after it.
+            debugger = self.debugger("load R1, 5\njmpEQ R0=R0, 0FEh\norg 0FEh\nstore R1, [20h]", **options)
+            debugger.toggle_memory_watchpoint(0x20)
+            debugger.add_condition(lambda simulator: False)
+            result = debugger.run()
+            self.assertEqual((3, HaltReason.BREAK), (result.steps, result.halt_reason))
+            self.assertEqual(Stop(StopKind.MEMORY, 0x20, 0, 5), debugger.last_stop)
+            result = debugger.run()
+            self.assertEqual((0, HaltReason.END_OF_MEMORY, None),
+                             (result.steps, result.halt_reason, debugger.last_stop))
+
+    def test_condition(self):
+        debugger = self.debugger()
+        debugger.add_condition(lambda simulator: simulator.return_registers()[2].value == 0x44)
+        result = debugger.run()
+        self.assertEqual((HaltReason.BREAK, "ABC"), (result.halt_reason, result.output))
+        self.assertEqual(Stop(StopKind.CONDITION, 0), debugger.last_stop)
+
+    def test_worker(self):
+        debugger = self.debugger()
+        debugger.toggle_breakpoint(0x0A)
+        worker = SimulationWorker(debugger.simulator, debugger=debugger)
+        worker.start()
+        self.addCleanup(worker.stop)
+        worker.resume()
+        snapshot = worker.snapshots.get(timeout=5)
+        while snapshot.running:
+            snapshot = snapshot.merge(worker.snapshots.get(timeout=5))
+        self.assertEqual((5, 0x0A, "A"), (snapshot.steps, snapshot.PC, snapshot.output))
@@ -0,0 +1,25 @@
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.simulator import Simulator
+from test.helpers import self_modifying_code
+
+
+class TestDecodeCache(TestCase):
+    def setUp(self) -> None:
+        self.simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        self.simulator.load_memory(Assembler.instantiate(self_modifying_code, 256).memory)
+
+    def test_store_invalidates_decoded_instruction(self):
+        output = ""
+        for i, _ in enumerate(self.simulator):
+            output += self.simulator.return_stdout()
+            if i == 100:
+                self.fail("Executed a stale instruction.")
+        self.assertEqual("AB", output)
+
+    def test_memory_edit_invalidates_decoded_instruction(self):
+        next(self.simulator)
+        self.simulator.PC = 0
+        self.simulator.return_memory()[1].value = 0x30
+        next(self.simulator)
+        self.assertEqual(0x30, self.simulator.return_registers()[0].value)
@@ -0,0 +1,35 @@
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from test.helpers import machine, machines, self_modifying_code, test_code
+
+
+class TestDirty(TestCase):
+    def test_matches_differences(self):
+        for code in (test_code, self_modifying_code):
+            for engine, simulator in machines(code):
+                with self.subTest(engine=engine):
+                    simulator.track_writes()
+                    memory = simulator.dump_program_memory()[::4]
+                    registers = bytes(cell.value for cell in simulator.return_registers())
+                    for _ in simulator:
+                        new_memory = simulator.dump_program_memory()[::4]
+                        new_registers = bytes(cell.value for cell in simulator.return_registers())
+                        dirty_memory, dirty_registers = simulator.take_dirty()
+                        # Writes of an unchanged value are dirty too, so the differences are a subset.
+                        self.assertLessEqual({i for i, (a, b) in enumerate(zip(memory, new_memory)) if a != b},
+                                             dirty_memory)
+                        self.assertLessEqual({i for i, (a, b) in enumerate(zip(registers, new_registers)) if a != b},
+                                             dirty_registers)
+                        self.assertLessEqual(len(dirty_memory) + len(dirty_registers), 1)
+                        memory, registers = new_memory, new_registers
+
+    def test_run_and_untracked(self):
+        simulator = machine()
+        self.assertRaises(ValueError, simulator.take_dirty)
+        simulator.load_memory(Assembler.instantiate("load R1, 5\nstore R1, [20h]\nmove R2, R1\nhalt", 256).memory)
+        simulator.track_writes()
+        simulator.run()
+        self.assertEqual(({0x20}, {1, 2}), simulator.take_dirty())
+        self.assertEqual((set(), set()), simulator.take_dirty())
+        simulator.track_writes(False)
+        self.assertRaises(ValueError, simulator.take_dirty)
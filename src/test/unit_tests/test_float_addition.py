@@ -0,0 +1,19 @@
+from unittest import TestCase
+from spacecat.common_utils import OctalFloat, add_floats, float_addition, float_addition_table
+
+
+class TestFloatAddition(TestCase):
+    def test_table_matches_octal_float(self):
+        table = float_addition_table()
+        self.assertEqual(0x10000, len(table))
+        for one in range(256):
+            for two in range(256):
+                try:
+                    expected = int(OctalFloat(format(one, "02X")) + OctalFloat(format(two, "02X"))) % 256
+                except IndexError:
+                    self.assertRaises(IndexError, add_floats, one, two)
+                    self.assertRaises(IndexError, float_addition, one, two)
+                    continue
+                self.assertEqual(expected, table[one << 8 | two], f"{one:02X} + {two:02X}")
+                self.assertEqual(expected, add_floats(one, two))
+                self.assertEqual(expected, float_addition(one, two))
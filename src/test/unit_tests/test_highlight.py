@@ -0,0 +1,44 @@
+from itertools import count
+from unittest import TestCase
+from spacecat.highlight import COMMENT, MNEMONIC, Highlighter, changed_lines, highlight_line
+
+
+class TestHighlight(TestCase):
+    def test_highlight_line(self):
+        self.assertEqual([(MNEMONIC, 6, 11), (COMMENT, 22, 34)], highlight_line("loop: STORE R1, [out] ; jmp and or"))
+        self.assertEqual([(MNEMONIC, 5, 7)], highlight_line("\tdb  or"))
+        self.assertEqual([(COMMENT, 9, 12)], highlight_line("db 'a;b' ;or"))
+        self.assertEqual([], highlight_line("db 'or'"))
+        self.assertEqual([(MNEMONIC, 11, 14)], highlight_line("db \"or\", 1 jmp"))
+        self.assertEqual([], highlight_line("db 'halt"))
+        self.assertEqual([], highlight_line("stores: org 10h"))
+
+    def test_changed_lines(self):
+        self.assertEqual((1, 2, 0), changed_lines(["a", "b", "c"], ["a", "x", "c"]))
+        self.assertEqual((1, 3, 1), changed_lines(["a", "b", "c"], ["a", "x", "y", "c"]))
+        self.assertEqual((1, 1, -1), changed_lines(["a", "b", "c"], ["a", "c"]))
+        self.assertEqual((3, 3, 0), changed_lines(["a", "b", "c"], ["a", "b", "c"]))
+
+    def test_only_touched_lines(self):
+        highlighter = Highlighter()
+        highlighter.edit("halt\nload R1, 1\nhalt")
+        runs, spans = highlighter.highlight()
+        self.assertEqual([(1, 3)], runs)
+        self.assertEqual([(1, 0, 4), (2, 0, 4), (3, 0, 4)], spans[MNEMONIC])
+        highlighter.edit("halt\nload R1, 1 ; one\nhalt")
+        runs, spans = highlighter.highlight()
+        self.assertEqual(([(2, 2)], [(2, 11, 16)]), (runs, spans[COMMENT]))
+
+    def test_frame_budget(self):
+        highlighter = Highlighter()
+        highlighter.edit("\n".join(f"label{index}: addi R1, R2, R3 ; {index}" for index in range(20_000)))
+        highlighter.edit("\n".join(["halt"] + highlighter.lines))
+        self.assertEqual(20_001, len(highlighter.pending))
+        clock = count().__next__  # Every line takes a tick.
+        frames = 0
+        while highlighter.pending:
+            pending = len(highlighter.pending)
+            highlighter.highlight(budget=100, clock=clock)
+            self.assertEqual(min(pending, 100), pending - len(highlighter.pending))
+            frames += 1
+        self.assertEqual(201, frames)
@@ -0,0 +1,87 @@
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.debugger import Debugger, Stop, StopKind
+from spacecat.simulator import Simulator
+from spacecat.worker import SimulationWorker
+from test.helpers import letters_code, machine, machines, self_modifying_code, test_code
+
+
+class TestHistory(TestCase):
+    @staticmethod
+    def state(simulator: Simulator):
+        return simulator.dump_program_svm_state(), simulator.rf_sleeping
+
+    def test_step_back_and_forth(self):
+        for code in (test_code, self_modifying_code, letters_code):
+            for engine, simulator in machines(code):
+                with self.subTest(engine=engine):
+                    simulator.keep_history()
+                    states = [self.state(simulator)]
+                    for _ in simulator:
+                        states.append(self.state(simulator))
+                    self.assertEqual(len(states) - 1, simulator.history_length())
+                    for state in reversed(states[:-1]):
+                        self.assertEqual(1, simulator.step_back())
+                        self.assertEqual(state, self.state(simulator))
+                    self.assertEqual(0, simulator.step_back())
+                    simulator.run()
+                    self.assertEqual(states[-1][0], simulator.dump_program_svm_state())
+
+    def test_bounded(self):
+        simulator = machine(letters_code)
+        simulator.keep_history(3)
+        simulator.track_writes()
+        simulator.run(max_steps=10)
+        simulator.take_dirty()
+        self.assertEqual(3, simulator.step_back(None))
+        self.assertEqual((set(), {2, 15}), simulator.take_dirty())
+        simulator.keep_history(0)
+        simulator.run(max_steps=1)
+        self.assertEqual(0, simulator.step_back())
+
+    def test_loads_forget_history(self):
+        image = machine(test_code)
+        loads = (lambda simulator: simulator.load_memory(Assembler.instantiate(test_code, 256).memory),
+                 lambda simulator: simulator.patch_memory({0x00: 0xC0}),
+                 lambda simulator: simulator.load_registers(image.return_registers()),
+                 lambda simulator: simulator.parse_program_memory(image.dump_program_memory()),
+                 lambda simulator: simulator.parse_program_state(image.dump_program_svm_state()))
+        for load in loads:
+            for engine, simulator in machines(letters_code):
+                with self.subTest(engine=engine):
+                    simulator.keep_history()
+                    simulator.run(max_steps=5)
+                    load(simulator)
+                    state = self.state(simulator)
+                    self.assertEqual((0, 0), (simulator.history_length(), simulator.step_back()))
+                    self.assertEqual(state, self.state(simulator))
+                    simulator.run(max_steps=1)
+                    self.assertEqual(1, simulator.step_back(None))
+
+    def test_run_back(self):
+        simulator = machine(letters_code)
+        simulator.keep_history()
+        debugger = Debugger(simulator)
+        debugger.toggle_breakpoint(0x06)
+        simulator.run(max_steps=10)
+        self.assertEqual([1, 3, 3], [debugger.run_back() for _ in range(3)])
+        self.assertEqual((0x06, Stop(StopKind.BREAKPOINT, 0x06)), (simulator.PC, debugger.last_stop))
+        self.assertEqual(3, debugger.run_back())
+        self.assertEqual((0x00, None), (simulator.PC, debugger.last_stop))
+
+    def test_worker(self):
+        simulator = machine(letters_code)
+        simulator.keep_history()
+        worker = SimulationWorker(simulator)
+        worker.start()
+        self.addCleanup(worker.stop)
+        for _ in range(4):
+            worker.step()
+        worker.step_back()
+        worker.pause()
+        snapshot = worker.poll()
+        self.assertEqual((3, 0x06), (snapshot.steps, snapshot.PC))
+        self.assertIn(15, snapshot.dirty_registers)
+        worker.run_back()
+        worker.pause()
+        self.assertEqual((-3, 0x00), (worker.poll().steps, simulator.PC))
@@ -0,0 +1,67 @@
+from io import BytesIO
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from spacecat.runner import load_program, map_file
+from test.helpers import machine, machines, test_code
+
+STORAGES = ("cell", "compact")
+
+
+class TestImages(TestCase):
+    def setUp(self) -> None:
+        self.reference = machine(test_code)
+        self.reference.run(max_steps=7)
+        self.state = self.reference.dump_program_svm_state()
+        self.image = self.reference.dump_program_memory()
+
+    def test_writers(self):
+        for engine, simulator in machines(engines=STORAGES):
+            with self.subTest(engine=engine):
+                simulator.parse_program_state(self.state)
+                state = bytearray(2 + len(self.state))
+                self.assertEqual(len(self.state), simulator.dump_program_svm_state_into(state, offset=2))
+                self.assertEqual(self.state, state[2:])
+                image = bytearray(len(self.image))
+                self.assertEqual(len(self.image), simulator.dump_program_memory_into(memoryview(image)))
+                self.assertEqual(self.image, image)
+
+    def test_file_writers(self):
+        for engine, simulator in machines(engines=STORAGES):
+            with self.subTest(engine=engine):
+                simulator.parse_program_state(self.state)
+                state, image = BytesIO(), BytesIO()
+                self.assertEqual(len(self.state), simulator.write_state(state))
+                self.assertEqual(len(self.image), simulator.write_program(image))
+                self.assertEqual((self.state, self.image), (state.getvalue(), image.getvalue()))
+                self.assertEqual(self.image[::4] + self.state[256:272], simulator.dump_program_svm_state()[:272])
+
+    def test_loaders(self):
+        for engine, simulator in machines(engines=STORAGES):
+            with self.subTest(engine=engine):
+                memory = simulator.return_memory()
+                simulator.parse_program_state(memoryview(self.state))
+                self.assertIs(memory, simulator.return_memory())
+                self.assertEqual((self.reference.PC, self.reference.IR), (simulator.PC, simulator.IR))
+                self.assertEqual(self.state, simulator.dump_program_svm_state())
+                simulator.parse_program_memory(self.image[:8])
+                self.assertEqual(self.image[:8] + bytes(len(self.image) - 8), simulator.dump_program_memory())
+                simulator.parse_program_state(self.state[:260])
+                self.assertEqual(self.state[:260] + bytes(15), simulator.dump_program_svm_state())
+
+    def test_mapped_files(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for file_name, contents in (("state.svm", self.state), ("memory.prg", self.image), ("empty.prg", b"")):
+            with open(join(directory.name, file_name), "wb") as file:
+                file.write(contents)
+        with map_file(join(directory.name, "state.svm")) as state:
+            self.assertEqual(self.state, state[:])
+        for engine, simulator in machines(engines=STORAGES):
+            with self.subTest(engine=engine):
+                load_program(simulator, join(directory.name, "state.svm"))
+                self.assertEqual(self.state, simulator.dump_program_svm_state())
+                load_program(simulator, join(directory.name, "memory.prg"))
+                self.assertEqual((self.image, 0), (simulator.dump_program_memory(), simulator.PC))
+                load_program(simulator, join(directory.name, "empty.prg"))
+                self.assertEqual(bytes(len(self.image)), simulator.dump_program_memory())
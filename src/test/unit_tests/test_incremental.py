@@ -0,0 +1,50 @@
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.incremental import IncrementalAssembler
+from spacecat.lexer import AssemblyError
+from spacecat.simulator import Simulator
+from test.helpers import letters_code
+
+
+def assemble(code: str) -> bytes:
+    return bytes(cell.value for cell in Assembler.instantiate(code, 256).memory)
+
+
+class TestIncremental(TestCase):
+    def setUp(self) -> None:
+        self.assembler = IncrementalAssembler(256)
+        self.assembler.update(letters_code)
+
+    def test_matches_assembler(self):
+        self.assertEqual(assemble(letters_code), bytes(self.assembler.memory))
+        self.assertEqual({"loop": 6}, self.assembler.labels)
+
+    def test_only_edited_lines(self):
+        changes = self.assembler.update(letters_code.replace("load R1, 1", "load R1, 2"))
+        self.assertEqual({3: 2}, changes)
+        self.assertEqual(1, self.assembler.encoded_lines)
+
+    def test_moved_labels(self):
+        code = letters_code.replace("loop:", "db 0\nloop:")
+        changes = self.assembler.update(code)
+        self.assertEqual(assemble(code), bytes(self.assembler.memory))
+        # The instructions after the new byte move, and the jump to the moved label is encoded again.
+        self.assertEqual(2, self.assembler.encoded_lines)
+        self.assertEqual(set(range(6, 14)), set(changes))
+
+    def test_errors_keep_the_program(self):
+        memory = bytes(self.assembler.memory)
+        with self.assertRaises(AssemblyError) as context:
+            self.assembler.update(letters_code.replace("halt", "jmp nowhere"))
+        self.assertEqual((8, 9), (context.exception.line, context.exception.column))
+        self.assertEqual(memory, bytes(self.assembler.memory))
+        self.assertRaises(AssemblyError, self.assembler.update, "loop: halt\nloop: halt")
+
+    def test_patch_simulator(self):
+        for compact in (False, True):
+            simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15], compact=compact)
+            simulator.patch_memory(dict(enumerate(self.assembler.memory)))
+            self.assertEqual("ABC", simulator.run(max_steps=11).output)
+            simulator.patch_memory(self.assembler.update(letters_code.replace("move RF, R2", "move RF, R0")))
+            self.assertEqual("Z" * 23, simulator.run().output)
+            self.assembler.update(letters_code)
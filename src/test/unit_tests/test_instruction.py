@@ -1,5 +1,6 @@
 from unittest import TestCase
-from spacecat.instructions import INSTRUCTIONS, Instruction
+from spacecat.disassembler import disassemble
+from spacecat.instructions import INSTRUCTIONS, INSTRUCTION_FORMS, INSTRUCTIONS_BY_FIRST_BYTE, Instruction
 
 class TestInstruction(TestCase):
     def test_value_load_assemble(self):
@@ -85,4 +86,18 @@ class TestInstruction(TestCase):
     def test_jmple_assemble(self):
         instruction = "jmple r1<=r0, 20h"
         expected = "F120"
-        self.assertEqual(expected, INSTRUCTIONS[15].assemble(instruction))
\ No newline at end of file
+        self.assertEqual(expected, INSTRUCTIONS[15].assemble(instruction))
+
+    def test_instruction_forms(self):
+        for instruction in INSTRUCTIONS:
+            self.assertIs(instruction, INSTRUCTION_FORMS[instruction.mnemonic_name, instruction.operand_kinds])
+
+    def test_first_byte_table(self):
+        for first_byte in range(256):
+            hex_byte = format(first_byte, "02X")
+            expected = next((instruction for instruction in INSTRUCTIONS
+                             if hex_byte == instruction.immutable_byte_index or
+                             hex_byte[0] == instruction.immutable_byte_index), None)
+            self.assertIs(expected, INSTRUCTIONS_BY_FIRST_BYTE[first_byte])
+        self.assertEqual(["jmp 20h; B020", "jmpeq R1=R0, 20h; B120", "", "move R2, R1; 4021"],
+                         disassemble(["B020", "B120", "C500", "4021"]))
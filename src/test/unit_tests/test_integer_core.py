@@ -0,0 +1,22 @@
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.simulator import Simulator
+from test.helpers import test_code
+
+
+class TestIntegerCore(TestCase):
+    @staticmethod
+    def trace(integer_core: bool):
+        s_ = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15], integer_core=integer_core)
+        s_.load_memory(Assembler.instantiate(test_code, 256).memory)
+        return [(s_.PC, s_.IR, [cell.value for cell in memory], [cell.value for cell in registers],
+                 s_.return_stdout()) for memory, registers in s_]
+
+    def test_matches_cached_core(self):
+        self.assertEqual(self.trace(False), self.trace(True))
+
+    def test_ir_string(self):
+        s_ = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15], integer_core=True)
+        s_.load_memory(Assembler.instantiate(test_code, 256).memory)
+        next(s_)
+        self.assertEqual("200A", s_.IR)
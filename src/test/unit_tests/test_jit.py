@@ -0,0 +1,53 @@
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.simulator import Simulator
+from test.helpers import self_modifying_code, test_code
+
+loop_code = """load R1, 1
+load R0, FFh
+loop:
+    addi R2, R2, R1
+    move RF, R2
+    jmpLE R2<=R0, loop
+    jmp loop"""
+
+float_loop_code = """load R1, 08h
+load R2, 18h
+load R3, 10h
+loop:
+    addf R5, R1, R2
+    addi R2, R2, R3
+    jmpLE R2<=R0, loop
+    jmp loop"""
+
+
+class TestJit(TestCase):
+    @staticmethod
+    def run_machine(code: str, jit: bool, **kwargs):
+        s_ = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15], jit=jit)
+        s_.load_memory(Assembler.instantiate(code, 256).memory)
+        result = s_.run(**kwargs)
+        return result, s_.PC, s_.IR, s_.dump_program_memory(), s_.dump_program_memory(s_.return_registers())
+
+    def test_matches_interpreter(self):
+        for code in (test_code, self_modifying_code):
+            self.assertEqual(self.run_machine(code, False), self.run_machine(code, True))
+
+    def test_loop_step_limit(self):
+        for max_steps in (1, 2, 3, 100, 1000):
+            self.assertEqual(self.run_machine(loop_code, False, max_steps=max_steps),
+                             self.run_machine(loop_code, True, max_steps=max_steps))
+
+    def test_loop_until_pc(self):
+        for until_pc in (4, 6, 8, 10):
+            self.assertEqual(self.run_machine(loop_code, False, max_steps=1000, until_pc=until_pc),
+                             self.run_machine(loop_code, True, max_steps=1000, until_pc=until_pc))
+
+    def test_float_addition_fault(self):
+        states = []
+        for jit in (False, True):
+            s_ = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15], jit=jit)
+            s_.load_memory(Assembler.instantiate(float_loop_code, 256).memory)
+            self.assertRaises(IndexError, s_.run)
+            states.append((s_.PC, s_.IR, s_.dump_program_memory(s_.return_registers())))
+        self.assertEqual(states[0], states[1])
@@ -0,0 +1,48 @@
+from io import StringIO
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.simulator import Simulator
+
+test_code = """load RF, 41h
+load R1, 41h
+move RF, R1
+addi RF, RF, R1
+halt"""
+
+
+class TestOutputSink(TestCase):
+    def setUp(self) -> None:
+        self.simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        self.simulator.load_memory(Assembler.instantiate(test_code, 256).memory)
+
+    def test_text_stream(self):
+        stream = StringIO()
+        self.simulator.set_output_sink(stream)
+        for _ in self.simulator:
+            self.assertEqual("", self.simulator.return_stdout())
+        self.assertEqual("AA\x82", stream.getvalue())
+
+    def test_bytearray(self):
+        buffer = bytearray()
+        self.simulator.set_output_sink(buffer)
+        self.simulator.run()
+        self.assertEqual(b"AA\x82", buffer)
+
+    def test_callback(self):
+        written = []
+        self.simulator.set_output_sink(written.append)
+        result = self.simulator.run()
+        self.assertEqual(["A", "A", "\x82"], written)
+        self.assertEqual("AA\x82", result.output)
+
+    def test_compact_remove_sink(self):
+        simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15], compact=True)
+        simulator.load_memory(Assembler.instantiate(test_code, 256).memory)
+        written = []
+        simulator.set_output_sink(written.append)
+        next(simulator)
+        simulator.set_output_sink(None)
+        next(simulator)
+        next(simulator)
+        self.assertEqual(["A"], written)
+        self.assertEqual("A", simulator.return_stdout())
@@ -0,0 +1,54 @@
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.instructions import OperandKind
+from spacecat.lexer import AssemblyError, TokenType, tokenize
+from spacecat.parser import Data, Label, Operation, Origin, parse, parse_numeral
+from test.helpers import assemble
+
+
+class TestParser(TestCase):
+    def test_tokenize(self):
+        tokens = tokenize("Loop: jmpLE R2<=R0, loop ; comment\n\tdb \"Hi; you\"")
+        self.assertEqual([TokenType.WORD, TokenType.COLON, TokenType.WORD, TokenType.WORD, TokenType.LESS_OR_EQUAL,
+                          TokenType.WORD, TokenType.COMMA, TokenType.WORD, TokenType.NEWLINE, TokenType.WORD,
+                          TokenType.STRING, TokenType.NEWLINE], [token.type for token in tokens])
+        self.assertEqual(("loop", 1, 1), (tokens[0].text, tokens[0].line, tokens[0].column))
+        self.assertEqual(("Hi; you", 2, 5), (tokens[10].text, tokens[10].line, tokens[10].column))
+
+    def test_errors_point_at_the_source(self):
+        with self.assertRaises(AssemblyError) as context:
+            tokenize('halt\ncat: db "Hello')
+        self.assertEqual((2, 9), (context.exception.line, context.exception.column))
+        with self.assertRaises(AssemblyError) as context:
+            Assembler.instantiate("halt\n  jmp nowhere", 256)
+        self.assertEqual((2, 7), (context.exception.line, context.exception.column))
+        self.assertRaises(AssemblyError, Assembler.instantiate, "move R1, 5", 256)
+        self.assertRaises(AssemblyError, Assembler.instantiate, "load R1, 100h", 256)
+
+    def test_parse(self):
+        statements = parse("org 10h\nstart: load R1, [start]\nload R2, R[R1]\njmpEQ R1=R0, start\ndb 'ab', 3").statements
+        self.assertEqual([Origin, Label, Operation, Operation, Operation, Data],
+                         [type(statement) for statement in statements])
+        self.assertEqual([OperandKind.REGISTER, OperandKind.ADDRESS],
+                         [operand.kind for operand in statements[2].operands])
+        self.assertEqual([OperandKind.REGISTER, OperandKind.POINTER],
+                         [operand.kind for operand in statements[3].operands])
+        self.assertEqual(OperandKind.EQUALS, statements[4].operands[0].kind)
+
+    def test_numerals(self):
+        for numeral, value in (("10", 10), ("-10", -10), ("10d", 10), ("101b", 5), ("0x1f", 31), ("$1f", 31),
+                               ("1fh", 31), ("ff", 255), ("loop", None)):
+            self.assertEqual(value, parse_numeral(numeral))
+
+    def test_assemble(self):
+        self.assertEqual("1120222021F3D012E0124021A404B0FFB120F120C000",
+                         assemble("load R1, [20h]\nload R2, 32\nload R1, -13\nload R1, R[2]\nstore R1, [R2]\n"
+                                  "move R1, R2\nror R4, 4\njmp FFh\njmpeq R1=R0, 20h\njmple r1<=r0, 20h\nhalt", 22))
+
+    def test_labels(self):
+        code = "jmp end\norg 10h\nLoop:\nloop2: addi R1, R1, R2\n  jmpLE R1<=R0, loop\njmp LOOP2\nend: halt"
+        self.assertEqual("B016", assemble(code, 2))
+        self.assertEqual("5112F110B010C000", assemble(code, 0x18)[0x20:])
+
+    def test_data(self):
+        self.assertEqual("2204C00048692C0A", assemble("load R2, text\nhalt\ntext: db \"Hi,\", 10", 8))
@@ -1,7 +1,17 @@
 from unittest import TestCase
-from spacecat.common_utils import right_rotation
+from spacecat.common_utils import ROTATIONS, right_rotation, rotate_bits
 
 
 class TestRight_rotation(TestCase):
     def test_right_rotation(self):
         self.assertEqual("1100", right_rotation("0011", 2))
+
+    def test_rotate_bits(self):
+        for value in range(256):
+            for rotate_by in range(9):
+                expected = int(right_rotation(format(value, "08b"), rotate_by), base=2)
+                self.assertEqual(expected, rotate_bits(value, rotate_by))
+                self.assertEqual(expected, ROTATIONS[rotate_by][value])
+        self.assertEqual(0b1100, rotate_bits(0b0011, 2, bit_length=4))
+        self.assertRaises(IndexError, rotate_bits, 1, 9)
+        self.assertRaises(IndexError, ROTATIONS.__getitem__, 9)
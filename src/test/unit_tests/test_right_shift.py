@@ -1,8 +1,15 @@
 from unittest import TestCase
-from spacecat.common_utils import right_shift
+from spacecat.common_utils import right_shift, shift_bits
 
 
 class TestRight_shift(TestCase):
     def test_right_shift(self):
         to_shift = "1111"
         self.assertEqual("0011", right_shift(to_shift, 2))
+
+    def test_shift_bits(self):
+        for value in range(16):
+            for shift_by in range(5):
+                self.assertEqual(int(right_shift(format(value, "04b"), shift_by), base=2),
+                                 shift_bits(value, shift_by, bit_length=4))
+        self.assertRaises(IndexError, shift_bits, 1, 5, 4)
@@ -0,0 +1,40 @@
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.simulator import Simulator, HaltReason
+from test.helpers import test_code
+
+
+class TestRun(TestCase):
+    def setUp(self) -> None:
+        self.simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        self.simulator.load_memory(Assembler.instantiate(test_code, 256).memory)
+
+    def test_run_to_halt(self):
+        reference = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        reference.load_memory(Assembler.instantiate(test_code, 256).memory)
+        output = ""
+        steps = 0
+        for _ in reference:
+            output += reference.return_stdout()
+            steps += 1
+        result = self.simulator.run()
+        self.assertEqual(HaltReason.HALTED, result.halt_reason)
+        self.assertEqual(steps, result.steps)
+        self.assertEqual(output, result.output)
+        self.assertEqual(reference.dump_program_svm_state(), self.simulator.dump_program_svm_state())
+
+    def test_step_limit(self):
+        result = self.simulator.run(max_steps=10)
+        self.assertEqual(HaltReason.STEP_LIMIT, result.halt_reason)
+        self.assertEqual(10, result.steps)
+        self.assertEqual(HaltReason.HALTED, self.simulator.run().halt_reason)
+
+    def test_until_pc(self):
+        result = self.simulator.run(until_pc=0x0A)
+        self.assertEqual(HaltReason.REACHED_PC, result.halt_reason)
+        self.assertEqual(5, result.steps)
+        self.assertEqual(0x0A, self.simulator.PC)
+
+    def test_end_of_memory(self):
+        simulator = Simulator(mem_size=16, register_size=16, stdout_register_indices=[15], compact=True)
+        self.assertEqual(HaltReason.END_OF_MEMORY, simulator.run().halt_reason)
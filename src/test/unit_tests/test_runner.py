@@ -0,0 +1,80 @@
+from json import loads
+from itertools import count
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.runner import ERROR, TIMEOUT, find_programs, run_program, run_programs, run_slice
+from spacecat.simulator import Simulator, HaltReason
+from test.helpers import infinite_code, letters_code, test_code
+
+
+class TestRunner(TestCase):
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        simulator.load_memory(Assembler.instantiate(test_code, 256).memory)
+        self.__write("test_code.prg", simulator.dump_program_memory())
+        simulator.run(max_steps=5)
+        self.__write("test_code.svm", simulator.dump_program_svm_state())
+        self.__write("letters.asm", letters_code.encode())
+        self.__write("infinite.asm", infinite_code.encode())
+        self.__write("notes.txt", b"")
+
+    def __write(self, file_name: str, contents: bytes) -> None:
+        with open(join(self.directory.name, file_name), "wb") as file:
+            file.write(contents)
+
+    def __path(self, file_name: str) -> str:
+        return join(self.directory.name, file_name)
+
+    def test_find_programs(self):
+        expected = [self.__path(file_name) for file_name in
+                    ("infinite.asm", "letters.asm", "test_code.prg", "test_code.svm")]
+        self.assertEqual(expected, find_programs([self.directory.name]))
+        self.assertEqual([self.__path("letters.asm")], find_programs([self.__path("l*")]))
+
+    def test_run_asm(self):
+        result = run_program(self.__path("letters.asm"))
+        self.assertEqual(HaltReason.HALTED.value, result.halt_reason)
+        self.assertEqual("ABCDEFGHIJKLMNOPQRSTUVWXYZ", result.output)
+
+    def test_run_prg_and_svm(self):
+        reference = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        reference.load_memory(Assembler.instantiate(test_code, 256).memory)
+        expected = reference.run()
+        result = run_program(self.__path("test_code.prg"))
+        self.assertEqual((HaltReason.HALTED.value, expected.steps, expected.output),
+                         (result.halt_reason, result.steps, result.output))
+        result = run_program(self.__path("test_code.svm"))
+        self.assertEqual((HaltReason.HALTED.value, expected.steps - 5),
+                         (result.halt_reason, result.steps))
+
+    def test_limits(self):
+        result = run_program(self.__path("infinite.asm"), max_steps=12_345)
+        self.assertEqual((HaltReason.STEP_LIMIT.value, 12_345), (result.halt_reason, result.steps))
+        result = run_program(self.__path("infinite.asm"), timeout=0.01)
+        self.assertEqual(TIMEOUT, result.halt_reason)
+
+    def test_run_slice(self):
+        simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        simulator.load_memory(Assembler.instantiate(infinite_code, 256).memory)
+        result = run_slice(simulator, 3, slice_steps=100, clock=count().__next__)  # Every slice takes a tick.
+        self.assertEqual((HaltReason.STEP_LIMIT, 300), (result.halt_reason, result.steps))
+        simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        simulator.load_memory(Assembler.instantiate(letters_code, 256).memory)
+        result = run_slice(simulator, 10, slice_steps=7)
+        self.assertEqual((HaltReason.HALTED, "ABCDEFGHIJKLMNOPQRSTUVWXYZ"), (result.halt_reason, result.output))
+
+    def test_error(self):
+        result = run_program(self.__path("missing.asm"))
+        self.assertEqual(ERROR, result.halt_reason)
+        self.assertTrue(result.error.startswith("FileNotFoundError"))
+
+    def test_run_programs(self):
+        paths = find_programs([self.directory.name])
+        results = list(run_programs(paths, max_steps=1000, workers=2))
+        self.assertEqual(paths, [result.path for result in results])
+        self.assertEqual([HaltReason.STEP_LIMIT.value, HaltReason.HALTED.value, HaltReason.HALTED.value,
+                          HaltReason.HALTED.value], [loads(result.to_json())["halt_reason"] for result in results])
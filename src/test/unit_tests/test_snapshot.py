@@ -0,0 +1,41 @@
+from unittest import TestCase
+from spacecat.simulator import HaltReason, Simulator
+from test.helpers import letters_code, machine, machines, self_modifying_code
+
+
+class TestSnapshot(TestCase):
+    def test_restore(self):
+        for code in (letters_code, self_modifying_code):
+            for engine, simulator in machines(code):
+                with self.subTest(engine=engine):
+                    simulator.run(max_steps=5)
+                    snapshot = simulator.snapshot()
+                    self.assertEqual(simulator.dump_program_svm_state(), snapshot[:-2])
+                    first = simulator.run()
+                    simulator.restore(snapshot)
+                    self.assertEqual(snapshot, simulator.snapshot())
+                    self.assertEqual(first, simulator.run())
+                    self.assertRaises(ValueError, simulator.restore, snapshot[:-1])
+
+    def test_flags(self):
+        for engine, simulator in machines("jmpEQ R0=R0, 02h\njmpEQ R0=R0, 06h\nhalt\nmove RF, R0\nhalt"):
+            with self.subTest(engine=engine):
+                simulator.run(max_steps=1)
+                clone = Simulator.from_snapshot(simulator.snapshot(), [15])
+                self.assertEqual(simulator.run(), clone.run())
+                self.assertEqual((0, HaltReason.HALTED), (clone.fork().run().steps, clone.fork().run().halt_reason))
+        simulator = machine()
+        simulator.run()
+        self.assertEqual((256, HaltReason.END_OF_MEMORY), (simulator.fork().PC, simulator.fork().run().halt_reason))
+
+    def test_fork(self):
+        for engine, simulator in machines(letters_code):
+            with self.subTest(engine=engine):
+                simulator.keep_history()
+                simulator.run(max_steps=4)
+                clone = simulator.fork()
+                self.assertEqual((0, 4), (clone.history_length(), simulator.history_length()))
+                clone.return_memory()[0x20].value = 1
+                self.assertEqual("BCDEFGHIJKLMNOPQRSTUVWXYZ", clone.run().output)
+                self.assertEqual((0, 0x08), (simulator.return_memory()[0x20].value, simulator.PC))
+                self.assertEqual("BCDEFGHIJKLMNOPQRSTUVWXYZ", simulator.run().output)
@@ -0,0 +1,45 @@
+from unittest import TestCase
+from spacecat.lexer import AssemblyError
+from spacecat.preprocessor import preprocess
+from spacecat.symbols import SymbolTable
+from test.helpers import assemble
+
+prefix_code = """jmp loop2
+loop: halt
+loop2: jmpEQ R0=R0, loop"""
+
+
+class TestSymbols(TestCase):
+    def test_forward_references(self):
+        self.assertEqual("1104B010000000000000000000000000C000", assemble("load R1, [data]\njmp end\norg 10h\n"
+                                                                       "end: halt\norg 4\ndata: db 0", 18))
+        self.assertEqual("C0000402", assemble("halt\ndb here, 2\nhere:", 4))
+
+    def test_fixups_under_org(self):
+        self.assertEqual("C000", assemble("jmp end\norg 0\nhalt\nend:", 2))
+        self.assertEqual("07", assemble("db later\norg 0\ndb 7\nlater:", 1))
+        self.assertEqual("B0042103C000", assemble("jmp end\nload R1, 3\nend: halt", 6))
+
+    def test_numerals_resolve_at_once(self):
+        table = SymbolTable()
+        self.assertEqual((0x10, 5, None), (table.resolve_now("10h"), table.resolve_now("5"), table.resolve_now("a")))
+        self.assertEqual("B010C000C000", assemble("jmp 10h\nhalt\n10h: halt", 6))
+
+    def test_prefix_labels(self):
+        self.assertEqual("B004C000B002", assemble(prefix_code, 6))
+        self.assertEqual("jmp 04\nhalt\njmpeq r0=r0,02\n",
+                         preprocess("jmp loop2\nloop:\nhalt\nloop2:\njmpeq r0=r0,loop"))
+
+    def test_labels_shadow_numerals(self):
+        self.assertEqual("B0AAC000", assemble("jmp a\nhalt\norg 0AAh\na:", 4))
+        self.assertEqual("B00A", assemble("jmp a", 2))
+
+    def test_duplicate_label(self):
+        with self.assertRaises(AssemblyError) as context:
+            assemble("loop: halt\n  loop: halt", 4)
+        self.assertEqual((2, 3), (context.exception.line, context.exception.column))
+        self.assertIsNone(SymbolTable().lookup("loop"))
+
+    def test_many_labels(self):
+        code = "\n".join(f"label{index}: jmp label{(index + 1) % 100}" for index in range(100))
+        self.assertEqual("".join(f"B0{(index + 1) % 100 * 2:02X}" for index in range(100)), assemble(code, 200))
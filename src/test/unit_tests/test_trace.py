@@ -0,0 +1,95 @@
+from io import BytesIO
+from os import listdir, makedirs
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from spacecat.runner import run_program, run_programs, trace_names
+from spacecat.trace import MEMORY_WRITE, NO_WRITE, REGISTER_WRITE, TraceReader, TraceStep
+from test.helpers import letters_code, machine, self_modifying_code
+
+
+class TestTrace(TestCase):
+    @staticmethod
+    def states(code: str):
+        simulator = machine(code)
+        states = [simulator.dump_program_svm_state()]
+        for _ in simulator:
+            states.append(simulator.dump_program_svm_state())
+        return states
+
+    def test_seek(self):
+        for code in (letters_code, self_modifying_code):
+            states = self.states(code)
+            for options in ({}, {"compact": True}, {"jit": True}):
+                simulator = machine(code, **options)
+                file = BytesIO()
+                simulator.start_trace(file, keyframe_interval=5)
+                result = simulator.run()
+                simulator.stop_trace()
+                reader = TraceReader(file)
+                self.assertEqual(len(states) - 1, result.steps)
+                self.assertEqual(result.steps, reader.steps)
+                self.assertEqual(states, [reader.state_at(step) for step in range(reader.steps + 1)])
+                self.assertRaises(IndexError, reader.state_at, reader.steps + 1)
+
+    def test_steps(self):
+        simulator = machine("load R1, 5\nstore R1, [20h]\njmpEQ R0=R0, 06h\nhalt")
+        file = BytesIO()
+        simulator.start_trace(file)
+        simulator.run()
+        simulator.stop_trace()
+        reader = TraceReader(file)
+        self.assertEqual([TraceStep(2, 0x2105, REGISTER_WRITE, 1, 5), TraceStep(4, 0x3120, MEMORY_WRITE, 0x20, 5),
+                          TraceStep(6, 0xB006, NO_WRITE, 0, 0), TraceStep(8, 0xC000, NO_WRITE, 0, 0)],
+                         [reader.step(step) for step in range(1, 5)])
+
+    def test_cut_short(self):
+        states = self.states(letters_code)
+        simulator = machine(letters_code)
+        file = BytesIO()
+        simulator.start_trace(file, keyframe_interval=10)
+        simulator.run(max_steps=20)
+        simulator.stop_trace()
+        trace = file.getvalue()
+        reader = TraceReader(BytesIO(trace[:-1]))
+        self.assertEqual((20, states[20]), (reader.steps, reader.state_at(20)))
+        self.assertEqual(states[13], TraceReader(BytesIO(trace[:-(275 + 8) - 7 * 8])).state_at(13))
+
+    def test_tracked_and_traced(self):
+        simulator = machine(letters_code, jit=True)
+        simulator.track_writes()
+        file = BytesIO()
+        simulator.start_trace(file)
+        simulator.run(max_steps=4)
+        simulator.stop_trace()
+        self.assertEqual((set(), {0, 1, 2, 15}), simulator.take_dirty())
+        self.assertEqual(4, TraceReader(file).steps)
+
+    def test_runner(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = join(directory.name, "letters.asm")
+        with open(path, "w") as file:
+            file.write(letters_code)
+        result = run_program(path, trace_directory=directory.name)
+        self.assertEqual(["letters.asm", "letters.asm.trace"], sorted(listdir(directory.name)))
+        with open(path + ".trace", "rb") as file:
+            self.assertEqual(result.steps, TraceReader(file).steps)
+
+    def test_same_file_names(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        paths = []
+        for name, code in (("a", letters_code), ("b", "load R1, 1\nhalt")):
+            makedirs(join(directory.name, name))
+            paths.append(join(directory.name, name, "main.asm"))
+            with open(paths[-1], "w") as file:
+                file.write(code)
+        self.assertEqual([join("a", "main.asm.trace"), join("b", "main.asm.trace")], trace_names(paths))
+        self.assertEqual(["main.asm.trace"], trace_names(paths[:1]))
+        traces = join(directory.name, "traces")
+        results = list(run_programs(paths, trace_directory=traces, workers=2))
+        for name, result in zip(("a", "b"), results):
+            with open(join(traces, name, "main.asm.trace"), "rb") as file:
+                self.assertEqual(result.steps, TraceReader(file).steps)
+        self.assertNotEqual(results[0].steps, results[1].steps)
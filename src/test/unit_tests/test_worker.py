@@ -0,0 +1,65 @@
+from unittest import TestCase
+from spacecat.assembler import Assembler
+from spacecat.simulator import Simulator
+from spacecat.worker import SimulationWorker, Snapshot
+from test.helpers import infinite_code, letters_code
+
+
+class TestWorker(TestCase):
+    def start(self, code: str, **kwargs) -> SimulationWorker:
+        simulator = Simulator(mem_size=256, register_size=16, stdout_register_indices=[15])
+        simulator.load_memory(Assembler.instantiate(code, 256).memory)
+        worker = SimulationWorker(simulator, **kwargs)
+        worker.start()
+        self.addCleanup(worker.stop)
+        return worker
+
+    @staticmethod
+    def wait_until_stopped(worker: SimulationWorker) -> Snapshot:
+        snapshot = worker.snapshots.get(timeout=5)
+        while snapshot.running:
+            snapshot = snapshot.merge(worker.snapshots.get(timeout=5))
+        return snapshot
+
+    def test_run_to_halt(self):
+        worker = self.start(letters_code)
+        worker.resume()
+        snapshot = self.wait_until_stopped(worker)
+        self.assertEqual("ABCDEFGHIJKLMNOPQRSTUVWXYZ", snapshot.output)
+        self.assertEqual(3 + 26 * 3 + 1, snapshot.steps)
+        self.assertEqual({0, 1, 2, 15}, snapshot.dirty_registers)
+        self.assertEqual(bytes(cell.value for cell in worker.simulator.return_registers()), snapshot.registers)
+
+    def test_step(self):
+        worker = self.start(letters_code)
+        for _ in range(4):
+            worker.step()
+        worker.pause()
+        snapshot = worker.poll()
+        self.assertEqual((4, "A", False, 8, frozenset({0, 1, 2, 15})),
+                         (snapshot.steps, snapshot.output, snapshot.running, snapshot.PC, snapshot.dirty_registers))
+        self.assertIsNone(worker.poll())
+
+    def test_pause_runaway(self):
+        worker = self.start(infinite_code, frame_interval=0)
+        worker.resume()
+        self.assertTrue(worker.snapshots.get(timeout=5).running)
+        worker.pause()
+        snapshot = worker.poll()
+        self.assertFalse(snapshot.running)
+        steps = worker.simulator.run(max_steps=10).steps
+        self.assertEqual(10, steps)
+        self.assertIsNone(worker.poll())
+
+    def test_paced(self):
+        worker = self.start(letters_code)
+        worker.resume(interval=0.001)
+        snapshot = worker.snapshots.get(timeout=5)
+        self.assertEqual((1, True), (snapshot.steps, snapshot.running))
+        self.assertEqual("ABCDEFGHIJKLMNOPQRSTUVWXYZ", snapshot.merge(self.wait_until_stopped(worker)).output)
+
+    def test_error(self):
+        worker = self.start("load R1, 3\nror R1, 9")
+        worker.resume()
+        snapshot = self.wait_until_stopped(worker)
+        self.assertTrue(snapshot.error.startswith("IndexError"))